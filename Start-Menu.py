@@ -1,10 +1,18 @@
+import startup
 import pygame
-import sys
-import subprocess
 import json
 import os
+from widgets import Widget, Label, Layer, UI
+from controls import Controls, MENU_EVENTS, REDRAW_EVENTS
+import scenes
+import loader
+import fonts
+import spritecache
+
+scenes.main(__file__)
 
 SETTINGS_FILE = "settings.json"
+SAVE_FILE = "savegame.bin"
 
 def load_settings():
     if os.path.exists(SETTINGS_FILE):
@@ -19,98 +27,95 @@ def save_settings(settings):
 def invert_color(color):
     return tuple(255 - c for c in color[:3])
 
-def invert_surface(surface):
-    arr = pygame.surfarray.array3d(surface)
-    arr = 255 - arr
-    return pygame.surfarray.make_surface(arr)
-
 pygame.init()
 
 info = pygame.display.Info()
 screen_width, screen_height = info.current_w, info.current_h
 screen = pygame.display.set_mode((screen_width, screen_height), pygame.FULLSCREEN)
 pygame.display.set_caption("Full Screen Pygame Window")
+startup.mark("display")
 
 settings = load_settings()
 invert = settings.get("invert_colors", False)
 
-# Load and scale the background image
-background = pygame.image.load("background.png")
-background = pygame.transform.scale(background, (screen_width, screen_height))
-if invert:
-    background = invert_surface(background)
-
-font = pygame.font.SysFont(None, 80)
-fg = (255, 255, 255) if not invert else (0, 0, 0)
-button_text = font.render("Start", True, fg)
-button_text_rect = button_text.get_rect(center=(screen_width // 2, screen_height // 2 - 80 + 100))
-
-settings_text = font.render("Settings", True, fg)
-settings_text_rect = settings_text.get_rect(center=(screen_width // 2, screen_height // 2 + 0 + 100))
+def load_background():
+    # Scaled background image; the inverted one is baked into the sprite cache too
+    if invert:
+        return spritecache.load("background.png", screen.get_size(), inverted=True).convert()
+    return loader.collect("start_menu", screen)["background"]
 
-quit_text = font.render("Quit", True, fg)
-quit_text_rect = quit_text.get_rect(center=(screen_width // 2, screen_height // 2 + 80 + 100))
-
-delete_font = pygame.font.SysFont(None, 40)
-delete_text = delete_font.render("Delete Progress", True, fg)
-delete_text_rect = delete_text.get_rect(bottomright=(screen_width - 40, screen_height - 30))
+font = fonts.get(None, 80)
+delete_font = fonts.get(None, 40)
+startup.mark("fonts")
 
 progress_deleted = False  # Add this flag
 
+def build_ui():
+    global ui, confirm_label
+    fg = (255, 255, 255) if not invert else (0, 0, 0)
+    background = load_background()
+    confirm_label = Label(delete_font, "Progress deleted!", (255, 80, 80),
+                          bottomright=(screen_width - 40, screen_height - 70))
+    confirm_label.set_visible(progress_deleted)
+    ui = UI(Layer(
+        Widget(background, background.get_rect()),
+        Label(font, "Start", fg, name="start", center=(screen_width // 2, screen_height // 2 - 80 + 100)),
+        Label(font, "Settings", fg, name="settings", center=(screen_width // 2, screen_height // 2 + 0 + 100)),
+        Label(font, "Quit", fg, name="quit", center=(screen_width // 2, screen_height // 2 + 80 + 100)),
+        Label(delete_font, "Delete Progress", fg, name="delete", bottomright=(screen_width - 40, screen_height - 30)),
+        confirm_label,
+    ))
+
+build_ui()
+controls = Controls((screen_width, screen_height), (screen_width, screen_height), MENU_EVENTS)
+
+redraw = True
 running = True
 while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT or (
+    if redraw:
+        ui.draw(screen)
+        pygame.display.flip()
+        startup.first_frame(__file__)
+        redraw = False
+        # Prepare the level while the menu sits idle
+        loader.preload("level1")
+
+    for event in controls.wait():
+        if event.type in REDRAW_EVENTS:
+            redraw = True
+        elif event.type == pygame.QUIT or (
             event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
         ):
             settings["invert_colors"] = False
             save_settings(settings)
             running = False
         elif event.type == pygame.MOUSEBUTTONDOWN:
-            if button_text_rect.collidepoint(event.pos):
-                subprocess.Popen([sys.executable, "level_select.py"])
+            clicked = ui.hit(event.pos)
+            if clicked == "start":
+                scenes.goto("level_select.py")
                 running = False
-            elif quit_text_rect.collidepoint(event.pos):
+            elif clicked == "quit":
                 settings["invert_colors"] = False
                 save_settings(settings)
                 running = False
-            elif settings_text_rect.collidepoint(event.pos):
-                subprocess.call([sys.executable, "settings.py"])
+            elif clicked == "settings":
+                scenes.call("settings.py")
+                pygame.display.set_caption("Full Screen Pygame Window")
+                controls.activate()
                 # Reload settings and update invert variable
                 settings = load_settings()
                 invert = settings.get("invert_colors", False)
                 # Update colors and background
-                fg = (255, 255, 255) if not invert else (0, 0, 0)
-                background = pygame.image.load("background.png")
-                background = pygame.transform.scale(background, (screen_width, screen_height))
-                if invert:
-                    background = invert_surface(background)
-                button_text = font.render("Start", True, fg)
-                button_text_rect = button_text.get_rect(center=(screen_width // 2, screen_height // 2 - 80 + 100))
-                settings_text = font.render("Settings", True, fg)
-                settings_text_rect = settings_text.get_rect(center=(screen_width // 2, screen_height // 2 + 0 + 100))
-                quit_text = font.render("Quit", True, fg)
-                quit_text_rect = quit_text.get_rect(center=(screen_width // 2, screen_height // 2 + 80 + 100))
-                delete_text = delete_font.render("Delete Progress", True, fg)
-                delete_text_rect = delete_text.get_rect(bottomright=(screen_width - 40, screen_height - 30))
-            elif delete_text_rect.collidepoint(event.pos):
+                build_ui()
+                redraw = True
+            elif clicked == "delete":
                 # Reset unlocked_levels to 1
                 settings["unlocked_levels"] = 1
                 save_settings(settings)
+                if os.path.exists(SAVE_FILE):
+                    os.remove(SAVE_FILE)
                 progress_deleted = True  # Set flag
+                confirm_label.set_visible(True)
+                redraw = True
 
-    screen.blit(background, (0, 0))
-    screen.blit(button_text, button_text_rect)
-    screen.blit(settings_text, settings_text_rect)
-    screen.blit(quit_text, quit_text_rect)
-    screen.blit(delete_text, delete_text_rect)
-
-    if progress_deleted:
-        confirm_text = delete_font.render("Progress deleted!", True, (255, 80, 80))
-        confirm_rect = confirm_text.get_rect(bottomright=(screen_width - 40, screen_height - 70))
-        screen.blit(confirm_text, confirm_rect)
-
-    pygame.display.flip()
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+scenes.exit()
\ No newline at end of file
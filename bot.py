@@ -0,0 +1,158 @@
+import argparse
+import random
+import time
+
+from game import Game, MazeGame, TOWER_TYPES
+from pathing import CompiledPath
+
+# Auto-player for soak tests and benchmark workloads. The bot plays through
+# Game.apply_action with the same actions level1.py makes from mouse clicks
+# (select a tower, drop it, accept, answer the puzzle), so it exercises the
+# real placement and puzzle flow. Where towers go is up to a strategy.
+#
+# Headless:  python bot.py --games 10 --strategy coverage [--maze] [--seed 1]
+# Windowed:  python level1.py --bot=coverage --speed=8 [--max-towers=12]
+
+
+def play_area(game):
+    # (left, top, right, bottom) worth considering for towers
+    if isinstance(game, MazeGame):
+        field = game.field
+        return 0, 0, field.cols * field.cell, field.rows * field.cell
+    xs = [x for x, y in game.path.points]
+    ys = [y for x, y in game.path.points]
+    return max(0, min(xs) - 150), max(0, min(ys) - 150), max(xs) + 150, max(ys) + 150
+
+
+def route_points(game):
+    # Points along the way enemies currently walk, for scoring tower spots
+    if isinstance(game, MazeGame):
+        field = game.field
+        points, i = [], game.spawn
+        while field.next[i] is not None and i != field.exit and len(points) < len(field.dist):
+            points.append(field.next[i])
+            i = field.index_at(*field.next[i])
+        return points
+    path = game.path
+    return [path.point_at(d) for d in range(0, int(path.length), 20)]
+
+
+class RandomPlacement:
+    # Any valid spot, any tower type that's ready
+    tries = 40
+
+    def choose(self, game, ready, rng):
+        left, top, right, bottom = play_area(game)
+        for _ in range(self.tries):
+            ttype = rng.choice(ready)
+            x, y = rng.randrange(left, right), rng.randrange(top, bottom)
+            if game.is_valid_tower_position(x, y, ttype):
+                return ttype, x, y
+        return None
+
+
+class CoveragePlacement(RandomPlacement):
+    # Best of a batch of valid spots, by how much of the enemies' route is in range
+    tries = 120
+
+    def choose(self, game, ready, rng):
+        route = route_points(game)
+        left, top, right, bottom = play_area(game)
+        best, best_score = None, 0
+        for _ in range(self.tries):
+            ttype = rng.choice(ready)
+            x, y = rng.randrange(left, right), rng.randrange(top, bottom)
+            reach = TOWER_TYPES[ttype]["range"] ** 2
+            score = sum(1 for px, py in route if (px - x) ** 2 + (py - y) ** 2 <= reach)
+            if score > best_score and game.is_valid_tower_position(x, y, ttype):
+                best, best_score = (ttype, x, y), score
+        return best
+
+
+STRATEGIES = {
+    "random": RandomPlacement,
+    "coverage": CoveragePlacement,
+}
+
+
+class Bot:
+    def __init__(self, game, strategy="coverage", seed=None, accuracy=1.0, think=30, max_towers=None):
+        self.game = game
+        self.strategy = STRATEGIES[strategy]() if isinstance(strategy, str) else strategy
+        self.rng = random.Random(seed)
+        self.accuracy = accuracy  # Chance of answering a puzzle correctly
+        self.think = think        # Frames between placement attempts
+        self.max_towers = max_towers
+        self.wait = 0
+
+    def actions(self):
+        # Actions for this frame, in the order a player would click
+        game = self.game
+        if game.game_won or game.game_lost:
+            return []
+        if game.puzzle_active and game.current_puzzle:
+            answer = game.current_puzzle["answer"]
+            # A spot that became invalid re-asks forever; answering wrong is the only way out
+            if game.puzzle_result == "invalid" or self.rng.random() >= self.accuracy:
+                answer = (answer + 1) % len(game.current_puzzle["options"])
+            return [("answer", answer)]
+        if game.placing_tower:
+            return [("accept",)]
+        if self.wait > 0:
+            self.wait -= 1
+            return []
+        if self.max_towers is not None and len(game.towers) >= self.max_towers:
+            return []
+        self.wait = self.think
+        ready = [i for i, cooldown in enumerate(game.tower_place_cooldowns) if cooldown == 0]
+        choice = self.strategy.choose(game, ready, self.rng) if ready else None
+        if choice is None:
+            return []
+        ttype, x, y = choice
+        return [("select_tower", ttype), ("place", x, y), ("release", x, y)]
+
+    def step(self):
+        for action in self.actions():
+            self.game.apply_action(action)
+
+
+def make_game(maze=False, seed=None):
+    import levels
+    from puzzles import PUZZLES
+    if maze:
+        return MazeGame(levels.MAZE1, PUZZLES, seed)
+    return Game(CompiledPath(levels.LEVEL1_PATH), PUZZLES, seed)
+
+
+def play(game, bot, max_ticks=10 ** 7):
+    while not (game.game_won or game.game_lost) and game.ticks < max_ticks:
+        bot.step()
+        game.tick()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play DEFEND.EXE levels without a window")
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="coverage")
+    parser.add_argument("--maze", action="store_true", help="play the open-field level")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--accuracy", type=float, default=1.0)
+    parser.add_argument("--max-towers", type=int, default=None)
+    args = parser.parse_args()
+
+    wins = 0
+    for n in range(args.games):
+        seed = None if args.seed is None else args.seed + n
+        game = make_game(args.maze, seed)
+        bot = Bot(game, args.strategy, seed, args.accuracy, max_towers=args.max_towers)
+        start = time.perf_counter()
+        play(game, bot)
+        elapsed = time.perf_counter() - start
+        wins += game.game_won
+        print(f"game {n + 1}: {'won' if game.game_won else 'lost'}, score {game.score}, lives {game.lives}, "
+              f"towers {len(game.towers)}, {game.ticks} ticks in {elapsed:.2f}s ({game.ticks / elapsed:.0f} ticks/s)")
+    print(f"{wins}/{args.games} won")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import math
+
+# Tile grid of where towers may go, for levels made in editor.py. A tile is
+# unbuildable if it was painted so, or if its center is within CLEARANCE of the
+# path. The second part is kept as a per-tile count of nearby path segments, so
+# when a waypoint moves only the tiles around its two segments are updated.
+
+TILE = 40
+CLEARANCE = 40  # Same distance Game.is_valid_tower_position keeps towers off the path
+
+
+def segment_distance(px, py, segment):
+    x1, y1, dx, dy, length = segment
+    if length == 0:
+        return math.hypot(px - x1, py - y1)
+    t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / (length * length)))
+    return math.hypot(px - x1 - t * dx, py - y1 - t * dy)
+
+
+class BuildMask:
+    def __init__(self, cols, rows, tile=TILE, clearance=CLEARANCE):
+        self.cols, self.rows = cols, rows
+        self.tile = tile
+        self.clearance = clearance
+        self.painted = bytearray(cols * rows)
+        self.near = [0] * (cols * rows)  # Path segments within clearance of each tile center
+
+    def tile_at(self, x, y):
+        col, row = int(x // self.tile), int(y // self.tile)
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return row * self.cols + col
+        return None
+
+    def tile_rect(self, i):
+        row, col = divmod(i, self.cols)
+        return col * self.tile, row * self.tile, self.tile, self.tile
+
+    def painted_at(self, x, y):
+        i = self.tile_at(x, y)
+        return i is not None and self.painted[i]
+
+    def buildable(self, i):
+        return not self.painted[i] and not self.near[i]
+
+    def paint(self, x, y, value):
+        # Returns the tile that changed, or None
+        i = self.tile_at(x, y)
+        if i is None or self.painted[i] == value:
+            return None
+        self.painted[i] = value
+        return i
+
+    def tiles_near(self, segment, reach):
+        # Tiles whose center is within reach of the segment, column by column,
+        # so a long diagonal segment costs its length rather than its bounding box
+        x1, y1, dx, dy, _ = segment
+        t, half, pad = self.tile, self.tile / 2, reach
+        c0 = max(0, int((min(x1, x1 + dx) - pad - half) // t))
+        c1 = min(self.cols - 1, int((max(x1, x1 + dx) + pad - half) // t) + 1)
+        for col in range(c0, c1 + 1):
+            cx = col * t + half
+            lo, hi = 0.0, 1.0
+            if dx:
+                a, b = (cx - pad - x1) / dx, (cx + pad - x1) / dx
+                lo, hi = max(lo, min(a, b)), min(hi, max(a, b))
+                if lo > hi:
+                    continue
+            ya, yb = sorted((y1 + lo * dy, y1 + hi * dy))
+            r0 = max(0, int((ya - pad - half) // t))
+            r1 = min(self.rows - 1, int((yb + pad - half) // t) + 1)
+            for row in range(r0, r1 + 1):
+                if segment_distance(cx, row * t + half, segment) < reach:
+                    yield row * self.cols + col
+
+    def add_segment(self, segment, sign=1):
+        # Returns the tiles whose count changed
+        touched = list(self.tiles_near(segment, self.clearance))
+        for i in touched:
+            self.near[i] += sign
+        return touched
+
+    def set_path(self, path):
+        self.near = [0] * (self.cols * self.rows)
+        for segment in path.segments:
+            self.add_segment(segment)
+
+    def replace_segments(self, old, new):
+        # Swap some of the path's segments for their edited versions; returns the tiles
+        # whose buildability may have changed
+        touched = set()
+        for segment in old:
+            touched.update(self.add_segment(segment, -1))
+        for segment in new:
+            touched.update(self.add_segment(segment))
+        return touched
+
+    def painted_tiles(self):
+        return [i for i, value in enumerate(self.painted) if value]
@@ -0,0 +1,92 @@
+# Camera for levels bigger than the screen. The game works in world coordinates;
+# the camera maps them onto the virtual surface (screen coordinates) with a pan
+# offset and a zoom, and tells drawing which part of the world is in view.
+#
+# Culling asks the same structures gameplay does: enemies on a path level come
+# from the game's progress order (see pathing.ProgressOrder) over the stretches
+# of path inside the view, just as towers find targets over their coverage
+# intervals. Open-field levels have no path, so their enemies are tested by
+# position, like MazeTower.in_range.
+
+ZOOMS = (0.5, 0.75, 1.0, 1.5, 2.0)  # Plus the one that fits the whole level, if that's further out
+PAN_SPEED = 15  # Screen pixels per frame while a pan key is held
+WORLD_MARGIN = 100  # Room around a path level's path, for towers next to its far ends
+CULL_MARGIN = 50  # Largest sprite half-size, plus a tick of enemy movement since the progress order was built
+
+
+class Camera:
+    def __init__(self, view_size, world_size):
+        self.view_w, self.view_h = view_size
+        self.world_w, self.world_h = world_size
+        self.x = self.y = 0.0  # World point at the top-left corner of the view
+        self.zoom = 1.0
+        fit = min(self.view_w / self.world_w, self.view_h / self.world_h)
+        self.zooms = sorted({fit} | {z for z in ZOOMS if z >= fit})
+
+    def to_world(self, sx, sy):
+        return self.x + sx / self.zoom, self.y + sy / self.zoom
+
+    def to_screen(self, wx, wy):
+        return (wx - self.x) * self.zoom, (wy - self.y) * self.zoom
+
+    def pan(self, dx, dy):
+        # By screen pixels
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+        self.clamp()
+
+    def offset(self, scale):
+        # Pixel offset of the view on a world drawn at scale (zoom times render scale)
+        return int(self.x * scale), int(self.y * scale)
+
+    def zoom_at(self, sx, sy, steps):
+        # Step through the zoom levels, keeping the world point under (sx, sy) where it is
+        zooms = self.zooms
+        zoom = zooms[max(0, min(len(zooms) - 1, zooms.index(self.zoom) + steps))]
+        wx, wy = self.to_world(sx, sy)
+        self.zoom = zoom
+        self.x, self.y = wx - sx / zoom, wy - sy / zoom
+        self.clamp()
+
+    def reset(self):
+        self.x = self.y = 0.0
+        self.zoom = 1.0
+
+    def clamp(self):
+        # Keep the view inside the world; a world smaller than the view stays at the top left
+        self.x = max(0.0, min(self.x, self.world_w - self.view_w / self.zoom))
+        self.y = max(0.0, min(self.y, self.world_h - self.view_h / self.zoom))
+
+    def area(self, margin=CULL_MARGIN):
+        # World rectangle (x0, y0, x1, y1) in view, grown by margin
+        return (self.x - margin, self.y - margin,
+                self.x + self.view_w / self.zoom + margin, self.y + self.view_h / self.zoom + margin)
+
+
+def world_size(game, view_size, menu_width=0):
+    # Extent of a level's world: its grid, or its path plus WORLD_MARGIN; never smaller than the
+    # view. menu_width leaves room to pan the right edge out from under the tower menu.
+    if hasattr(game, "field"):
+        field = game.field
+        width, height = field.cols * field.cell, field.rows * field.cell
+    elif game.build_mask:
+        mask = game.build_mask
+        width, height = mask.cols * mask.tile, mask.rows * mask.tile
+    else:
+        width = max(x for x, _ in game.path.points) + WORLD_MARGIN
+        height = max(y for _, y in game.path.points) + WORLD_MARGIN
+    return max(view_size[0], width + menu_width), max(view_size[1], height)
+
+
+def visible(game, area):
+    # (towers, enemies, bullets) of the game that can show up in area; towers count
+    # while any of their range ring does
+    x0, y0, x1, y1 = area
+    towers = [t for t in game.towers if x0 - t.range <= t.x <= x1 + t.range and y0 - t.range <= t.y <= y1 + t.range]
+    if game.path:
+        # Killed and leaked enemies stay in the order until the next tick rebuilds it
+        enemies = [e for e in game.enemy_order.within(game.path.rect_intervals(*area)) if e.alive]
+    else:
+        enemies = [e for e in game.enemies if x0 <= e.pos[0] <= x1 and y0 <= e.pos[1] <= y1]
+    bullets = [b for b in game.bullets if x0 <= b.x <= x1 and y0 <= b.y <= y1]
+    return towers, enemies, bullets
@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import socket
+import sys
+
+from bot import make_game
+from camera import world_size
+from stream import parse_address, ENEMY_CLASSES, MIN_WORLD
+
+# Batch-step control protocol for external agents (tuning scripts, training
+# loops). Runs the level headless. Every request is one line of JSON holding a
+# list of commands, and gets back one line with a list of results, so a single
+# round trip can place towers, answer the puzzle and advance thousands of ticks.
+#
+#   python control.py                        # requests on stdin, results on stdout
+#   python control.py --listen unix:/tmp/defend.sock [--maze]
+#
+# Commands:
+#   ["reset", seed]             new game (seed may be null); result: observation
+#   ["place_tower", type, x, y] drop a tower and open its puzzle; result: {"puzzle": {...}}
+#                               x, y are whole pixels inside the world (at least 1920x1080)
+#   ["answer_puzzle", i]        answer the open puzzle with option index i;
+#                               result: {"result": true | false | "invalid"}
+#   ["step", n]                 run n ticks (fewer if the game ends); result: observation
+#   ["observe"]                 result: observation
+# A command that can't be carried out gives {"error": "..."} and the rest of
+# its batch is skipped.
+#
+# Observation: {"tick", "lives", "score", "wave", "max_wave", "won", "lost",
+# "cooldowns", "ticks_run", "events", "towers", "enemies", "bullets"} where the
+# entity lists are flat, one record after another:
+#   towers  [type, x, y, ...]
+#   enemies [kind, x, y, hp, ...]   kind indexes ENEMY_KINDS
+#   bullets [x, y, ...]
+#   events  [kind, x, y, ...]       kind indexes EVENT_KINDS; hits, kills and leaks since the last step
+
+ENEMY_KINDS = ENEMY_CLASSES
+EVENT_KINDS = ["hit", "kill", "leak"]
+ENEMY_KIND = {name: i for i, name in enumerate(ENEMY_KINDS)}
+EVENT_KIND = {name: i for i, name in enumerate(EVENT_KINDS)}
+DIGITS = 1  # Coordinates are rounded to this many decimals to keep lines short
+
+
+class Session:
+    def __init__(self, maze=False):
+        self.maze = maze
+        self.reset(None)
+
+    def reset(self, seed):
+        self.game = make_game(self.maze, seed)
+        self.events = []
+        return self.observe(0)
+
+    def place_tower(self, ttype, x, y):
+        game = self.game
+        if game.game_won or game.game_lost:
+            raise ValueError("game is over")
+        if game.placing_tower or game.puzzle_active:
+            raise ValueError("a placement is already in progress")
+        if type(ttype) is not int or not 0 <= ttype < len(game.tower_place_cooldowns):
+            raise ValueError(f"no tower type {ttype!r}")
+        if game.tower_place_cooldowns[ttype]:
+            raise ValueError(f"tower type {ttype} is cooling down")
+        width, height = world_size(game, MIN_WORLD)
+        if type(x) is not int or type(y) is not int or not (0 <= x < width and 0 <= y < height):
+            raise ValueError(f"{x!r}, {y!r} is not a pixel inside the {width}x{height} world")
+        sx, sy = game.snap(x, y)
+        if not game.is_valid_tower_position(sx, sy, ttype):
+            raise ValueError(f"can't place a tower at {x}, {y}")
+        # The same clicks level1.py turns mouse input into, at the spot that was checked
+        for action in (("select_tower", ttype), ("place", sx, sy), ("release", sx, sy), ("accept",)):
+            game.apply_action(action)
+        puzzle = game.current_puzzle
+        return {"puzzle": {"question": puzzle["question"], "options": puzzle["options"]}}
+
+    def answer_puzzle(self, i):
+        game = self.game
+        if not (game.puzzle_active and game.current_puzzle):
+            raise ValueError("no puzzle is open")
+        if type(i) is not int or not 0 <= i < len(game.current_puzzle["options"]):
+            raise ValueError(f"no option {i!r}")
+        game.apply_action(("answer", i))
+        result = {"result": game.puzzle_result}
+        if game.puzzle_active:
+            # The spot was taken while the puzzle was open; a new puzzle is asked
+            puzzle = game.current_puzzle
+            result["puzzle"] = {"question": puzzle["question"], "options": puzzle["options"]}
+        return result
+
+    def step(self, n):
+        game = self.game
+        ran = 0
+        while ran < n and not (game.game_won or game.game_lost):
+            game.tick()
+            self.events += game.events
+            ran += 1
+        return self.observe(ran)
+
+    def observe(self, ran=0):
+        game = self.game
+        towers, enemies, bullets, events = [], [], [], []
+        for tower in game.towers:
+            towers += (tower.type, round(tower.x, DIGITS), round(tower.y, DIGITS))
+        for enemy in game.enemies:
+            enemies += (ENEMY_KIND[type(enemy).__name__],
+                        round(enemy.pos[0], DIGITS), round(enemy.pos[1], DIGITS), enemy.hp)
+        for bullet in game.bullets:
+            bullets += (round(bullet.x, DIGITS), round(bullet.y, DIGITS))
+        for kind, x, y in self.events:
+            events += (EVENT_KIND[kind], round(x, DIGITS), round(y, DIGITS))
+        self.events = []
+        return {
+            "tick": game.ticks,
+            "lives": game.lives,
+            "score": game.score,
+            "wave": min(game.current_wave, game.max_wave),
+            "max_wave": game.max_wave,
+            "won": game.game_won,
+            "lost": game.game_lost,
+            "cooldowns": list(game.tower_place_cooldowns),
+            "ticks_run": ran,
+            "events": events,
+            "towers": towers,
+            "enemies": enemies,
+            "bullets": bullets,
+        }
+
+    def run(self, batch):
+        # One request: a list of commands, or a single command
+        if batch and isinstance(batch[0], str):
+            batch = [batch]
+        results = []
+        for command in batch:
+            try:
+                if not isinstance(command, list) or not command or not isinstance(command[0], str):
+                    raise ValueError(f"a command is a list starting with its name, not {command!r}")
+                name, args = command[0], command[1:]
+                handler = COMMANDS.get(name)
+                if handler is None:
+                    raise ValueError(f"unknown command {name!r}")
+                results.append(handler(self, *args))
+            except (ValueError, TypeError, IndexError) as e:
+                results.append({"error": str(e)})
+                break
+        return results
+
+
+COMMANDS = {
+    "reset": Session.reset,
+    "place_tower": Session.place_tower,
+    "answer_puzzle": Session.answer_puzzle,
+    "step": Session.step,
+    "observe": Session.observe,
+}
+
+
+def serve(session, lines, write):
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            batch = json.loads(line)
+            if not isinstance(batch, list):
+                raise ValueError("a request is a JSON list of commands")
+            results = session.run(batch)
+        except ValueError as e:
+            results = [{"error": str(e)}]
+        write(json.dumps(results, separators=(",", ":")) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive a headless DEFEND.EXE level over a batch-step protocol")
+    parser.add_argument("--listen", default=None, help="unix:path or tcp:host:port (default: stdin/stdout)")
+    parser.add_argument("--maze", action="store_true", help="play the open-field level")
+    args = parser.parse_args()
+
+    session = Session(args.maze)
+    if not args.listen:
+        def write(text):
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        serve(session, sys.stdin, write)
+        return
+
+    family, addr = parse_address(args.listen)
+    if family == socket.AF_UNIX and os.path.exists(addr):
+        os.remove(addr)
+    server = socket.socket(family, socket.SOCK_STREAM)
+    if family == socket.AF_INET:
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(addr)
+    server.listen()
+    print(f"listening on {args.listen}", file=sys.stderr)
+    try:
+        while True:
+            # One agent at a time; each connection continues the same session until it resets
+            client, _ = server.accept()
+            with client, client.makefile("r", encoding="utf-8") as lines:
+                try:
+                    serve(session, lines, lambda text: client.sendall(text.encode()))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if family == socket.AF_UNIX and os.path.exists(addr):
+            os.remove(addr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import pygame
+
+# Event types the game reacts to. Everything else (including MOUSEMOTION) is dropped
+# by SDL before it reaches Python; the cursor is sampled once per frame instead.
+GAME_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL]
+# Menus only need clicks, keys and "window needs repainting" notifications
+MENU_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED]
+REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)
+
+
+class Controls:
+    def __init__(self, screen_size, logical_size, event_types=GAME_EVENTS):
+        self.scale_x = logical_size[0] / screen_size[0]
+        self.scale_y = logical_size[1] / screen_size[1]
+        self.event_types = event_types
+        self.mouse_pos = (0, 0)
+        self.activate()
+
+    def activate(self):
+        # Re-apply this screen's event filter (e.g. after returning from the settings screen)
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(self.event_types)
+
+    def to_logical(self, pos):
+        # Screen pixels -> virtual surface coordinates
+        return int(pos[0] * self.scale_x), int(pos[1] * self.scale_y)
+
+    def poll(self):
+        # Returns this frame's events and the latest cursor position in logical coordinates
+        events = pygame.event.get()
+        self.mouse_pos = self.to_logical(pygame.mouse.get_pos())
+        return events, self.mouse_pos
+
+    def wait(self, timeout=0):
+        # Sleep until an allowed event arrives (or timeout ms pass, for animated screens),
+        # then drain the queue. An idle screen costs no CPU.
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
@@ -0,0 +1,44 @@
+import bisect
+
+# Damage per second along the enemy path, for placement guidance. Like the aura
+# zones in effects.py, the path is cut at the ends of the towers' coverage
+# intervals (arc length, see pathing.py) into zones of constant DPS.
+#
+# A profile never changes once made: placing a tower splits the zones at the
+# ends of its intervals and adds its DPS in between, giving a new profile. The
+# work depends on the number of zones only, never on enemies, so the same
+# call previews a tower that is still being dragged. Holding a profile is also
+# safe while the simulation runs on another thread (see pipeline.View).
+
+
+class DpsProfile:
+    def __init__(self, bounds=(), values=(0.0,)):
+        self.bounds = bounds  # Sorted zone boundaries along the path
+        self.values = values  # DPS per zone; zone k spans [bounds[k-1], bounds[k]), zone 0 is before the first
+
+    def with_tower(self, intervals, dps):
+        # The profile with dps added over the intervals (a Tower's coverage)
+        if not intervals or not dps:
+            return self
+        bounds, values = list(self.bounds), list(self.values)
+        for lo, hi in intervals:
+            for p in (lo, hi):
+                k = bisect.bisect_left(bounds, p)
+                if k == len(bounds) or bounds[k] != p:
+                    # Zone k splits in two at p, both keeping its DPS
+                    bounds.insert(k, p)
+                    values.insert(k, values[k])
+            for k in range(bisect.bisect_left(bounds, lo) + 1, bisect.bisect_left(bounds, hi) + 1):
+                values[k] += dps
+        return DpsProfile(tuple(bounds), tuple(values))
+
+    def at(self, progress):
+        return self.values[bisect.bisect_right(self.bounds, progress)]
+
+    def zones(self, length):
+        # (start, end, dps) covering the whole path, 0 to length
+        edges = [0.0] + [b for b in self.bounds if 0 < b < length] + [length]
+        return [(lo, hi, self.at(lo)) for lo, hi in zip(edges, edges[1:]) if hi > lo]
+
+
+NO_DPS = DpsProfile()
@@ -0,0 +1,334 @@
+import startup
+import pygame
+import os
+import json
+import time
+from widgets import Label, Button, Overlay, Layer, UI
+from controls import Controls
+from pathing import CompiledPath
+from buildmask import BuildMask, TILE
+from game import Game, WAVES, ENEMY_KINDS
+import scenes
+import fonts
+import levels
+
+scenes.main(__file__)
+
+SETTINGS_FILE = "settings.json"
+
+def load_settings():
+    if os.path.exists(SETTINGS_FILE):
+        with open(SETTINGS_FILE, "r") as f:
+            return json.load(f)
+    return {"invert_colors": False}
+
+def invert_color(color):
+    return tuple(255 - c for c in color[:3])
+
+pygame.init()
+
+info = pygame.display.Info()
+SCREEN_WIDTH, SCREEN_HEIGHT = info.current_w, info.current_h
+screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN)
+pygame.display.set_caption("Level Editor")
+startup.mark("display")
+
+font = fonts.get("Arial", 24)
+small_font = fonts.get("Arial", 20)
+startup.mark("fonts")
+
+settings = load_settings()
+invert = settings.get("invert_colors", False)
+
+def color(c):
+    return c if not invert else invert_color(c)
+
+BG = color((30, 30, 30))
+FG = color((255, 255, 255))
+PATH_COLOR = color((0, 255, 0))
+HANDLE_COLOR = color((255, 255, 255))
+NEAR_COLOR = color((40, 55, 40))      # Too close to the path to build
+PAINTED_COLOR = color((60, 35, 35))   # Painted unbuildable
+GRID_COLOR = color((38, 38, 38))
+ENEMY_COLORS = [color((220, 40, 40)), color((240, 140, 20)), color((150, 60, 200))]
+PANEL_WIDTH = 300
+PANEL_BG = (50, 50, 80)
+HANDLE_RADIUS = 10
+PATH_WIDTH = 8
+
+# --- Level being edited (the saved custom level, or a copy of level 1) ---
+if os.path.exists(levels.CUSTOM_LEVEL):
+    level = levels.load_level(levels.CUSTOM_LEVEL)
+    mask = levels.level_build_mask(level)
+else:
+    level = {"path": levels.LEVEL1_PATH, "waves": WAVES}
+    mask = BuildMask(-(-SCREEN_WIDTH // TILE), -(-SCREEN_HEIGHT // TILE))
+path = CompiledPath(level["path"])
+waves = [dict(wave) for wave in level["waves"]]
+mask.set_path(path)
+
+mode = "path"        # "path": drag waypoints, "build": paint unbuildable tiles
+dragging = None      # Index of the waypoint being dragged
+painting = None      # 1 while painting, 0 while erasing
+last_edit_ms = 0.0
+saved = False
+
+# --- Board: tiles, path and handles, redrawn only where something changed ---
+board = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+def redraw_tiles(tiles):
+    # Redraw a set of tiles, one rect per run of adjacent tiles in a row
+    t = mask.tile
+    for i in sorted(tiles):
+        row, col = divmod(i, mask.cols)
+        if i - 1 in tiles and col > 0:
+            continue  # Part of a run that started further left
+        end = col + 1
+        while end < mask.cols and row * mask.cols + end in tiles:
+            end += 1
+        redraw_board((col * t, row * t, (end - col) * t, t))
+
+def draw_segment(segment):
+    # Thick lines as polygons: unlike draw.line these rasterize the same however they are clipped
+    x1, y1, dx, dy, length = segment
+    if length:
+        nx, ny = -dy / length * PATH_WIDTH / 2, dx / length * PATH_WIDTH / 2
+        pygame.draw.polygon(board, PATH_COLOR, [(x1 + nx, y1 + ny), (x1 + dx + nx, y1 + dy + ny),
+                                                (x1 + dx - nx, y1 + dy - ny), (x1 - nx, y1 - ny)])
+
+def redraw_board(rect):
+    rect = pygame.Rect(rect).clip(board.get_rect())
+    if not rect:
+        return
+    board.set_clip(rect)
+    board.fill(BG, rect)
+    t = mask.tile
+    for row in range(rect.top // t, min(mask.rows, (rect.bottom - 1) // t + 1)):
+        for col in range(rect.left // t, min(mask.cols, (rect.right - 1) // t + 1)):
+            i = row * mask.cols + col
+            tile = (col * t, row * t, t, t)
+            if mask.painted[i]:
+                board.fill(PAINTED_COLOR, tile)
+            elif mask.near[i]:
+                board.fill(NEAR_COLOR, tile)
+    for x in range(rect.left // t * t, rect.right, t):
+        pygame.draw.line(board, GRID_COLOR, (x, rect.top), (x, rect.bottom))
+    for y in range(rect.top // t * t, rect.bottom, t):
+        pygame.draw.line(board, GRID_COLOR, (rect.left, y), (rect.right, y))
+    near = rect.inflate(2 * PATH_WIDTH, 2 * PATH_WIDTH)
+    for segment in path.segments:
+        x1, y1, dx, dy, _ = segment
+        if near.clipline(x1, y1, x1 + dx, y1 + dy):
+            draw_segment(segment)
+    near = rect.inflate(2 * HANDLE_RADIUS, 2 * HANDLE_RADIUS)
+    for x, y in path.points:
+        if near.collidepoint(x, y):
+            pygame.draw.circle(board, PATH_COLOR, (x, y), PATH_WIDTH // 2)  # Round joint
+            pygame.draw.circle(board, HANDLE_COLOR, (x, y), HANDLE_RADIUS, 2)
+    board.set_clip(None)
+
+redraw_board(board.get_rect())
+
+# --- Path editing ---
+def point_near(pos):
+    for i, (x, y) in enumerate(path.points):
+        if abs(x - pos[0]) <= HANDLE_RADIUS and abs(y - pos[1]) <= HANDLE_RADIUS:
+            return i
+    return None
+
+def segment_near(pos):
+    for i, (x1, y1, dx, dy, length) in enumerate(path.segments):
+        if length and abs((pos[0] - x1) * dy - (pos[1] - y1) * dx) / length <= PATH_WIDTH:
+            t = ((pos[0] - x1) * dx + (pos[1] - y1) * dy) / (length * length)
+            if 0 < t < 1:
+                return i
+    return None
+
+def edit_path(op, i, *args):
+    # Apply one path edit, then refresh only the mask tiles and board area of the segments it touched
+    global last_edit_ms
+    start = time.perf_counter()
+    n = len(path.segments)
+    # Segments (by index) before and after the edit
+    if op == "move":
+        before, after = [i - 1, i], [i - 1, i]
+    elif op == "insert":
+        before, after = [i - 1] if 0 < i <= n else [], [i - 1, i]
+    else:
+        before, after = [i - 1, i], [i - 1] if 0 < i < n else []
+    old = [path.segments[j] for j in before if 0 <= j < n]
+    handle = pygame.Rect(path.points[min(i, n)], (0, 0)).inflate(4 * HANDLE_RADIUS, 4 * HANDLE_RADIUS)
+    if op == "move":
+        path.move_point(i, *args)
+    elif op == "insert":
+        path.insert_point(i, *args)
+    else:
+        path.remove_point(i)
+    new = [path.segments[j] for j in after if 0 <= j < len(path.segments)]
+    mask.replace_segments(old, new)
+    # Tiles a segment can change: its own clearance zone plus the line and handles drawn over neighbours
+    reach = mask.clearance + mask.tile
+    dirty = set()
+    for segment in old + new:
+        dirty.update(mask.tiles_near(segment, reach))
+    redraw_board(handle)
+    redraw_tiles(dirty)
+    last_edit_ms = (time.perf_counter() - start) * 1000
+    if op != "move":
+        start_test()  # Enemies index into the points list
+
+def paint(pos, value):
+    i = mask.paint(pos[0], pos[1], value)
+    if i is not None:
+        redraw_board(mask.tile_rect(i))
+
+# --- Test wave: the current waves walking the current path while you edit (one tick per frame, on this thread) ---
+test = None
+testing = False
+
+def start_test():
+    global test
+    if not testing:
+        test = None
+        return
+    test = Game(path, [], waves=waves)
+    # Nobody defends in the preview, so every enemy leaks
+    test.lives = sum(sum(wave.values()) for wave in waves) + 1
+
+def level_data():
+    return {"path": [list(p) for p in path.points], "waves": waves,
+            "grid": [mask.cols, mask.rows, mask.tile], "no_build": mask.painted_tiles()}
+
+# --- UI ---
+def build_ui():
+    global ui, status_label, panel_rect
+    left = SCREEN_WIDTH - PANEL_WIDTH
+    panel_rect = pygame.Rect(left, 0, PANEL_WIDTH, SCREEN_HEIGHT)
+    panel = Layer(Overlay(panel_rect, PANEL_BG))
+    y = 20
+    for name, text in (("path", "Path"), ("build", "Build")):
+        button = panel.add(Button(("mode", name), (left + 20 + (name == "build") * 135, y, 125, 44), color((80, 80, 120)),
+                                  text, font, FG, selected_outline=((255, 255, 255), 3)))
+        button.set_selected(mode == name)
+    y += 60
+    panel.add(Label(small_font, "Waves (click +1, right-click -1)", FG, topleft=(left + 20, y)))
+    y += 30
+    for w, wave in enumerate(waves):
+        panel.add(Label(small_font, f"{w + 1}", FG, topleft=(left + 20, y + 10)))
+        for k, kind in enumerate(ENEMY_KINDS):
+            rect = (left + 50 + k * 80, y, 72, 40)
+            text = f"{kind.__name__[0]} {wave.get(kind.__name__, 0)}"
+            panel.add(Button(("wave", w, kind.__name__), rect, ENEMY_COLORS[k], text, small_font, FG))
+        y += 48
+        if y > SCREEN_HEIGHT - 420:
+            break
+    panel.add(Button("add_wave", (left + 20, y, 125, 40), color((0, 140, 0)), "+ Wave", small_font, FG))
+    panel.add(Button("remove_wave", (left + 155, y, 125, 40), color((140, 0, 0)), "- Wave", small_font, FG))
+    y += 70
+    for name, text, c in (("test", "Stop test" if testing else "Test waves", (0, 120, 160)),
+                          ("clear", "Clear painted", (120, 80, 40)),
+                          ("save", "Saved" if saved else "Save", (0, 160, 160)),
+                          ("play", "Play", (100, 200, 100)),
+                          ("back", "Back", (200, 0, 0))):
+        panel.add(Button(name, (left + 20, y, PANEL_WIDTH - 40, 44), color(c), text, font, FG))
+        y += 54
+    status_label = panel.add(Label(small_font, "", FG, bottomleft=(10, SCREEN_HEIGHT - 10)))
+    ui = UI(panel)
+
+build_ui()
+
+def press(clicked, button):
+    global mode, testing, saved, running
+    if isinstance(clicked, tuple) and clicked[0] == "mode":
+        mode = clicked[1]
+    elif isinstance(clicked, tuple) and clicked[0] == "wave":
+        _, w, name = clicked
+        waves[w][name] = max(0, waves[w].get(name, 0) + (1 if button == 1 else -1))
+        saved = False
+        start_test()
+    elif clicked == "add_wave":
+        waves.append(dict(waves[-1]) if waves else {"Enemy": 10})
+        saved = False
+        start_test()
+    elif clicked == "remove_wave" and len(waves) > 1:
+        waves.pop()
+        saved = False
+        start_test()
+    elif clicked == "test":
+        testing = not testing
+        start_test()
+    elif clicked == "clear":
+        for i in mask.painted_tiles():
+            mask.painted[i] = 0
+        redraw_board(board.get_rect())
+    elif clicked == "save":
+        levels.save_level(levels.CUSTOM_LEVEL, level_data())
+        saved = True
+    elif clicked == "play":
+        levels.save_level(levels.CUSTOM_LEVEL, level_data())
+        scenes.goto("level1.py", f"--level={levels.CUSTOM_LEVEL}")
+        running = False
+    elif clicked == "back":
+        scenes.goto("level_select.py")
+        running = False
+    build_ui()
+
+controls = Controls((SCREEN_WIDTH, SCREEN_HEIGHT), (SCREEN_WIDTH, SCREEN_HEIGHT))
+clock = pygame.time.Clock()
+
+running = True
+while running:
+    events, mouse_pos = controls.poll()
+    for event in events:
+        if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+            scenes.goto("level_select.py")
+            running = False
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            pos = controls.to_logical(event.pos)
+            clicked = ui.hit(pos)
+            if clicked is not None:
+                press(clicked, event.button)
+            elif panel_rect.collidepoint(pos):
+                pass
+            elif mode == "path":
+                i = point_near(pos)
+                if event.button == 1 and i is not None:
+                    dragging = i
+                elif event.button == 1:
+                    j = segment_near(pos)
+                    if j is not None:
+                        edit_path("insert", j + 1, *pos)
+                        dragging = j + 1
+                elif event.button == 3 and i is not None and len(path.points) > 2:
+                    edit_path("remove", i)
+                saved = False
+            else:
+                painting = 1 if event.button == 1 else 0
+                saved = False
+        elif event.type == pygame.MOUSEBUTTONUP:
+            dragging = None
+            painting = None
+
+    if dragging is not None and tuple(mouse_pos) != path.points[dragging]:
+        edit_path("move", dragging, *mouse_pos)
+    if painting is not None and not panel_rect.collidepoint(mouse_pos):
+        paint(mouse_pos, painting)
+
+    if test:
+        test.tick()
+        if test.game_won:
+            start_test()
+
+    screen.blit(board, (0, 0))
+    if test:
+        for enemy in test.enemies:
+            pygame.draw.circle(screen, ENEMY_COLORS[ENEMY_KINDS.index(type(enemy))],
+                               (int(enemy.pos[0]), int(enemy.pos[1])), 12)
+    status_label.set_text(f"{len(path.points)} points, path {path.length:.0f}px, last edit {last_edit_ms:.2f}ms, "
+                          f"{clock.get_fps():.0f} fps" + (f", wave {min(test.current_wave, test.max_wave)}" if test else ""))
+    ui.draw(screen)
+    pygame.display.flip()
+    startup.first_frame(__file__)
+    clock.tick(60)
+
+scenes.exit()
@@ -0,0 +1,109 @@
+import bisect
+import math
+
+# Status effects applied by tower auras. An aura covers stretches of the path
+# (arc-length intervals, see pathing.py), so the path is cut into zones where
+# the set of active auras is constant. Each zone's combined Status is computed
+# once; an enemy only looks its status up again when it crosses into a new zone.
+
+# How several active effects of the same kind combine
+STACKING = {
+    "slow": "strongest",  # Only the strongest slow applies
+    "dot": "add",         # Damage over time from several sources adds up
+}
+
+
+class Status:
+    def __init__(self, speed_mult=1.0, dot=0.0, auras=frozenset()):
+        self.speed_mult = speed_mult  # Multiplier on the enemy's original speed
+        self.dot = dot                # HP lost per tick
+        self.auras = auras            # Indices of the auras covering this zone
+
+
+NO_STATUS = Status()
+
+
+def stack(kind, amounts):
+    rule = STACKING.get(kind, "strongest")
+    if rule == "add":
+        return sum(amounts)
+    # "strongest": smallest multiplier for slows, largest value for everything else
+    return min(amounts) if kind == "slow" else max(amounts)
+
+
+def combine(effects, auras):
+    by_kind = {}
+    for kind, amount in effects:
+        by_kind.setdefault(kind, []).append(amount)
+    speed_mult = stack("slow", by_kind["slow"]) if "slow" in by_kind else 1.0
+    dot = stack("dot", by_kind["dot"]) if "dot" in by_kind else 0.0
+    return Status(speed_mult, dot, auras)
+
+
+class AuraField:
+    def __init__(self):
+        self.auras = []    # (intervals, effects) per aura
+        self.bounds = []   # Sorted zone boundaries along the path
+        self.statuses = [NO_STATUS]
+        self.version = 0   # Bumped on every change so cached enemy lookups go stale
+        self.burning = set()  # Enemies currently taking damage over time
+
+    def add(self, intervals, effects):
+        # effects is a list of (kind, amount), e.g. [("slow", 0.35)]
+        self.auras.append((intervals, effects))
+        self._rebuild()
+
+    def clear(self):
+        self.auras = []
+        self.burning = set()
+        self._rebuild()
+
+    def _rebuild(self):
+        self.bounds = sorted({p for intervals, _ in self.auras for lo, hi in intervals for p in (lo, hi)})
+        # Zone k spans [bounds[k-1], bounds[k]); zone 0 is everything before the first boundary
+        cache = {}
+        self.statuses = [NO_STATUS]
+        for start in self.bounds:
+            active = frozenset(
+                i for i, (intervals, _) in enumerate(self.auras)
+                if any(lo <= start < hi for lo, hi in intervals)
+            )
+            if active not in cache:
+                effects = [effect for i in sorted(active) for effect in self.auras[i][1]]
+                cache[active] = combine(effects, active) if active else NO_STATUS
+            self.statuses.append(cache[active])
+        self.version += 1
+
+    def update(self, enemy):
+        # Called once per enemy per tick; only does work when the enemy entered a new zone.
+        # Returns True if the enemy's speed changed.
+        if enemy.progress < enemy.zone_end and enemy.zone_version == self.version:
+            return False
+        k = bisect.bisect_right(self.bounds, enemy.progress)
+        enemy.zone_end = self.bounds[k] if k < len(self.bounds) else math.inf
+        enemy.zone_version = self.version
+        status = self.statuses[k]
+        if status is enemy.status:
+            return False
+        # Aura enter/exit: swap the enemy's cached status
+        enemy.status = status
+        speed = enemy.speed
+        enemy.speed = enemy.original_speed * status.speed_mult
+        if status.dot > 0:
+            self.burning.add(enemy)
+        else:
+            self.burning.discard(enemy)
+        return enemy.speed != speed
+
+    def damage_tick(self):
+        # Applies damage over time; returns the enemies it killed
+        killed = []
+        for enemy in list(self.burning):
+            if not enemy.alive:
+                self.burning.discard(enemy)
+                continue
+            enemy.hp -= enemy.status.dot
+            if enemy.hp <= 0:
+                self.burning.discard(enemy)
+                killed.append(enemy)
+        return killed
@@ -0,0 +1,116 @@
+import heapq
+
+# Shared routing for open-field (maze) levels. The playfield is a grid; one
+# distance map from the exit (BFS over free cells) tells every enemy which way to
+# go, so moving an enemy costs one lookup no matter how many there are. Placing
+# a tower only repairs the part of the map that depended on the blocked cells.
+
+UNREACHABLE = 1 << 30
+
+
+class FlowField:
+    def __init__(self, cols, rows, cell, exit_cell):
+        self.cols, self.rows, self.cell = cols, rows, cell
+        self.exit = self.index(*exit_cell)
+        n = cols * rows
+        self.blocked = bytearray(n)
+        self.centers = [((i % cols) * cell + cell // 2, (i // cols) * cell + cell // 2) for i in range(n)]
+        self.neighbors = []
+        for i in range(n):
+            col, row = i % cols, i // cols
+            self.neighbors.append([
+                self.index(c, r) for c, r in ((col + 1, row), (col - 1, row), (col, row + 1), (col, row - 1))
+                if 0 <= c < cols and 0 <= r < rows
+            ])
+        self.dist = [UNREACHABLE] * n
+        self.next = [None] * n  # Center of the neighbouring cell one step closer to the exit
+        self.version = 0        # Bumped whenever the map changes
+        self._fill([self.exit])
+
+    def index(self, col, row):
+        return row * self.cols + col
+
+    def index_at(self, x, y):
+        col = min(self.cols - 1, max(0, int(x // self.cell)))
+        row = min(self.rows - 1, max(0, int(y // self.cell)))
+        return row * self.cols + col
+
+    def _fill(self, sources):
+        # Dijkstra with unit weights from cells whose distance is already correct
+        dist, blocked, neighbors = self.dist, self.blocked, self.neighbors
+        if self.exit in sources:
+            dist[self.exit] = 0
+        heap = [(dist[i], i) for i in sources]
+        heapq.heapify(heap)
+        changed = []
+        while heap:
+            d, i = heapq.heappop(heap)
+            if d > dist[i]:
+                continue
+            changed.append(i)
+            for j in neighbors[i]:
+                if not blocked[j] and d + 1 < dist[j]:
+                    dist[j] = d + 1
+                    heapq.heappush(heap, (d + 1, j))
+        self._refresh_next(changed)
+
+    def _refresh_next(self, cells):
+        dist, blocked, centers = self.dist, self.blocked, self.centers
+        for i in cells:
+            if blocked[i] or dist[i] >= UNREACHABLE:
+                self.next[i] = None
+            elif i == self.exit:
+                self.next[i] = centers[i]
+            else:
+                self.next[i] = centers[min(self.neighbors[i], key=lambda j: dist[j] if not blocked[j] else UNREACHABLE)]
+
+    def block(self, cells):
+        # Blocking can only make distances longer. Find every cell that lost its
+        # last downhill neighbour (in distance order, so supports are settled
+        # first), forget those distances and refill them from the intact border.
+        dist, blocked, neighbors = self.dist, self.blocked, self.neighbors
+        heap = []
+        for i in cells:
+            blocked[i] = 1
+            heap.extend((dist[j], j) for j in neighbors[i] if not blocked[j])
+            dist[i] = UNREACHABLE
+        heapq.heapify(heap)
+        invalid = set()
+        while heap:
+            d, i = heapq.heappop(heap)
+            if i in invalid or d >= UNREACHABLE or i == self.exit:
+                continue
+            if any(dist[j] == d - 1 and not blocked[j] and j not in invalid for j in neighbors[i]):
+                continue
+            invalid.add(i)
+            for j in neighbors[i]:
+                if dist[j] == d + 1 and not blocked[j]:
+                    heapq.heappush(heap, (d + 1, j))
+
+        border = set()
+        for i in invalid:
+            dist[i] = UNREACHABLE
+        for i in invalid:
+            border.update(j for j in neighbors[i] if not blocked[j] and j not in invalid and dist[j] < UNREACHABLE)
+        self._fill(list(border))
+        stale = set(invalid)
+        for i in list(invalid) + list(cells):
+            stale.update(neighbors[i])
+        stale.update(cells)
+        self._refresh_next(stale)
+        self.version += 1
+
+    def try_block(self, cells, must_reach, keep=True):
+        # Block cells unless that would cut any of must_reach off from the exit.
+        # With keep=False the map is left unchanged (placement preview).
+        if any(self.blocked[i] for i in cells) or self.exit in cells:
+            return False
+        saved = (self.dist[:], self.next[:], self.version)
+        self.block(cells)
+        ok = all(self.dist[i] < UNREACHABLE for i in must_reach)
+        if ok and keep:
+            return True
+        for i in cells:
+            self.blocked[i] = 0
+        self.dist, self.next, self.version = saved
+        return ok
@@ -0,0 +1,24 @@
+import os
+
+import pygame
+
+# Fonts shipped with the game, loaded with pygame.font.Font. pygame.font.SysFont
+# enumerates every installed font (fc-list on Linux) the first time it is used,
+# which costs hundreds of milliseconds per process.
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+FACES = {
+    None: None,  # pygame's built-in default font (what SysFont(None, ...) gave us)
+    "Arial": os.path.join(FONT_DIR, "Lato-Regular.ttf"),  # Visual fallback only; its metrics differ from Arial
+}
+
+_cache = {}
+
+
+def get(face, size):
+    # Shared font objects per (face, size)
+    key = (face, size)
+    font = _cache.get(key)
+    if font is None:
+        font = pygame.font.Font(FACES[face], size)
+        _cache[key] = font
+    return font
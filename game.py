@@ -0,0 +1,874 @@
+import copy
+import math
+import os
+import random
+import struct
+from operator import attrgetter
+
+from pathing import ProgressOrder, covers
+from effects import AuraField, NO_STATUS, combine
+from dps import NO_DPS
+from flowfield import FlowField
+
+# Level simulation: towers, enemies, bullets, waves and the placement/puzzle flow.
+# Nothing in here touches the display, so a level can also be stepped without a
+# window. level1.py draws the state and turns mouse clicks into actions.
+
+TOWER_TYPES = [
+    {
+        "name": "Blue",
+        "color": (0, 0, 200),
+        "range": 140,
+        "cooldown": 60,
+        "fire_rate": 60,
+        "acquire_delay": int(1.5 * 60),
+        "aura": [("slow", 0.35)],  # Slow to 35% speed
+    },
+    {
+        "name": "Red",
+        "color": (200, 0, 0),
+        "range": 70,
+        "cooldown": 30,
+        "fire_rate": 30,
+        "acquire_delay": int(1.0 * 60),
+    },
+    {
+        "name": "Green",
+        "color": (0, 180, 0),
+        "range": 180,
+        "cooldown": 90,
+        "fire_rate": 90,
+        "acquire_delay": int(2.0 * 60),
+    },
+    {
+        "name": "Yellow",
+        "color": (200, 200, 0),
+        "range": 100,
+        "cooldown": 45,
+        "fire_rate": 45,
+        "acquire_delay": int(1.2 * 60),
+    },
+]
+
+# Which enemy in range a tower picks when it acquires a new target
+TARGET_PRIORITIES = ["first", "last", "strongest", "closest"]
+
+PLACE_COOLDOWN = 120  # Frames before the same tower type can be placed again
+RETARGET_DELAY = int(1.5 * 60)  # Frames a tower aims at a newly picked target before firing
+SPAWN_SPACING = 20   # Extra frames between the enemies of a wave, per place in the queue
+SPAWN_INTERVAL = 30  # Base frames between spawns
+HIT_DISTANCE = 20    # Added to a bullet's radius: how close counts as a hit
+PATH_CLEARANCE = 40  # How far towers stay from the path and from each other
+
+
+def tower_dps(ttype):
+    # Damage per second of a tower type that always has a target: one damage per bullet,
+    # a shot every fire_rate + 1 frames, 60 frames a second. Blue towers don't shoot.
+    if ttype == 0:
+        return 0.0
+    return 60 / (TOWER_TYPES[ttype]["fire_rate"] + 1)
+
+
+def near_path(points, x, y, clearance=PATH_CLEARANCE):
+    # Whether (x, y) is within clearance of the polyline through points
+    for i in range(len(points) - 1):
+        x1, y1 = points[i]
+        x2, y2 = points[i + 1]
+        px, py = x, y
+        dx, dy = x2 - x1, y2 - y1
+        if dx == dy == 0:
+            dist = math.hypot(px - x1, py - y1)
+        else:
+            t = max(0, min(1, ((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy)))
+            proj_x = x1 + t * dx
+            proj_y = y1 + t * dy
+            dist = math.hypot(px - proj_x, py - proj_y)
+        if dist < clearance:
+            return True
+    return False
+
+
+class Tower:
+    def __init__(self, x, y, ttype, path):
+        self.x, self.y = x, y
+        self.type = ttype
+        self.range = TOWER_TYPES[ttype]["range"]
+        self.cooldown = TOWER_TYPES[ttype]["cooldown"]
+        self.fire_rate = TOWER_TYPES[ttype]["fire_rate"]
+        self.acquire_delay = TOWER_TYPES[ttype]["acquire_delay"]
+        self.target = None
+        self.priority = TARGET_PRIORITIES[0]
+        # Stretches of the path (as arc-length intervals) inside this tower's range
+        self.coverage = path.circle_intervals(x, y, self.range) if path else []
+
+    def in_range(self, enemy):
+        return covers(self.coverage, enemy.progress)
+
+    def select_target(self, order):
+        # Only enemies inside the coverage intervals are looked at
+        spans = [order.span(lo, hi) for lo, hi in self.coverage]
+        if self.priority == "first":
+            for start, end in reversed(spans):
+                if start < end:
+                    return order.enemies[end - 1]
+        elif self.priority == "last":
+            for start, end in spans:
+                if start < end:
+                    return order.enemies[start]
+        else:
+            candidates = [enemy for start, end in spans for enemy in order.enemies[start:end]]
+            if candidates:
+                if self.priority == "strongest":
+                    return max(candidates, key=lambda e: (e.hp, e.progress))
+                return min(candidates, key=lambda e: math.hypot(e.pos[0] - self.x, e.pos[1] - self.y))
+        return None
+
+    def shoot(self, order, bullets, make_bullet=None):
+        # Blue tower (type 0) does not shoot
+        if self.type == 0:
+            return
+        if self.target is not None and (
+            not self.target.alive or not self.in_range(self.target)
+        ):
+            self.target = None
+            self.acquire_delay = 0
+
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return
+
+        if self.target is None:
+            self.target = self.select_target(order)
+            if self.target is not None:
+                self.acquire_delay = RETARGET_DELAY
+
+        if self.target:
+            if self.acquire_delay > 0:
+                self.acquire_delay -= 1
+                return
+            if not any(bullet.target == self.target and bullet.x == self.x and bullet.y == self.y for bullet in bullets):
+                bullets.append((make_bullet or Bullet)(self.x, self.y, self.target))
+                self.cooldown = self.fire_rate
+
+
+class MazeTower(Tower):
+    # Open-field levels have no path to precompute coverage on, so range is checked directly
+    def __init__(self, x, y, ttype):
+        super().__init__(x, y, ttype, None)
+
+    def in_range(self, enemy):
+        return math.hypot(enemy.pos[0] - self.x, enemy.pos[1] - self.y) <= self.range
+
+    def select_target(self, order):
+        # order.enemies is sorted by progress, i.e. furthest from the exit first
+        candidates = [enemy for enemy in order.enemies if self.in_range(enemy)]
+        if not candidates:
+            return None
+        if self.priority == "first":
+            return candidates[-1]
+        if self.priority == "last":
+            return candidates[0]
+        if self.priority == "strongest":
+            return max(candidates, key=lambda e: (e.hp, e.progress))
+        return min(candidates, key=lambda e: math.hypot(e.pos[0] - self.x, e.pos[1] - self.y))
+
+
+class Enemy:
+    def __init__(self, path):
+        self.path = path
+        self.pos = list(path[0])
+        self.path_index = 0
+        self.progress = 0.0  # Distance travelled along the path
+        self.alive = True
+        self.speed = 1  # Slower base enemy
+        self.hp = 1
+        self.original_speed = self.speed
+        self.spawn_offset = 0  # Frames to wait at the head of the spawn queue
+        # Cached aura status, refreshed by AuraField.update when crossing a zone boundary
+        self.status = NO_STATUS
+        self.zone_end = 0.0
+        self.zone_version = -1
+
+    def update(self):
+        if self.path_index < len(self.path) - 1:
+            target = self.path[self.path_index + 1]
+            dx, dy = target[0] - self.pos[0], target[1] - self.pos[1]
+            dist = (dx**2 + dy**2) ** 0.5
+            if dist < self.speed:
+                self.pos = list(target)
+                self.path_index += 1
+                self.progress += dist
+            else:
+                self.pos[0] += self.speed * dx / dist
+                self.pos[1] += self.speed * dy / dist
+                self.progress += self.speed
+
+
+class FastEnemy(Enemy):
+    def __init__(self, path):
+        super().__init__(path)
+        self.speed = 2  # Faster
+        self.original_speed = self.speed
+
+
+class DurableEnemy(Enemy):
+    def __init__(self, path):
+        super().__init__(path)
+        self.hp = 3
+        self.speed = 1
+        self.original_speed = self.speed
+
+
+class Bullet:
+    def __init__(self, x, y, target):
+        self.x = x
+        self.y = y
+        self.target = target
+        self.speed = 8
+        self.radius = 8
+
+    def update(self):
+        if not self.target:
+            return
+        dx = self.target.pos[0] - self.x
+        dy = self.target.pos[1] - self.y
+        dist = math.hypot(dx, dy)
+        if dist < self.speed or dist == 0:
+            self.x, self.y = self.target.pos[0], self.target.pos[1]
+        else:
+            self.x += self.speed * dx / dist
+            self.y += self.speed * dy / dist
+
+
+class ScheduledBullet:
+    # Bullet of a Game(predict_hits=True). When it's fired, the game flies a copy of it at a copy
+    # of its target (see Game.predict) and records its position per tick up to the tick of impact.
+    # In between the simulation never touches it; x and y are looked up in the track.
+    speed = 8
+    radius = 8
+
+    def __init__(self, game, target, serial):
+        self.game = game
+        self.target = target
+        self.serial = serial  # Order in game.bullets, which is the order hits are resolved in
+        self.track = []       # Position before the first step, then after each tick's step
+        self.start = 0        # Tick of the first step
+        self.due = None       # Tick of impact (None for a bullet without a target, which never lands)
+
+    def position(self, tick):
+        # Where the bullet is once the bullets of tick have moved
+        return self.track[max(0, min(tick - self.start + 1, len(self.track) - 1))]
+
+    @property
+    def x(self):
+        return self.position(self.game.bullet_tick)[0]
+
+    @property
+    def y(self):
+        return self.position(self.game.bullet_tick)[1]
+
+
+# --- Snapshots ---
+# Little-endian struct records. Enemies are written once (live ones first, then
+# the spawn queue) and towers/bullets refer to them by index. A bullet can still
+# be flying at an enemy that already died; those are stored as "ghost" positions.
+SNAPSHOT_MAGIC = b"DFS2"
+SNAPSHOT_MAGIC_V1 = b"DFS1"  # Integer tower positions; still read, for older saves and recordings
+KIND_REC = struct.Struct("<8s")  # Level type the snapshot belongs to (Game.KIND)
+ENEMY_KINDS = [Enemy, FastEnemy, DurableEnemy]
+ENEMY_BY_NAME = {kind.__name__: kind for kind in ENEMY_KINDS}
+RNG_STATE = struct.Struct("<i625I?d")
+HEADER = struct.Struct("<5i3?Ii")  # lives, score, wave, max wave, spawn cooldown, flags, ticks, last puzzle
+COUNTS = struct.Struct("<5H")      # towers, enemies, queued, ghosts, bullets
+TOWER_REC = struct.Struct("<ddBiiBi")  # Towers can stand anywhere, not just on whole pixels
+TOWER_REC_V1 = struct.Struct("<iiBiiBi")
+ENEMY_REC = struct.Struct("<BddHddi")
+GHOST_REC = struct.Struct("<dd")
+BULLET_REC = struct.Struct("<ddBi")
+NO_TARGET, LIVE_TARGET, GHOST_TARGET = 0, 1, 2
+
+
+def snapshot_kind(data):
+    # Level type of a snapshot, so the right kind of level can be started to resume it
+    if data[:len(SNAPSHOT_MAGIC)] not in (SNAPSHOT_MAGIC, SNAPSHOT_MAGIC_V1) or len(data) < len(SNAPSHOT_MAGIC) + KIND_REC.size:
+        raise ValueError("not a DEFEND.EXE snapshot")
+    return KIND_REC.unpack_from(data, len(SNAPSHOT_MAGIC))[0].rstrip(b"\0").decode()
+
+
+# Enemies per wave, by class name (levels made in editor.py bring their own)
+WAVES = [
+    {"Enemy": 15},
+    {"Enemy": 15, "FastEnemy": 5},
+    {"Enemy": 15, "FastEnemy": 10, "DurableEnemy": 5},
+]
+
+
+class Game:
+    KIND = "path"
+
+    def __init__(self, path, puzzles, seed=None, waves=None, build_mask=None, predict_hits=False):
+        self.path = path  # CompiledPath
+        self.puzzles = puzzles
+        self.waves = waves or WAVES
+        self.build_mask = build_mask  # BuildMask with tiles painted unbuildable, or None
+        self.rng = random.Random(seed)
+        self.enemy_order = ProgressOrder()
+        self.aura_field = AuraField()
+        self.dps = NO_DPS  # DPS along the path from the placed towers (see dps.py)
+        self.towers = []
+        self.enemies = []
+        self.bullets = []
+        self.lives = 3
+        self.score = 0
+        self.current_wave = 1
+        self.max_wave = len(self.waves)
+        self.enemies_to_spawn = []
+        self.spawn_cooldown = 0
+        self.wave_in_progress = False
+        self.game_won = False
+        self.game_lost = False
+        self.ticks = 0
+        self.events = []  # ("hit" | "kill" | "leak", x, y) from the last tick, for effects
+        # predict_hits: bullets land on a tick worked out when they're fired (ScheduledBullet),
+        # instead of being moved and hit-tested every tick. Same results either way.
+        self.predict_hits = predict_hits
+        self.impacts = {}   # Tick -> scheduled bullets landing then
+        self.incoming = {}  # Enemy -> scheduled bullets aimed at it
+        self.bullet_tick = 0  # Last tick whose bullets have moved, for ScheduledBullet positions
+        self.bullet_serial = 0
+        self.tower_place_cooldowns = [0 for _ in TOWER_TYPES]  # Per-tower-type cooldown
+        self.last_puzzle_index = None  # For random puzzle selection
+        self.clear_placement()
+
+    def clear_placement(self):
+        # Placement and puzzle flow in progress; not part of a snapshot
+        self.selected_tower_type = None
+        self.placing_tower = False
+        self.placement_preview = None
+        self.dragging = False
+        self.puzzle_active = False
+        self.current_puzzle = None
+        self.puzzle_result = None  # None, True, False or "invalid"
+
+    def placement_idle(self):
+        # Nothing in progress that a snapshot would lose
+        return (self.selected_tower_type is None and not self.placing_tower
+                and not self.puzzle_active and self.puzzle_result is None)
+
+    def enemy_route(self):
+        # Waypoints handed to new enemies
+        return self.path.points
+
+    def snap(self, x, y):
+        # Where a tower asked for at (x, y) actually ends up
+        return x, y
+
+    def setup_wave(self, wave):
+        points = self.enemy_route()
+        counts = self.waves[wave - 1] if 1 <= wave <= len(self.waves) else {}
+        wave_list = [ENEMY_BY_NAME[name](points) for name, n in counts.items() for _ in range(n)]
+        self.rng.shuffle(wave_list)
+        # Add spawn_offset to each enemy so they spawn apart
+        for i, enemy in enumerate(wave_list):
+            enemy.spawn_offset = i * SPAWN_SPACING
+        return wave_list
+
+    def is_valid_tower_position(self, x, y, ttype):
+        for tower in self.towers:
+            if math.hypot(tower.x - x, tower.y - y) < PATH_CLEARANCE:
+                return False
+        if self.build_mask and self.build_mask.painted_at(x, y):
+            return False
+        return not near_path(self.path.points, x, y)
+
+    def add_tower(self, x, y, ttype):
+        tower = self.make_tower(x, y, ttype)
+        self.towers.append(tower)
+        self.dps = self.dps.with_tower(tower.coverage, tower_dps(ttype))
+        if "aura" in TOWER_TYPES[ttype]:
+            self.add_aura(tower, TOWER_TYPES[ttype]["aura"])
+        return tower
+
+    def make_tower(self, x, y, ttype):
+        return Tower(x, y, ttype, self.path)
+
+    def add_aura(self, tower, effects):
+        self.aura_field.add(tower.coverage, effects)
+
+    def reset_towers(self):
+        self.towers = []
+        self.dps = NO_DPS
+        self.aura_field.clear()
+
+    # --- Puzzles ---
+    def get_shuffled_puzzle(self, puzzle):
+        # Shuffle puzzle options and update the answer index
+        zipped = list(enumerate(puzzle["options"]))
+        self.rng.shuffle(zipped)
+        return {
+            "question": puzzle["question"],
+            "options": [opt for idx, opt in zipped],
+            "answer": [i for i, (orig_idx, _) in enumerate(zipped) if orig_idx == puzzle["answer"]][0],
+        }
+
+    def start_puzzle(self):
+        # Pick a random puzzle, not the same as last time if possible
+        available = [i for i in range(len(self.puzzles)) if i != self.last_puzzle_index]
+        if not available:
+            available = list(range(len(self.puzzles)))
+        idx = self.rng.choice(available)
+        self.current_puzzle = self.get_shuffled_puzzle(self.puzzles[idx])
+        self.last_puzzle_index = idx
+        self.puzzle_active = True
+
+    def end_placement(self, ttype):
+        self.placing_tower = False
+        self.placement_preview = None
+        self.dragging = False
+        self.tower_place_cooldowns[ttype] = PLACE_COOLDOWN  # 2 seconds for this tower
+        self.puzzle_active = False
+
+    # --- Actions (see level1.event_to_action) ---
+    def apply_action(self, action):
+        kind = action[0]
+
+        if kind == "answer":
+            if not (self.puzzle_active and self.current_puzzle):
+                return
+            preview = self.placement_preview
+            ttype = preview[2] if preview else 0
+            if action[1] == self.current_puzzle["answer"]:
+                if self.is_valid_tower_position(preview[0], preview[1], ttype):
+                    self.add_tower(preview[0], preview[1], ttype)
+                    self.puzzle_result = True
+                    self.end_placement(ttype)
+                else:
+                    self.puzzle_result = "invalid"
+                    # Re-shuffle puzzle for next attempt
+                    self.start_puzzle()
+            else:
+                self.puzzle_result = False
+                self.end_placement(ttype)
+
+        elif kind in ("drag", "release"):
+            if self.dragging and self.placement_preview:
+                self.placement_preview[0] = action[1]
+                self.placement_preview[1] = action[2]
+            self.dragging = self.dragging and kind == "drag"
+        elif self.puzzle_active or self.game_won or self.game_lost:
+            return
+        elif kind == "select_tower":
+            if not self.placing_tower and self.tower_place_cooldowns[action[1]] == 0:
+                self.selected_tower_type = action[1]
+        elif kind == "cycle_priority":
+            tower = self.towers[action[1]]
+            tower.priority = TARGET_PRIORITIES[(TARGET_PRIORITIES.index(tower.priority) + 1) % len(TARGET_PRIORITIES)]
+        elif kind == "place":
+            if not self.placing_tower and self.selected_tower_type is not None:
+                self.placing_tower = True
+                self.placement_preview = [action[1], action[2], self.selected_tower_type]
+                self.dragging = True
+                self.selected_tower_type = None
+        elif not self.placing_tower:
+            return
+        elif kind == "accept":
+            if self.tower_place_cooldowns[self.placement_preview[2]] == 0:
+                self.start_puzzle()
+                self.puzzle_result = None
+        elif kind == "cancel":
+            self.placing_tower = False
+            self.placement_preview = None
+            self.dragging = False
+        elif kind == "grab":
+            px, py = self.placement_preview[0], self.placement_preview[1]
+            if px - 20 <= action[1] < px + 20 and py - 20 <= action[2] < py + 20:
+                self.dragging = True
+
+    # --- One simulation frame ---
+    def tick(self):
+        self.ticks += 1
+        self.events.clear()
+        self.update_waves()
+        if not self.game_won and not self.game_lost:
+            self.update_entities()
+
+        for i in range(len(self.tower_place_cooldowns)):
+            if self.tower_place_cooldowns[i] > 0:
+                self.tower_place_cooldowns[i] -= 1
+        if self.puzzle_result is not None and self.tower_place_cooldowns[0] == 0:
+            self.puzzle_result = None
+
+    def update_waves(self):
+        if self.game_won or self.game_lost:
+            return
+        if not self.wave_in_progress and not self.enemies and not self.enemies_to_spawn:
+            if self.current_wave <= self.max_wave:
+                self.enemies_to_spawn = self.setup_wave(self.current_wave)
+                self.wave_in_progress = True
+                self.spawn_cooldown = 0
+            else:
+                self.game_won = True
+                return
+
+        if self.wave_in_progress and self.enemies_to_spawn:
+            self.spawn_cooldown -= 1
+            if self.spawn_cooldown <= 0:
+                # Only spawn if the next enemy's offset is reached
+                if self.enemies_to_spawn[0].spawn_offset > 0:
+                    self.enemies_to_spawn[0].spawn_offset -= 1
+                    self.spawn_cooldown = 1  # Check again next frame
+                else:
+                    self.enemies.append(self.enemies_to_spawn.pop(0))
+                    self.spawn_cooldown = SPAWN_INTERVAL
+
+        if self.wave_in_progress and not self.enemies_to_spawn and not self.enemies:
+            self.current_wave += 1
+            self.wave_in_progress = False
+
+    def kill(self, enemy):
+        self.events.append(("kill", enemy.pos[0], enemy.pos[1]))
+        enemy.alive = False
+        self.enemies.remove(enemy)
+        self.score += 1
+        if enemy in self.incoming:
+            self.repredict(enemy)  # It stops moving
+
+    def leak(self, enemy):
+        self.events.append(("leak", enemy.pos[0], enemy.pos[1]))
+        enemy.alive = False
+        self.enemies.remove(enemy)
+        self.lives -= 1
+        if self.lives <= 0:
+            self.game_lost = True
+
+    def update_entities(self):
+        self.apply_auras()
+        self.enemy_order.rebuild(self.enemies)
+        if self.predict_hits:
+            fire = self.fire
+            for tower in self.towers:
+                tower.shoot(self.enemy_order, self.bullets, fire)
+            self.resolve_hits()
+            self.bullet_tick = self.ticks
+            self.move_enemies()
+            return
+        for tower in self.towers:
+            tower.shoot(self.enemy_order, self.bullets)
+
+        for bullet in self.bullets[:]:
+            bullet.update()
+            target = bullet.target
+            if target and math.hypot(bullet.x - target.pos[0], bullet.y - target.pos[1]) < bullet.radius + HIT_DISTANCE:
+                if target.alive:
+                    self.events.append(("hit", bullet.x, bullet.y))
+                    target.hp -= 1
+                    if target.hp <= 0:
+                        self.kill(target)
+                self.bullets.remove(bullet)
+
+        self.move_enemies()
+
+    def apply_auras(self):
+        # --- Tower auras (Blue tower slow) ---
+        for enemy in self.enemies:
+            if self.aura_field.update(enemy) and enemy in self.incoming:
+                self.repredict(enemy)
+        for enemy in self.aura_field.damage_tick():
+            self.kill(enemy)
+
+    # --- Predicted hits (predict_hits=True) ---
+    def fire(self, x, y, target):
+        bullet = ScheduledBullet(self, target, self.bullet_serial)
+        self.bullet_serial += 1
+        self.schedule(bullet, x, y, self.ticks)
+        return bullet
+
+    def schedule(self, bullet, x, y, tick):
+        # Flies the bullet from (x, y), first stepping on tick, until it lands
+        bullet.track, bullet.start = self.predict(x, y, bullet.target), tick
+        bullet.due = tick + len(bullet.track) - 2
+        self.impacts.setdefault(bullet.due, []).append(bullet)
+        self.incoming.setdefault(bullet.target, []).append(bullet)
+
+    def predict(self, x, y, target):
+        # Positions of a bullet fired from (x, y), one per tick until the hit test passes. The
+        # target is assumed to keep its current speed (apply_auras re-plans when it doesn't);
+        # stepping copies with Bullet.update and Enemy.update gives exactly the per-tick result.
+        probe = Bullet(x, y, copy.copy(target))
+        shadow = probe.target
+        shadow.pos = list(target.pos)
+        track = [(x, y)]
+        while True:
+            probe.update()
+            track.append((probe.x, probe.y))
+            if math.hypot(probe.x - shadow.pos[0], probe.y - shadow.pos[1]) < probe.radius + HIT_DISTANCE:
+                return track
+            if target.alive:
+                shadow.update()
+
+    def repredict(self, enemy):
+        # The enemy's motion changed this tick: re-plan the bullets still flying at it
+        for bullet in self.incoming.pop(enemy):
+            if bullet.due == self.ticks:
+                # Lands this tick, before the change could matter
+                self.incoming.setdefault(enemy, []).append(bullet)
+                continue
+            self.impacts[bullet.due].remove(bullet)
+            self.schedule(bullet, *bullet.position(self.ticks - 1), self.ticks)
+
+    def resolve_hits(self):
+        # Bullets landing this tick, in the order the per-tick loop would reach them
+        due = self.impacts.pop(self.ticks, None)
+        if not due:
+            return
+        due.sort(key=attrgetter("serial"))
+        for bullet in due:
+            target = bullet.target
+            aimed = self.incoming[target]
+            aimed.remove(bullet)
+            if not aimed:
+                del self.incoming[target]
+            if target.alive:
+                x, y = bullet.track[-1]
+                self.events.append(("hit", x, y))
+                target.hp -= 1
+                if target.hp <= 0:
+                    self.kill(target)
+            self.bullets.remove(bullet)
+
+    def move_enemies(self):
+        for enemy in self.enemies[:]:
+            enemy.update()
+            if enemy.path_index == len(enemy.path) - 1:
+                self.leak(enemy)
+
+    # --- Snapshots ---
+    def snapshot(self):
+        # Everything needed to continue the level exactly where it is, as bytes
+        out = bytearray(SNAPSHOT_MAGIC)
+        out += KIND_REC.pack(self.KIND.encode())
+        version, internal, gauss = self.rng.getstate()
+        out += RNG_STATE.pack(version, *internal, gauss is not None, gauss or 0.0)
+        out += HEADER.pack(
+            self.lives, self.score, self.current_wave, self.max_wave, self.spawn_cooldown,
+            self.wave_in_progress, self.game_won, self.game_lost, self.ticks,
+            -1 if self.last_puzzle_index is None else self.last_puzzle_index,
+        )
+        out += struct.pack("<%di" % len(TOWER_TYPES), *self.tower_place_cooldowns)
+
+        enemies = self.enemies + self.enemies_to_spawn
+        index = {id(enemy): i for i, enemy in enumerate(enemies)}
+        ghosts = []
+        ghost_index = {}
+        for bullet in self.bullets:
+            if bullet.target is not None and id(bullet.target) not in index and id(bullet.target) not in ghost_index:
+                ghost_index[id(bullet.target)] = len(ghosts)
+                ghosts.append(bullet.target)
+
+        out += COUNTS.pack(len(self.towers), len(self.enemies), len(self.enemies_to_spawn), len(ghosts), len(self.bullets))
+        for tower in self.towers:
+            target = index.get(id(tower.target), -1) if tower.target is not None else -1
+            out += TOWER_REC.pack(tower.x, tower.y, tower.type, tower.cooldown, tower.acquire_delay,
+                                  TARGET_PRIORITIES.index(tower.priority), target)
+        for enemy in enemies:
+            out += ENEMY_REC.pack(ENEMY_KINDS.index(type(enemy)), enemy.pos[0], enemy.pos[1], enemy.path_index,
+                                  enemy.progress, enemy.hp, enemy.spawn_offset)
+        for ghost in ghosts:
+            out += GHOST_REC.pack(ghost.pos[0], ghost.pos[1])
+        for bullet in self.bullets:
+            if bullet.target is None:
+                kind, target = NO_TARGET, -1
+            elif id(bullet.target) in index:
+                kind, target = LIVE_TARGET, index[id(bullet.target)]
+            else:
+                kind, target = GHOST_TARGET, ghost_index[id(bullet.target)]
+            out += BULLET_REC.pack(bullet.x, bullet.y, kind, target)
+        return bytes(out)
+
+    def restore(self, data):
+        # Inverse of snapshot(); raises ValueError on data that isn't a snapshot
+        if snapshot_kind(data) != self.KIND:
+            raise ValueError(f"snapshot is for a {snapshot_kind(data)} level, not {self.KIND}")
+        view = memoryview(data)
+        offset = len(SNAPSHOT_MAGIC) + KIND_REC.size
+
+        def take(record, count=1):
+            nonlocal offset
+            values = [record.unpack_from(view, offset + i * record.size) for i in range(count)]
+            offset += record.size * count
+            return values
+
+        try:
+            rng = take(RNG_STATE)[0]
+            (lives, score, current_wave, max_wave, spawn_cooldown,
+             wave_in_progress, game_won, game_lost, ticks, last_puzzle) = take(HEADER)[0]
+            cooldowns = take(struct.Struct("<%di" % len(TOWER_TYPES)))[0]
+            n_towers, n_live, n_queued, n_ghosts, n_bullets = take(COUNTS)[0]
+            tower_recs = take(TOWER_REC if data[:len(SNAPSHOT_MAGIC)] == SNAPSHOT_MAGIC else TOWER_REC_V1, n_towers)
+            enemy_recs = take(ENEMY_REC, n_live + n_queued)
+            ghost_recs = take(GHOST_REC, n_ghosts)
+            bullet_recs = take(BULLET_REC, n_bullets)
+        except struct.error as e:
+            raise ValueError("truncated snapshot") from e
+
+        self.rng.setstate((rng[0], tuple(rng[1:626]), rng[627] if rng[626] else None))
+        self.lives, self.score = lives, score
+        self.current_wave, self.max_wave = current_wave, max_wave
+        self.spawn_cooldown = spawn_cooldown
+        self.wave_in_progress, self.game_won, self.game_lost = wave_in_progress, game_won, game_lost
+        self.ticks = ticks
+        self.last_puzzle_index = None if last_puzzle < 0 else last_puzzle
+        self.tower_place_cooldowns = list(cooldowns)
+
+        enemies = []
+        for kind, x, y, path_index, progress, hp, spawn_offset in enemy_recs:
+            enemy = ENEMY_KINDS[kind](self.enemy_route())
+            enemy.pos = [x, y]
+            enemy.path_index = path_index
+            enemy.progress = progress
+            enemy.hp = int(hp) if hp.is_integer() else hp
+            enemy.spawn_offset = spawn_offset
+            enemies.append(enemy)
+        self.enemies = enemies[:n_live]
+        self.enemies_to_spawn = enemies[n_live:]
+
+        ghosts = []
+        for x, y in ghost_recs:
+            ghost = Enemy(self.enemy_route())
+            ghost.pos = [x, y]
+            ghost.alive = False
+            ghosts.append(ghost)
+
+        self.reset_towers()
+        for x, y, ttype, cooldown, acquire_delay, priority, target in tower_recs:
+            tower = self.add_tower(x, y, ttype)
+            tower.cooldown = cooldown
+            tower.acquire_delay = acquire_delay
+            tower.priority = TARGET_PRIORITIES[priority]
+            tower.target = enemies[target] if target >= 0 else None
+
+        self.bullets = []
+        self.impacts, self.incoming = {}, {}
+        self.bullet_tick = self.ticks
+        for x, y, kind, target in bullet_recs:
+            bullet = Bullet(x, y, None)
+            if kind == LIVE_TARGET:
+                bullet.target = enemies[target]
+            elif kind == GHOST_TARGET:
+                bullet.target = ghosts[target]
+            if self.predict_hits:
+                bullet = self.resume_bullet(bullet)
+            self.bullets.append(bullet)
+
+        self.enemy_order.rebuild(self.enemies)  # Drawing culls through it before the next tick does
+        self.clear_placement()
+
+    def resume_bullet(self, bullet):
+        # A restored bullet, scheduled from where it was
+        scheduled = ScheduledBullet(self, bullet.target, self.bullet_serial)
+        self.bullet_serial += 1
+        if bullet.target is None:
+            scheduled.track = [(bullet.x, bullet.y)]  # Never moves, like Bullet.update without a target
+        else:
+            self.schedule(scheduled, bullet.x, bullet.y, self.ticks + 1)
+        return scheduled
+
+    def save(self, filename):
+        # Write to a temp file first so a crash mid-save can't leave a broken save behind
+        tmp = filename + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.snapshot())
+        os.replace(tmp, filename)
+
+    def load(self, filename):
+        with open(filename, "rb") as f:
+            self.restore(f.read())
+
+
+class MazeGame(Game):
+    # Open field: towers block grid cells and enemies follow a shared flow field
+    # (see flowfield.py) around them instead of walking a fixed path.
+    KIND = "maze"
+
+    def __init__(self, maze, puzzles, seed=None):
+        self.maze = maze
+        self.reset_field()
+        super().__init__(None, puzzles, seed)
+
+    def reset_field(self):
+        maze = self.maze
+        self.field = FlowField(maze["cols"], maze["rows"], maze["cell"], maze["exit"])
+        self.spawn = self.field.index(*maze["spawn"])
+        self.auras = []                                  # Effects per aura tower
+        self.cell_status = [NO_STATUS] * len(self.field.dist)
+        self.status_cache = {}
+
+    def reset_towers(self):
+        self.towers = []
+        self.reset_field()
+
+    def enemy_route(self):
+        centers = self.field.centers
+        return [centers[self.spawn], centers[self.field.exit]]
+
+    def snap(self, x, y):
+        return self.field.centers[self.field.index_at(x, y)]
+
+    def is_valid_tower_position(self, x, y, ttype):
+        field = self.field
+        if not (0 <= x < field.cols * field.cell and 0 <= y < field.rows * field.cell):
+            return False
+        i = field.index_at(x, y)
+        # The spawn, the exit and every cell holding an enemy must stay connected
+        must_reach = {self.spawn} | {field.index_at(*enemy.pos) for enemy in self.enemies}
+        if i in must_reach:
+            return False
+        return field.try_block([i], must_reach, keep=False)
+
+    def make_tower(self, x, y, ttype):
+        x, y = self.snap(x, y)
+        self.field.block([self.field.index_at(x, y)])
+        return MazeTower(x, y, ttype)
+
+    def add_aura(self, tower, effects):
+        # Auras are baked into a per-cell status grid, looked up like the flow field
+        aura = len(self.auras)
+        self.auras.append(effects)
+        for i, (cx, cy) in enumerate(self.field.centers):
+            if math.hypot(cx - tower.x, cy - tower.y) <= tower.range:
+                active = self.cell_status[i].auras | {aura}
+                if active not in self.status_cache:
+                    self.status_cache[active] = combine([e for a in sorted(active) for e in self.auras[a]], active)
+                self.cell_status[i] = self.status_cache[active]
+
+    def apply_auras(self):
+        index_at = self.field.index_at
+        for enemy in self.enemies[:]:
+            status = self.cell_status[index_at(enemy.pos[0], enemy.pos[1])]
+            if status is not enemy.status:
+                enemy.status = status
+                enemy.speed = enemy.original_speed * status.speed_mult
+            if status.dot > 0:
+                enemy.hp -= status.dot
+                if enemy.hp <= 0:
+                    self.kill(enemy)
+
+    def move_enemies(self):
+        field = self.field
+        dist, steps, index_at = field.dist, field.next, field.index_at
+        for enemy in self.enemies[:]:
+            i = index_at(enemy.pos[0], enemy.pos[1])
+            target = steps[i]
+            if target is not None:
+                dx, dy = target[0] - enemy.pos[0], target[1] - enemy.pos[1]
+                d = math.hypot(dx, dy)
+                if d <= enemy.speed:
+                    enemy.pos = list(target)
+                else:
+                    enemy.pos[0] += enemy.speed * dx / d
+                    enemy.pos[1] += enemy.speed * dy / d
+                i = index_at(enemy.pos[0], enemy.pos[1])
+            # Closer to the exit = further along, so the "first"/"last" priorities still work
+            enemy.progress = -float(dist[i] * field.cell)
+            if i == field.exit:
+                self.leak(enemy)
@@ -1,13 +1,31 @@
+import startup
 import pygame
 import sys
-import time
-import math
 import json
 import os
-import subprocess
-import random
+import time
+from widgets import Label, Button, Overlay, Layer, Dialog, UI
+from controls import Controls
+from particles import Particles
+from pathing import CompiledPath
+from camera import Camera, world_size, PAN_SPEED
+from game import Game, MazeGame, TOWER_TYPES, TARGET_PRIORITIES, Enemy, FastEnemy, DurableEnemy, tower_dps
+import scenes
+import loader
+import fonts
+import levels
+import memtrack
+import stream
+import replay
+import quality
+import pipeline
+from bot import Bot
+
+scenes.main(__file__)
+memtrack.start()
 
 SETTINGS_FILE = "settings.json"
+SAVE_FILE = "savegame.bin"
 
 def load_settings():
     if os.path.exists(SETTINGS_FILE):
@@ -33,466 +51,305 @@ def unlock_level(level):
         settings["unlocked_levels"] = level
         save_settings(settings)
 
-# --- PUZZLES ---
-PUZZLES = [
-    # LOGIC TASKS (8 puzzles)
-    {
-        "question": "Which number is missing?\n2, 4, 8, 16, ?",
-        "options": [
-            "18",
-            "24",
-            "32",
-            "30"
-        ],
-        "answer": 2  # 32
-    },
-    {
-        "question": "What is the output?\n\nif True or False and False:\n    print(\"Yes\")\nelse:\n    print(\"No\")",
-        "options": [
-            "Yes",
-            "No",
-            "Error",
-            "None"
-        ],
-        "answer": 0  # Yes
-    },
-    {
-        "question": "Which one does NOT belong?",
-        "options": [
-            "Firewall",
-            "Antivirus",
-            "Trojan",
-            "Scanner"
-        ],
-        "answer": 2  # Trojan
-    },
-    {
-        "question": "How many times will this run?\n\nfor i in range(0, 5):\n    print(i)",
-        "options": [
-            "4",
-            "5",
-            "6",
-            "Infinite"
-        ],
-        "answer": 1  # 5
-    },
-    {
-        "question": "Which one is NOT a valid boolean value?",
-        "options": [
-            "True",
-            "False",
-            "None",
-            "Both"
-        ],
-        "answer": 2  # None
-    },
-    {
-        "question": "You have a key, a firewall, and a lock. What opens access?",
-        "options": [
-            "Key",
-            "Firewall",
-            "Lock",
-            "Virus"
-        ],
-        "answer": 0  # Key
-    },
-    {
-        "question": "Which result is TRUE?\n\nnot (False and True)",
-        "options": [
-            "True",
-            "False",
-            "Error",
-            "None"
-        ],
-        "answer": 0  # True
-    },
-    {
-        "question": "If a scanner removes 3 viruses and 2 reappear, how many were removed in total?",
-        "options": [
-            "1",
-            "5",
-            "2",
-            "3"
-        ],
-        "answer": 1  # 5
-    },
-    # CODE FIXES (Python only, 8 puzzles)
-    {
-        "question": "What’s wrong with this code?\n\nvalues = [1, 2, 3, 4]\nfor i in range(len(values)):\n    print(values[i + 1])",
-        "options": [
-            "values is not iterable",
-            "i + 1 causes IndexError",
-            "Syntax error",
-            "It prints wrong values"
-        ],
-        "answer": 1  # i + 1 causes IndexError
-    },
-    {
-        "question": "Why does this crash with AttributeError?\n\nnumber = 10\nprint(number.append(5))",
-        "options": [
-            "append used on int",
-            "print() is broken",
-            "append() needs two values",
-            "number not declared"
-        ],
-        "answer": 0  # append used on int
-    },
-    {
-        "question": "What’s the issue with this function?\n\ndef is_even(n):\n    if n % 2 = 0:\n        return True\n    else:\n        return False",
-        "options": [
-            "= used instead of ==",
-            "% doesn’t work on n",
-            "Should return a string",
-            "Missing parameter"
-        ],
-        "answer": 0  # = used instead of ==
-    },
-    {
-        "question": "What’s the fix for this crash?\n\nuser_input = input(\"Age: \")\nage = user_input + 5\nprint(age)",
-        "options": [
-            "Can’t add to string",
-            "input() is invalid",
-            "Must use f-strings",
-            "age is undefined"
-        ],
-        "answer": 0  # Can’t add to string
-    },
-    {
-        "question": "Why will this always return the same result?\n\ndef scan():\n    threats = []\n    threats.append(\"trojan\")\n    return threats\n\nthreats = scan()\nprint(threats)\nthreats = scan()\nprint(threats)",
-        "options": [
-            "List gets overwritten",
-            "Same list object is reused",
-            "append() doesn’t work",
-            "Needs global variable"
-        ],
-        "answer": 1  # Same list object is reused
-    },
-    {
-        "question": "Why is this if check unreliable?\n\nis_ready = \"False\"\nif not is_ready:\n    print(\"Not ready\")\nelse:\n    print(\"Ready\")",
-        "options": [
-            "String \"False\" is truthy",
-            "not cannot be used",
-            "Needs is_ready == False",
-            "Crash at runtime"
-        ],
-        "answer": 0  # String "False" is truthy
-    },
-    {
-        "question": "What causes this logic bug?\n\nfiles = [\"log.txt\", \"data.csv\", \"virus.exe\"]\nfor f in files:\n    if \"virus\" in f:\n        continue\n        print(\"Skipping virus\")",
-        "options": [
-            "continue should be break",
-            "print after continue never runs",
-            "\"virus\" isn’t in list",
-            "Syntax error"
-        ],
-        "answer": 1  # print after continue never runs
-    },
-    {
-        "question": "Why does this condition never trigger?\n\nconnections = None\nif len(connections) == 0:\n    print(\"No connections\")",
-        "options": [
-            "len() can’t be used on None",
-            "connections is a string",
-            "0 is not a valid length",
-            "Should use connections.empty()"
-        ],
-        "answer": 0  # len() can’t be used on None
-    },
-    # SYSTEM ERRORS (8 puzzles)
-    {
-        "question": "What is a likely reason a firewall blocks traffic?",
-        "options": [
-            "CPU load",
-            "Port not allowed",
-            "Wi-Fi disabled",
-            "Antivirus crash"
-        ],
-        "answer": 1  # Port not allowed
-    },
-    {
-        "question": "Your scanner won’t start. What’s first to check?",
-        "options": [
-            "Internet",
-            "Power",
-            "Permissions",
-            "BIOS"
-        ],
-        "answer": 2  # Permissions
-    },
-    {
-        "question": "Program crashes only on one OS. What’s likely?",
-        "options": [
-            "Syntax error",
-            "OS-specific paths",
-            "RAM issue",
-            "Resolution mismatch"
-        ],
-        "answer": 1  # OS-specific paths
-    },
-    {
-        "question": "You see “FileNotFoundError”. What does that mean?",
-        "options": [
-            "Missing import",
-            "Syntax error",
-            "File doesn't exist",
-            "Permission denied"
-        ],
-        "answer": 2  # File doesn't exist
-    },
-    {
-        "question": "Your antivirus says “update failed.” Most likely cause?",
-        "options": [
-            "CPU overheat",
-            "Disk full",
-            "No internet",
-            "Wrong version"
-        ],
-        "answer": 2  # No internet
-    },
-    {
-        "question": "You launch a scanner, but nothing happens. What’s missing?",
-        "options": [
-            "Admin rights",
-            "DNS",
-            "Display driver",
-            "API"
-        ],
-        "answer": 0  # Admin rights
-    },
-    {
-        "question": "You get \"Access denied\" when writing a file. Why?",
-        "options": [
-            "Wrong filename",
-            "Permission issue",
-            "File too large",
-            "OS crash"
-        ],
-        "answer": 1  # Permission issue
-    },
-    {
-        "question": "App fails to open and throws a “missing DLL” error. This means:",
-        "options": [
-            "Disk failure",
-            "Library file not found",
-            "Invalid port",
-            "Path too long"
-        ],
-        "answer": 1  # Library file not found
-    }
-]
+def option(name, default=None):
+    # --name=value from this screen's arguments
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return default
 
 pygame.init()
 
+# --replay=<file> renders a recorded session offscreen instead of playing it (see replay.py)
+recording = replay.Recording(option("replay")) if option("replay") else None
+
 info = pygame.display.Info()
 SCREEN_WIDTH, SCREEN_HEIGHT = info.current_w, info.current_h
+if recording:
+    SCREEN_WIDTH, SCREEN_HEIGHT = recording.size
 VIRTUAL_WIDTH, VIRTUAL_HEIGHT = SCREEN_WIDTH, SCREEN_HEIGHT
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN)
-virtual_surface = pygame.Surface((VIRTUAL_WIDTH, VIRTUAL_HEIGHT))
-
-font = pygame.font.SysFont("Arial", 32)
-small_font = pygame.font.SysFont("Arial", 20)
-big_font = pygame.font.SysFont("Arial", 80)
-
-towers = []
-enemies = []
-bullets = []
-lives = 3
-score = 0
-
-PATH = [(0, 400), (400, 400), (400, 700), (1000, 700), (1000, 100), 
-        (1600, 100), (1600, 250), (1350, 250), (1350, 650), 
-        (1600, 650), (1600, 900), (800, 900), (800, 1100)]
+screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), 0 if recording else pygame.FULLSCREEN)
+# Draw straight into the display when it has the size asked for; present() only scales otherwise
+if screen.get_size() == (VIRTUAL_WIDTH, VIRTUAL_HEIGHT):
+    virtual_surface = screen
+else:
+    virtual_surface = pygame.Surface((VIRTUAL_WIDTH, VIRTUAL_HEIGHT))
+startup.mark("display")
+
+# Usually already prepared in the background by the start menu / level select
+assets = loader.collect("level1", screen)
+PUZZLES = assets["puzzles"]
+COMPILED_PATH = assets["path"]
+startup.mark("assets")
+
+font = fonts.get("Arial", 32)
+small_font = fonts.get("Arial", 20)
+big_font = fonts.get("Arial", 80)
+startup.mark("fonts")
+
+# --- Level state (see game.py) ---
+# --maze plays the open-field variant where towers block enemies (level 2)
+MAZE = "--maze" in sys.argv[1:] or bool(recording and recording.kind == "maze")
+# --level=<file> plays a level made with editor.py
+LEVEL_FILE = option("level") or (recording and recording.level)
+# --predict-hits resolves each bullet when it is fired instead of moving it every tick (path levels)
+PREDICT_HITS = "--predict-hits" in sys.argv[1:]
+if MAZE:
+    game = MazeGame(levels.MAZE1, PUZZLES)
+elif LEVEL_FILE:
+    level = levels.load_level(LEVEL_FILE)
+    game = Game(CompiledPath(level["path"]), PUZZLES, waves=level["waves"], build_mask=levels.level_build_mask(level),
+                predict_hits=PREDICT_HITS)
+else:
+    game = Game(COMPILED_PATH, PUZZLES, predict_hits=PREDICT_HITS)
+# Restart rewinds to this instead of relaunching the level
+initial_snapshot = game.snapshot()
+if "--resume" in sys.argv[1:] and os.path.exists(SAVE_FILE):
+    try:
+        game.load(SAVE_FILE)
+    except (OSError, ValueError) as e:
+        print(f"Could not resume saved game: {e}")
+        game.restore(initial_snapshot)
+steps = 0  # Simulation ticks this session, restarts included (the timeline of a recording)
+
+# --record=<file> records the session for replay.py
+recorder = None
+if option("record"):
+    recorder = replay.Recorder(option("record"), game, initial_snapshot, (VIRTUAL_WIDTH, VIRTUAL_HEIGHT),
+                               LEVEL_FILE and os.path.abspath(LEVEL_FILE))
+player = None
+if recording:
+    first, last = (int(v) for v in option("frames", f"1:{recording.steps + 1}").split(":"))
+    player = replay.Player(recording, first, last, option("out", "frames"),
+                           replay.parse_size(option("size", f"{VIRTUAL_WIDTH}x{VIRTUAL_HEIGHT}")),
+                           option("format", "png"))
+    initial_snapshot = recording.restart_snapshot
+    steps = player.seek(game)
+
+# --bot=<strategy> lets bot.py play (endlessly restarting, for soak tests);
+# --speed=N runs N simulation ticks per drawn frame
+bot = None
+if option("bot"):
+    max_towers = option("max-towers")
+    bot = Bot(game, option("bot"), max_towers=int(max_towers) if max_towers else None)
+SPEED = 1 if player else max(1, int(option("speed", "1")))
+games_played = 0
+# --threaded runs the simulation on its own thread, overlapping with drawing (see pipeline.py)
+THREADED = "--threaded" in sys.argv[1:] and not player
+
+# --publish[=tcp:host:port|unix:path] streams the game to spectator.py
+publisher = None
+if "--publish" in sys.argv[1:] or option("publish"):
+    publisher = stream.Publisher(option("publish", stream.DEFAULT_ADDRESS))
 
 settings = load_settings()
 invert = settings.get("invert_colors", False)
 
 MENU_WIDTH = 120
 MENU_BG = (50, 50, 80)
-TOWER_TYPES = [
-    {
-        "name": "Blue",
-        "color": (0, 0, 200),
-        "range": 140,
-        "cooldown": 60,
-        "fire_rate": 60,
-        "acquire_delay": int(1.5 * 60),
-    },
-    {
-        "name": "Red",
-        "color": (200, 0, 0),
-        "range": 70,
-        "cooldown": 30,
-        "fire_rate": 30,
-        "acquire_delay": int(1.0 * 60),
-    },
-    {
-        "name": "Green",
-        "color": (0, 180, 0),
-        "range": 180,
-        "cooldown": 90,
-        "fire_rate": 90,
-        "acquire_delay": int(2.0 * 60),
-    },
-    {
-        "name": "Yellow",
-        "color": (200, 200, 0),
-        "range": 100,
-        "cooldown": 45,
-        "fire_rate": 45,
-        "acquire_delay": int(1.2 * 60),
-    },
-]
-
-# --- Puzzle state ---
-puzzle_active = False
-current_puzzle = None
-puzzle_result = None  # None, True, or False
-puzzle_option_rects = []
-last_puzzle_index = None  # For random puzzle selection
-tower_place_cooldowns = [0 for _ in TOWER_TYPES]  # Per-tower-type cooldown
-
-class Tower:
-    def __init__(self, x, y, ttype=0):
-        self.x, self.y = x, y
-        self.type = ttype
-        self.range = TOWER_TYPES[ttype]["range"]
-        self.cooldown = TOWER_TYPES[ttype]["cooldown"]
-        self.fire_rate = TOWER_TYPES[ttype]["fire_rate"]
-        self.acquire_delay = TOWER_TYPES[ttype]["acquire_delay"]
-        self.target = None
-
-    def draw(self, surf):
-        if self.type == 0:
-            # Draw blue tower with even bigger image, center it
-            surf.blit(blue_tower_img, (self.x - 45, self.y - 45))  # Center 90x90
-        else:
-            color = TOWER_TYPES[self.type]["color"]
-            color = color if not invert else invert_color(color)
-            pygame.draw.rect(surf, color, (self.x - 20, self.y - 20, 40, 40))  # Smaller for other towers
-        pygame.draw.circle(
-            surf,
-            (100, 100, 255) if not invert else invert_color((100, 100, 255)),
-            (self.x, self.y),
-            self.range,
-            1,
-        )
-
-    def shoot(self, enemies, bullets):
-        # Blue tower (type 0) does not shoot
-        if self.type == 0:
-            return
-        if self.target not in enemies or (
-            self.target and math.hypot(self.target.pos[0] - self.x, self.target.pos[1] - self.y) > self.range
-        ):
-            self.target = None
-            self.acquire_delay = 0
-
-        if self.cooldown > 0:
-            self.cooldown -= 1
-            return
-
-        if self.target is None:
-            for enemy in enemies:
-                dx = enemy.pos[0] - self.x
-                dy = enemy.pos[1] - self.y
-                dist = math.hypot(dx, dy)
-                if dist <= self.range:
-                    self.target = enemy
-                    self.acquire_delay = int(1.5 * 60)
-                    break
-
-        if self.target:
-            if self.acquire_delay > 0:
-                self.acquire_delay -= 1
-                return
-            if not any(bullet.target == self.target and bullet.x == self.x and bullet.y == self.y for bullet in bullets):
-                bullets.append(Bullet(self.x, self.y, self.target))
-                self.cooldown = self.fire_rate
-
-class Enemy:
-    def __init__(self, path):
-        self.path = path
-        self.pos = list(path[0])
-        self.path_index = 0
-        self.speed = 1  # Slower base enemy
-        self.hp = 1
-        self.original_speed = self.speed
-
-    def update(self):
-        if self.path_index < len(self.path) - 1:
-            target = self.path[self.path_index + 1]
-            dx, dy = target[0] - self.pos[0], target[1] - self.pos[1]
-            dist = (dx**2 + dy**2) ** 0.5
-            if dist < self.speed:
-                self.pos = list(target)
-                self.path_index += 1
-            else:
-                self.pos[0] += self.speed * dx / dist
-                self.pos[1] += self.speed * dy / dist
-
-    def draw(self, surf):
-        surf.blit(enemy_img, (int(self.pos[0]) - 40, int(self.pos[1]) - 40))  # Center 80x80
-
-class FastEnemy(Enemy):
-    def __init__(self, path):
-        super().__init__(path)
-        self.speed = 2  # Faster
-        self.original_speed = self.speed  # <-- Add this line
-
-    def draw(self, surf):
-        surf.blit(fast_enemy_img, (int(self.pos[0]) - 30, int(self.pos[1]) - 30))  # Center 60x60
-
-class DurableEnemy(Enemy):
-    def __init__(self, path):
-        super().__init__(path)
-        self.hp = 3
-        self.speed = 1
-        self.original_speed = self.speed  # <-- Add this line
-
-    def draw(self, surf):
-        surf.blit(durable_enemy_img, (int(self.pos[0]) - 40, int(self.pos[1]) - 40))  # Center 80x80
-        # Draw HP as before
-        hp_label = small_font.render(str(self.hp), True, (255,255,255) if not invert else (0,0,0))
-        surf.blit(hp_label, (int(self.pos[0])-10, int(self.pos[1])-10))
-
-class Bullet:
-    def __init__(self, x, y, target):
-        self.x = x
-        self.y = y
-        self.target = target
-        self.speed = 8
-        self.radius = 8
-
-    def update(self):
-        if not self.target:
-            return
-        dx = self.target.pos[0] - self.x
-        dy = self.target.pos[1] - self.y
-        dist = math.hypot(dx, dy)
-        if dist < self.speed or dist == 0:
-            self.x, self.y = self.target.pos[0], self.target.pos[1]
-        else:
-            self.x += self.speed * dx / dist
-            self.y += self.speed * dy / dist
-
-    def draw(self, surf):
-        color = (255, 255, 0) if not invert else invert_color((255, 255, 0))
-        pygame.draw.circle(surf, color, (int(self.x), int(self.y)), self.radius)
-
-# Make enemy images bigger
-enemy_img = pygame.image.load("WannaCry.png").convert_alpha()
-enemy_img = pygame.transform.scale(enemy_img, (60, 60))         # Now square, same as BonziBUDDY
-fast_enemy_img = pygame.image.load("trojan.png").convert_alpha()
-fast_enemy_img = pygame.transform.scale(fast_enemy_img, (60, 60))
-durable_enemy_img = pygame.image.load("BonziBUDDY.webp").convert_alpha()
-durable_enemy_img = pygame.transform.scale(durable_enemy_img, (60, 60))
 
-# Make blue tower image even bigger
-blue_tower_img = pygame.image.load("pindows_defender.png").convert_alpha()
-blue_tower_img = pygame.transform.scale(blue_tower_img, (90, 90))  # Increased from 60x60
-
-enemy_spawn_timer = 0
-enemy_spawn_interval = 120
-selected_tower_type = None
+# The game works in world coordinates; levels bigger than the screen are scrolled
+# with the arrow keys or by dragging with the right button, the wheel (or +/-) zooms
+# and Home resets the view (see camera.py)
+camera = Camera((VIRTUAL_WIDTH, VIRTUAL_HEIGHT), world_size(game, (VIRTUAL_WIDTH, VIRTUAL_HEIGHT), MENU_WIDTH))
+panning = None  # Cursor position the right-button drag last moved the view from
+
+enemy_img = assets["enemy"]
+fast_enemy_img = assets["fast_enemy"]
+durable_enemy_img = assets["durable_enemy"]
+blue_tower_img = assets["blue_tower"]
+
+# Sprite and centering offset per enemy class
+ENEMY_SPRITES = {
+    Enemy: (enemy_img, 40),
+    FastEnemy: (fast_enemy_img, 30),
+    DurableEnemy: (durable_enemy_img, 40),
+}
+
+# --- Pre-rendered sprites (rebuilt when invert changes) ---
+def make_circle_sprite(radius, color, width=0):
+    sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, color, (radius, radius), radius, width)
+    return sprite
+
+def board_color():
+    return (30, 30, 30) if not invert else (225, 225, 225)
+
+def build_board():
+    # Background and path (or grid) over the whole world, drawn once instead of every frame
+    board = pygame.Surface((camera.world_w, camera.world_h))
+    board.fill(board_color())
+    path_color = (0, 255, 0) if not invert else invert_color((0, 255, 0))
+    if MAZE:
+        field = game.field
+        grid_color = (45, 45, 45) if not invert else (210, 210, 210)
+        for col in range(field.cols + 1):
+            pygame.draw.line(board, grid_color, (col * field.cell, 0), (col * field.cell, field.rows * field.cell))
+        for row in range(field.rows + 1):
+            pygame.draw.line(board, grid_color, (0, row * field.cell), (field.cols * field.cell, row * field.cell))
+        for i in (game.spawn, field.exit):
+            x, y = field.centers[i]
+            pygame.draw.rect(board, path_color, (x - field.cell // 2, y - field.cell // 2, field.cell, field.cell))
+    else:
+        if game.build_mask:
+            mask = game.build_mask
+            no_build_color = (60, 35, 35) if not invert else invert_color((60, 35, 35))
+            for i in mask.painted_tiles():
+                board.fill(no_build_color, mask.tile_rect(i))
+        pygame.draw.lines(board, path_color, False, game.path.points, 8)
+    return board
+
+def build_sprites():
+    global bullet_img, tower_imgs, range_ring_imgs, priority_label_imgs, board_img
+    board_img = build_board()
+    bullet_color = (255, 255, 0) if not invert else invert_color((255, 255, 0))
+    bullet_img = make_circle_sprite(8, bullet_color)
+    ring_color = (100, 100, 255) if not invert else invert_color((100, 100, 255))
+    tower_imgs = []
+    range_ring_imgs = []
+    for ttype in TOWER_TYPES:
+        color = ttype["color"] if not invert else invert_color(ttype["color"])
+        img = pygame.Surface((40, 40))
+        img.fill(color)
+        tower_imgs.append(img)
+        range_ring_imgs.append((make_circle_sprite(ttype["range"], ring_color, 1), ttype["range"]))
+    hp_label_cache.clear()
+    scaled_sprite_sets.clear()
+    fg = (255, 255, 255) if not invert else (0, 0, 0)
+    priority_label_imgs = {p: small_font.render(p.capitalize(), True, fg) for p in TARGET_PRIORITIES}
+
+hp_label_cache = {}
+scaled_sprite_sets = {}
+SPRITE_SET_LIMIT = 4  # Scaled sets kept at once; a zoomed-in board is big
+world_surfaces = {}
+
+def sprite_set(scale):
+    # Board and entity sprites at a drawing scale (render scale times zoom; 1 = the originals),
+    # built on first use
+    sprites = scaled_sprite_sets.get(scale)
+    if sprites is None:
+        def resize(img):
+            if scale == 1:
+                return img
+            w, h = img.get_size()
+            return pygame.transform.smoothscale(img, (max(1, round(w * scale)), max(1, round(h * scale))))
+        if len(scaled_sprite_sets) >= SPRITE_SET_LIMIT:
+            scaled_sprite_sets.clear()
+        sprites = scaled_sprite_sets[scale] = {
+            "board": resize(board_img),
+            # (image, centering offset) per tower type; the blue tower has its own 90x90 image
+            "towers": [(resize(blue_tower_img), 45 * scale)] + [(resize(img), 20 * scale) for img in tower_imgs[1:]],
+            "rings": [(resize(img), radius * scale) for img, radius in range_ring_imgs],
+            "enemies": {cls: (resize(img), offset * scale) for cls, (img, offset) in ENEMY_SPRITES.items()},
+            "bullet": (resize(bullet_img), 8 * scale),
+        }
+    return sprites
+
+def world_surface(scale):
+    # Where the board and entities are drawn: the frame itself, or a smaller surface scaled up afterwards
+    if scale == 1:
+        return virtual_surface
+    surf = world_surfaces.get(scale)
+    if surf is None:
+        surf = world_surfaces[scale] = pygame.Surface((round(VIRTUAL_WIDTH * scale), round(VIRTUAL_HEIGHT * scale)))
+    return surf
+
+def hp_label_img(hp):
+    label = hp_label_cache.get(hp)
+    if label is None:
+        label = small_font.render(str(hp), True, (255,255,255) if not invert else (0,0,0))
+        hp_label_cache[hp] = label
+    return label
+
+build_sprites()
+
+# Particle bursts per game event: (count, speed, lifetime in frames, color)
+EFFECTS = {
+    "hit": (6, 2.5, 12, (255, 220, 80)),
+    "kill": (24, 3.5, 30, (255, 90, 40)),
+    "leak": (48, 6.0, 40, (255, 0, 0)),
+}
+particles = Particles()
+
+# --quality=<level> pins a quality level (see quality.py); otherwise it follows frame times
+governor = quality.Governor(0 if player else option("quality") and int(option("quality")))
+
+def spawn_effects(effects):
+    share = governor.settings["effects"]
+    for kind, x, y in effects:
+        count, speed, life, color = EFFECTS[kind]
+        particles.emit(x, y, max(1, int(count * share)), speed, life, color if not invert else invert_color(color))
+
+def draw_entities(surf, view, settings):
+    # Collect every entity sprite for the frame and submit them in one blits() call.
+    # Range rings and labels only exist at full render scale; the levels that scale down drop them first.
+    # Labels don't shrink with the world, so they go when zoomed out too.
+    full = settings["render_scale"] == 1
+    labels = settings["labels"] and full and camera.zoom >= 1
+    scale = settings["render_scale"] * camera.zoom
+    ox, oy = camera.offset(scale)
+    sprites = sprite_set(scale)
+
+    def at(x, y, offset=0):
+        # World position -> surface position of a sprite's corner
+        return int(x * scale - ox - offset), int(y * scale - oy - offset)
+
+    towers = sprites["towers"]
+    batch = []
+    for ttype, x, y, _, _ in view.towers:
+        img, offset = towers[ttype]
+        batch.append((img, at(x, y, offset)))
+    if settings["range_rings"] and full:
+        rings = sprites["rings"]
+        for ttype, x, y, _, _ in view.towers:
+            img, offset = rings[ttype]
+            batch.append((img, at(x, y, offset)))
+    if labels:
+        for ttype, x, y, _, priority in view.towers:
+            if ttype != 0:
+                label = priority_label_imgs[priority]
+                lx, ly = at(x, y)
+                batch.append((label, (lx - label.get_width() // 2, ly + int(24 * scale))))
+    enemy_sprites = sprites["enemies"]
+    for cls, x, y, _ in view.enemies:
+        img, offset = enemy_sprites[cls]
+        batch.append((img, at(x, y, offset)))
+    if labels:
+        batch += [(hp_label_img(hp), at(x, y, 10)) for cls, x, y, hp in view.enemies if cls is DurableEnemy]
+    img, offset = sprites["bullet"]
+    batch += [(img, at(x, y, offset)) for x, y in view.bullets]
+    surf.blits(batch, False)
+
+# --- DPS overlay: the path colored by the firepower each stretch gets (see dps.py).
+# Shown while a tower type is selected, with the dragged tower added in; D keeps it on. ---
+DPS_COLORS = [(0.0, (90, 90, 90)), (0.5, (0, 90, 255)), (2.0, (255, 220, 0)), (5.0, (255, 40, 0))]  # (DPS, color) stops
+show_dps = False
+dps_preview = None  # ((x, y, tower type, profile), profile with that tower added) for the tower being dragged
+
+def dps_color(dps):
+    color = DPS_COLORS[-1][1]
+    for (lo, low), (hi, high) in zip(DPS_COLORS, DPS_COLORS[1:]):
+        if dps < hi:
+            t = max(0.0, (dps - lo) / (hi - lo))
+            color = tuple(int(a + (b - a) * t) for a, b in zip(low, high))
+            break
+    return color if not invert else invert_color(color)
+
+def preview_dps(view):
+    # Only recomputed when the dragged tower moves to a new spot; enemies don't come into it
+    global dps_preview
+    px, py, ttype, _ = view.preview
+    key = (px, py, ttype, view.dps)
+    if dps_preview is None or dps_preview[0] != key:
+        intervals = game.path.circle_intervals(px, py, TOWER_TYPES[ttype]["range"])
+        dps_preview = key, view.dps.with_tower(intervals, tower_dps(ttype))
+    return dps_preview[1]
+
+def draw_dps(surf, profile):
+    width = max(2, round(10 * camera.zoom))
+    for lo, hi, dps in profile.zones(game.path.length):
+        points = [camera.to_screen(x, y) for x, y in game.path.stretch(lo, hi)]
+        pygame.draw.lines(surf, dps_color(dps), False, points, width)
 
 # Pause button in bottom right, bigger
 pause_button_size = 100
@@ -503,346 +360,361 @@ pause_button_rect = pygame.Rect(
     pause_button_size
 )
 paused = False
+saved_at = None  # game.ticks when the game was last saved from the pause menu
 
-placing_tower = False
-placement_preview = None
-dragging = False
-
-# --- Wave system ---
-current_wave = 1
-max_wave = 3
-enemies_to_spawn = []
-spawn_cooldown = 0
-next_enemy_spawn_offset = 0  # <-- Add this line
-wave_in_progress = False
-game_won = False
-game_lost = False
-
-def setup_wave(wave):
-    if wave == 1:
-        wave_list = [Enemy(PATH) for _ in range(15)]
-    elif wave == 2:
-        wave_list = [Enemy(PATH) for _ in range(15)] + [FastEnemy(PATH) for _ in range(5)]
-    elif wave == 3:
-        wave_list = [Enemy(PATH) for _ in range(15)] + [FastEnemy(PATH) for _ in range(10)] + [DurableEnemy(PATH) for _ in range(5)]
-    else:
-        wave_list = []
-    random.shuffle(wave_list)
-    # Add spawn_offset to each enemy so they spawn apart
-    for i, enemy in enumerate(wave_list):
-        enemy.spawn_offset = i * 20  # 20 frames apart, adjust as needed
-    return wave_list
-
-def draw_pause_menu(surface):
-    overlay = pygame.Surface((VIRTUAL_WIDTH, VIRTUAL_HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 180))
-    surface.blit(overlay, (0, 0))
-
-    resume_rect = pygame.Rect(VIRTUAL_WIDTH//2 - 120, VIRTUAL_HEIGHT//2 - 120, 240, 60)
-    settings_rect = pygame.Rect(VIRTUAL_WIDTH//2 - 120, VIRTUAL_HEIGHT//2 - 40, 240, 60)
-    restart_rect = pygame.Rect(VIRTUAL_WIDTH//2 - 120, VIRTUAL_HEIGHT//2 + 40, 240, 60)
-    mainmenu_rect = pygame.Rect(VIRTUAL_WIDTH//2 - 120, VIRTUAL_HEIGHT//2 + 120, 240, 60)
-
-    resume_color = (100, 200, 100) if not invert else invert_color((100, 200, 100))
-    settings_color = (100, 100, 255) if not invert else invert_color((100, 100, 255))
-    restart_color = (200, 200, 0) if not invert else invert_color((200, 200, 0))
-    mainmenu_color = (200, 0, 0) if not invert else invert_color((200, 0, 0))
-
-    pygame.draw.rect(surface, resume_color, resume_rect)
-    pygame.draw.rect(surface, settings_color, settings_rect)
-    pygame.draw.rect(surface, restart_color, restart_rect)
-    pygame.draw.rect(surface, mainmenu_color, mainmenu_rect)
-
-    text_color = (255, 255, 255) if not invert else (0, 0, 0)
-
-    resume_label = font.render("Resume", True, text_color)
-    settings_label = font.render("Settings", True, text_color)
-    restart_label = font.render("Restart", True, text_color)
-    mainmenu_label = font.render("Main Menu", True, text_color)
-
-    surface.blit(resume_label, resume_label.get_rect(center=resume_rect.center))
-    surface.blit(settings_label, settings_label.get_rect(center=settings_rect.center))
-    surface.blit(restart_label, restart_label.get_rect(center=restart_rect.center))
-    surface.blit(mainmenu_label, mainmenu_label.get_rect(center=mainmenu_rect.center))
-
-    return resume_rect, settings_rect, restart_rect, mainmenu_rect
-
-# Helper to shuffle puzzle options and update answer index
-def get_shuffled_puzzle(puzzle):
-    options = list(puzzle["options"])
-    answer = puzzle["answer"]
-    zipped = list(enumerate(options))
-    random.shuffle(zipped)
-    new_options = [opt for idx, opt in zipped]
-    new_answer = [i for i, (orig_idx, _) in enumerate(zipped) if orig_idx == answer][0]
-    return {
-        "question": puzzle["question"],  # Removed extra text
-        "options": new_options,
-        "answer": new_answer
-    }
-
-def is_valid_tower_position(x, y, ttype):
-    for tower in towers:
-        if math.hypot(tower.x - x, tower.y - y) < 40:
-            return False
-    for i in range(len(PATH) - 1):
-        x1, y1 = PATH[i]
-        x2, y2 = PATH[i + 1]
-        px, py = x, y
-        dx, dy = x2 - x1, y2 - y1  # <-- FIXED HERE
-        if dx == dy == 0:
-            dist = math.hypot(px - x1, py - y1)
-        else:
-            t = max(0, min(1, ((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy)))
-            proj_x = x1 + t * dx
-            proj_y = y1 + t * dy
-            dist = math.hypot(px - proj_x, py - proj_y)
-        if dist < 40:
-            return False
-    return True
-
-running = True
-while running:
-    for event in pygame.event.get():
-        # --- Puzzle answer handling ---
-        if puzzle_active and current_puzzle and event.type == pygame.MOUSEBUTTONDOWN:
-            mx, my = pygame.mouse.get_pos()
-            vx = int(mx * VIRTUAL_WIDTH / SCREEN_WIDTH)
-            vy = int(my * VIRTUAL_HEIGHT / SCREEN_HEIGHT)
-            for idx, opt_rect in enumerate(puzzle_option_rects):
-                if opt_rect.collidepoint(vx, vy):
-                    ttype = placement_preview[2] if placement_preview else 0
-                    if idx == current_puzzle["answer"]:
-                        if is_valid_tower_position(placement_preview[0], placement_preview[1], ttype):
-                            towers.append(Tower(placement_preview[0], placement_preview[1], ttype))
-                            puzzle_result = True
-                            placing_tower = False
-                            placement_preview = None
-                            dragging = False
-                            tower_place_cooldowns[ttype] = 120  # 2 seconds for this tower
-                            puzzle_active = False
-                        else:
-                            puzzle_result = "invalid"
-                            # Re-shuffle puzzle for next attempt
-                            available = [i for i in range(len(PUZZLES)) if i != last_puzzle_index]
-                            if not available:
-                                available = list(range(len(PUZZLES)))
-                            idx2 = random.choice(available)
-                            current_puzzle = get_shuffled_puzzle(PUZZLES[idx2])
-                            last_puzzle_index = idx2
-                            puzzle_active = True
-                            continue  # Skip rest of event loop for this click
-                    else:
-                        puzzle_result = False
-                        placing_tower = False
-                        placement_preview = None
-                        dragging = False
-                        tower_place_cooldowns[ttype] = 120  # 2 seconds for this tower
-                        puzzle_active = False
-
-        if event.type == pygame.QUIT or (
-            event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
-        ):
-            running = False
-
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            mx, my = pygame.mouse.get_pos()
-            vx = int(mx * VIRTUAL_WIDTH / SCREEN_WIDTH)
-            vy = int(my * VIRTUAL_HEIGHT / SCREEN_HEIGHT)
-
-            if not paused and pause_button_rect.collidepoint(vx, vy):
-                paused = True
-
-            elif paused:
-                resume_rect = pygame.Rect(VIRTUAL_WIDTH//2 - 120, VIRTUAL_HEIGHT//2 - 120, 240, 60)
-                settings_rect = pygame.Rect(VIRTUAL_WIDTH//2 - 120, VIRTUAL_HEIGHT//2 - 40, 240, 60)
-                restart_rect = pygame.Rect(VIRTUAL_WIDTH//2 - 120, VIRTUAL_HEIGHT//2 + 40, 240, 60)
-                mainmenu_rect = pygame.Rect(VIRTUAL_WIDTH//2 - 120, VIRTUAL_HEIGHT//2 + 120, 240, 60)
-                if resume_rect.collidepoint(vx, vy):
-                    paused = False
-                elif settings_rect.collidepoint(vx, vy):
-                    subprocess.call([sys.executable, "settings.py"])
-                    settings = load_settings()
-                    invert = settings.get("invert_colors", False)
-                elif restart_rect.collidepoint(vx, vy):
-                    subprocess.Popen([sys.executable, "level1.py"])
-                    running = False
-                elif mainmenu_rect.collidepoint(vx, vy):
-                    subprocess.Popen([sys.executable, "Start-Menu.py"])
-                    running = False
-
-            if not paused and not game_won and not game_lost and not puzzle_active:
-                menu_left = VIRTUAL_WIDTH - MENU_WIDTH
-                menu_y = 60
-                if not placing_tower:
-                    if vx >= menu_left:
-                        for i, ttype in enumerate(TOWER_TYPES):
-                            rect = pygame.Rect(menu_left + 10, menu_y + i * 70, 100, 60)
-                            if rect.collidepoint(vx, vy):
-                                if tower_place_cooldowns[i] == 0:
-                                    selected_tower_type = i
-                    elif selected_tower_type is not None:
-                        placing_tower = True
-                        placement_preview = [vx, vy, selected_tower_type]
-                        dragging = True
-                        selected_tower_type = None
-                else:
-                    accept_rect = pygame.Rect(placement_preview[0] + 50, placement_preview[1] - 30, 80, 40)
-                    cancel_rect = pygame.Rect(placement_preview[0] - 130, placement_preview[1] - 30, 80, 40)
-                    if accept_rect.collidepoint(vx, vy):
-                        ttype = placement_preview[2]
-                        if not puzzle_active and tower_place_cooldowns[ttype] == 0:
-                            # Pick a random puzzle, not the same as last time if possible
-                            available = [i for i in range(len(PUZZLES)) if i != last_puzzle_index]
-                            if not available:
-                                available = list(range(len(PUZZLES)))
-                            idx = random.choice(available)
-                            current_puzzle = get_shuffled_puzzle(PUZZLES[idx])
-                            last_puzzle_index = idx
-                            puzzle_active = True
-                            puzzle_result = None
-                    elif cancel_rect.collidepoint(vx, vy):
-                        placing_tower = False
-                        placement_preview = None
-                        dragging = False
-                    else:
-                        tower_rect = pygame.Rect(placement_preview[0] - 20, placement_preview[1] - 20, 40, 40)
-                        if tower_rect.collidepoint(vx, vy):
-                            dragging = True
-
-        elif event.type == pygame.MOUSEBUTTONUP:
-            dragging = False
-
-        elif event.type == pygame.MOUSEMOTION:
-            if placing_tower and dragging:
-                mx, my = pygame.mouse.get_pos()
-                vx = int(mx * VIRTUAL_WIDTH / SCREEN_WIDTH)
-                vy = int(my * VIRTUAL_HEIGHT / SCREEN_HEIGHT)
-                placement_preview[0] = vx
-                placement_preview[1] = vy
-
-    # --- Wave logic ---
-    if not wave_in_progress and not enemies and not enemies_to_spawn and not game_won and not game_lost:
-        if current_wave <= max_wave:
-            enemies_to_spawn = setup_wave(current_wave)
-            wave_in_progress = True
-            spawn_cooldown = 0
-        else:
-            game_won = True
-
-    if wave_in_progress and enemies_to_spawn and not game_won and not game_lost:
-        spawn_cooldown -= 1
-        if spawn_cooldown <= 0:
-            # Only spawn if the next enemy's offset is reached
-            if hasattr(enemies_to_spawn[0], "spawn_offset") and enemies_to_spawn[0].spawn_offset > 0:
-                enemies_to_spawn[0].spawn_offset -= 1
-                spawn_cooldown = 1  # Check again next frame
-            else:
-                enemy = enemies_to_spawn.pop(0)
-                enemies.append(enemy)
-                spawn_cooldown = 30  # base interval between spawns
-
-    if wave_in_progress and not enemies_to_spawn and not enemies and not game_won and not game_lost:
-        current_wave += 1
-        wave_in_progress = False
-
-    if not paused and not game_won and not game_lost:
-        # --- Apply Blue tower slow effect ---
-        for enemy in enemies:
-            enemy.speed = enemy.original_speed  # Reset speed each frame
-
-        for tower in towers:
-            if tower.type == 0:  # Blue tower
-                for enemy in enemies:
-                    dx = enemy.pos[0] - tower.x
-                    dy = enemy.pos[1] - tower.y
-                    dist = math.hypot(dx, dy)
-                    if dist <= tower.range:
-                        enemy.speed = enemy.original_speed * 0.35  # Slow to 35% speed
-
-        for tower in towers:
-            tower.shoot(enemies, bullets)
-
-        for bullet in bullets[:]:
-            bullet.update()
-            if bullet.target and math.hypot(bullet.x - bullet.target.pos[0], bullet.y - bullet.target.pos[1]) < bullet.radius + 20:
-                if bullet.target in enemies:
-                    bullet.target.hp -= 1
-                    if bullet.target.hp <= 0:
-                        enemies.remove(bullet.target)
-                        score += 1
-                bullets.remove(bullet)
-
-        for enemy in enemies[:]:
-            enemy.update()
-            if enemy.path_index == len(enemy.path) - 1:
-                enemies.remove(enemy)
-                lives -= 1
-                if lives <= 0:
-                    game_lost = True
-
-    bg_color = (30, 30, 30) if not invert else (225, 225, 225)
-    virtual_surface.fill(bg_color)
-
-    path_color = (0, 255, 0) if not invert else invert_color((0, 255, 0))
-    pygame.draw.lines(virtual_surface, path_color, False, PATH, 8)
-
-    for tower in towers:
-        tower.draw(virtual_surface)
-    for enemy in enemies:
-        enemy.draw(virtual_surface)
-    for bullet in bullets:
-        bullet.draw(virtual_surface)
-
+# --- UI ---
+def build_ui():
+    global ui, lives_label, wave_label, quality_label, tower_buttons, cooldown_overlays, cooldown_labels
+    global placement_layer, accept_button, cancel_button, saved_label
+    global invalid_label, correct_label, incorrect_label, pause_menu, win_screen, lose_screen
     fg = (255, 255, 255) if not invert else (0, 0, 0)
-    text = font.render(f"Lives: {lives}  Score: {score}", True, fg)
-    virtual_surface.blit(text, (10, 10))
-    wave_label = font.render(f"Wave: {min(current_wave, max_wave)}", True, fg)
-    virtual_surface.blit(wave_label, (10, 50))
-    # Removed: small = small_font.render("ESC to quit, click to place towers", True, fg)
-    # Removed: virtual_surface.blit(small, (10, 90))
 
+    lives_label = Label(font, "", fg, topleft=(10, 10))
+    wave_label = Label(font, "", fg, topleft=(10, 50))
+    quality_label = Label(small_font, "", fg, topleft=(10, 90))
     menu_left = VIRTUAL_WIDTH - MENU_WIDTH
-    pygame.draw.rect(virtual_surface, MENU_BG, (menu_left, 0, MENU_WIDTH, VIRTUAL_HEIGHT))
+    hud = Layer(lives_label, wave_label, quality_label, Overlay((menu_left, 0, MENU_WIDTH, VIRTUAL_HEIGHT), MENU_BG))
+    tower_buttons = []
+    cooldown_overlays = []
+    cooldown_labels = []
     menu_y = 60
     for i, ttype in enumerate(TOWER_TYPES):
         rect = pygame.Rect(menu_left + 10, menu_y + i * 70, 100, 60)
         color = ttype["color"] if not invert else invert_color(ttype["color"])
-        pygame.draw.rect(virtual_surface, color, rect)
-        if selected_tower_type == i:
-            pygame.draw.rect(virtual_surface, (255, 255, 255), rect, 3)
-        label = small_font.render(ttype["name"], True, fg)
-        virtual_surface.blit(label, (menu_left + 20, menu_y + i * 70 + 15))
-        # Draw cooldown overlay if needed
-        if tower_place_cooldowns[i] > 0:
-            cooldown_overlay = pygame.Surface((100, 60), pygame.SRCALPHA)
-            cooldown_overlay.fill((0, 0, 0, 180))
-            virtual_surface.blit(cooldown_overlay, (rect.x, rect.y))
-            cd_text = small_font.render(f"{tower_place_cooldowns[i]//60+1}s", True, (255,255,0))
-            cd_rect = cd_text.get_rect(center=rect.center)
-            virtual_surface.blit(cd_text, cd_rect)
-
-    # Draw pause button (bottom right, bigger, thick bars)
-    pygame.draw.rect(
-        virtual_surface,
-        (180, 180, 180) if not invert else invert_color((180, 180, 180)),
-        pause_button_rect,
-        border_radius=20
-    )
+        tower_buttons.append(hud.add(Button(("tower", i), rect, color, ttype["name"], small_font, fg,
+                                            text_pos=(10, 15), selected_outline=((255, 255, 255), 3))))
+        cooldown_overlays.append(hud.add(Overlay(rect, (0, 0, 0, 180))))
+        cooldown_labels.append(hud.add(Label(small_font, "", (255, 255, 0), center=rect.center)))
+
+    # Pause button in bottom right, bigger, thick bars
     bar_width = 18
     bar_height = 60
     bar_gap = 24
     bar_color = (60, 60, 60) if not invert else invert_color((60, 60, 60))
-    x1 = pause_button_rect.x + pause_button_rect.width // 2 - bar_gap // 2 - bar_width
-    x2 = pause_button_rect.x + pause_button_rect.width // 2 + bar_gap // 2
-    y = pause_button_rect.y + (pause_button_rect.height - bar_height) // 2
-    pygame.draw.rect(virtual_surface, bar_color, (x1, y, bar_width, bar_height), border_radius=8)
-    pygame.draw.rect(virtual_surface, bar_color, (x2, y, bar_width, bar_height), border_radius=8)
+    bars = pygame.Surface((bar_width * 2 + bar_gap, bar_height), pygame.SRCALPHA)
+    pygame.draw.rect(bars, bar_color, (0, 0, bar_width, bar_height), border_radius=8)
+    pygame.draw.rect(bars, bar_color, (bar_width + bar_gap, 0, bar_width, bar_height), border_radius=8)
+    pause_color = (180, 180, 180) if not invert else invert_color((180, 180, 180))
+    corner = Layer(Button("pause", pause_button_rect, pause_color, border_radius=20, image=bars))
+
+    accept_button = Button("accept", (0, 0, 80, 40), (0, 200, 0), "Accept", small_font, text_pos=(10, 8))
+    cancel_button = Button("cancel", (0, 0, 80, 40), (200, 0, 0), "Cancel", small_font, text_pos=(10, 8))
+    placement_layer = Layer(accept_button, cancel_button, visible=False)
+
+    center = (VIRTUAL_WIDTH//2, VIRTUAL_HEIGHT//2)
+    invalid_label = Label(font, "Invalid position!", (255, 0, 0), center=center)
+    correct_label = Label(font, "Correct!", (0, 255, 0), center=center)
+    incorrect_label = Label(font, "Incorrect!", (255, 0, 0), center=center)
+    messages = Layer(invalid_label, correct_label, incorrect_label)
+
+    text_color = (255, 255, 255) if not invert else (0, 0, 0)
+    pause_menu = Dialog(backdrop=((0, 0, VIRTUAL_WIDTH, VIRTUAL_HEIGHT), (0, 0, 0, 180)))
+    for i, (name, text, color) in enumerate([
+        ("resume", "Resume", (100, 200, 100)),
+        ("save", "Save Game", (0, 160, 160)),
+        ("settings", "Settings", (100, 100, 255)),
+        ("restart", "Restart", (200, 200, 0)),
+        ("mainmenu", "Main Menu", (200, 0, 0)),
+    ]):
+        color = color if not invert else invert_color(color)
+        rect = (VIRTUAL_WIDTH//2 - 120, VIRTUAL_HEIGHT//2 - 160 + i * 80, 240, 60)
+        pause_menu.add(Button(name, rect, color, text, font, text_color))
+    saved_label = pause_menu.add(Label(small_font, "Game saved", (0, 255, 0),
+                                       midbottom=(VIRTUAL_WIDTH//2, VIRTUAL_HEIGHT//2 - 170)))
+
+    # WIN/LOSE SCENES
+    win_text = Label(big_font, "You Win!", (0, 255, 0), midtop=(VIRTUAL_WIDTH//2, 60))
+    win_screen = Layer(Overlay(win_text.rect.inflate(40, 20), (0, 0, 0)), win_text, visible=False)
+    lose_text = Label(big_font, "You Lose!", (255, 0, 0), midtop=(VIRTUAL_WIDTH//2, 60))
+    lose_screen = Dialog(Overlay(lose_text.rect.inflate(40, 20), (0, 0, 0)), lose_text)
+    for i, (name, text, color) in enumerate([
+        ("restart", "Restart", (100, 200, 100)),
+        ("levelselect", "Level Select", (100, 100, 255)),
+        ("mainmenu", "Main Menu", (200, 0, 0)),
+    ]):
+        rect = (VIRTUAL_WIDTH//2 - 120, VIRTUAL_HEIGHT//2 + 10 + i * 80, 240, 60)
+        lose_screen.add(Button(name, rect, color, text, font))
+
+    ui = UI(hud, placement_layer, messages, puzzle_dialog, corner, pause_menu, win_screen, lose_screen)
+
+shown_puzzle = None
+
+def show_puzzle(puzzle):
+    # Lay the puzzle box out once per puzzle instead of every frame
+    global shown_puzzle
+    shown_puzzle = puzzle
+    puzzle_dialog.clear()
+    if puzzle is None:
+        return
+    lines = puzzle["question"].split('\n')
+    line_height = small_font.get_height() + 4
+    question_height = len(lines) * line_height
+
+    option_height = 40
+    option_spacing = 8
+    total_options_height = len(puzzle["options"]) * (option_height + option_spacing)
+
+    padding = 24
+    box_width = 640
+    box_height = padding*2 + question_height + total_options_height
+
+    puzzle_rect = pygame.Rect(
+        VIRTUAL_WIDTH//2 - box_width//2,
+        VIRTUAL_HEIGHT//2 - box_height//2,
+        box_width,
+        box_height
+    )
+    puzzle_dialog.add(Overlay(puzzle_rect, (30,30,30), outline=((200,200,200), 3)))
+    for i, line in enumerate(lines):
+        puzzle_dialog.add(Label(small_font, line, (255,255,255),
+                                topleft=(puzzle_rect.x + 20, puzzle_rect.y + padding + i*line_height)))
+
+    options_start_y = puzzle_rect.y + padding + question_height + 10
+    for i, opt in enumerate(puzzle["options"]):
+        opt_rect = pygame.Rect(
+            puzzle_rect.x + 40,
+            options_start_y + i*(option_height + option_spacing),
+            box_width - 80,
+            option_height
+        )
+        puzzle_dialog.add(Button(("option", i), opt_rect, (80,80,80), opt, small_font, (255,255,0),
+                                 text_pos=(10, 8), outline=((200,200,200), 2)))
+
+puzzle_dialog = Dialog()
+build_ui()
+
+# --- Input: raw events -> game actions ---
+def world_pos(pos):
+    # Virtual surface coordinates -> the world coordinates game actions use
+    x, y = camera.to_world(*pos)
+    return int(x), int(y)
+
+def camera_input(event):
+    # Returns True for events that only move the view; they never reach the game
+    global panning
+    if event.type == pygame.MOUSEWHEEL:
+        camera.zoom_at(*controls.mouse_pos, event.y)
+        return True
+    if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP) and event.button != 1:
+        # Only the left button plays; the right one drags the view, wheel clicks are MOUSEWHEEL's
+        if event.button == 3:
+            panning = controls.to_logical(event.pos) if event.type == pygame.MOUSEBUTTONDOWN else None
+        return True
+    if event.type == pygame.KEYDOWN and event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS,
+                                                      pygame.K_MINUS, pygame.K_KP_MINUS):
+        step = -1 if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS) else 1
+        camera.zoom_at(VIRTUAL_WIDTH // 2, VIRTUAL_HEIGHT // 2, step)
+        return True
+    if event.type == pygame.KEYDOWN and event.key == pygame.K_HOME:
+        camera.reset()
+        return True
+    return False
+
+def pan_camera(mouse_pos):
+    # Held arrow keys and the right-button drag, once per frame
+    global panning
+    keys = pygame.key.get_pressed()
+    dx = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * PAN_SPEED
+    dy = (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * PAN_SPEED
+    if panning:
+        dx += panning[0] - mouse_pos[0]
+        dy += panning[1] - mouse_pos[1]
+        panning = mouse_pos
+    if dx or dy:
+        camera.pan(dx, dy)
+
+def event_to_action(event):
+    if event.type == pygame.QUIT or (
+        event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
+    ):
+        return ("quit",)
+
+    if event.type == pygame.KEYDOWN and event.key == pygame.K_d:
+        return ("toggle_dps",)
+
+    if event.type == pygame.MOUSEBUTTONUP:
+        return ("release",) + world_pos(controls.to_logical(event.pos))
+
+    if event.type != pygame.MOUSEBUTTONDOWN:
+        return None
+
+    vx, vy = controls.to_logical(event.pos)
+    clicked = ui.hit((vx, vy))
+    if clicked == "pause":
+        return ("pause",)
+    if paused:
+        if clicked in ("resume", "save", "settings", "restart", "mainmenu"):
+            return (clicked,)
+        return None
+    if game.puzzle_active and game.current_puzzle:
+        if isinstance(clicked, tuple) and clicked[0] == "option":
+            return ("answer", clicked[1])
+        return None
+    if game.game_won or game.game_lost:
+        return None
+    wx, wy = world_pos((vx, vy))
+    if not game.placing_tower:
+        if vx >= VIRTUAL_WIDTH - MENU_WIDTH:
+            if isinstance(clicked, tuple) and clicked[0] == "tower":
+                return ("select_tower", clicked[1])
+        elif game.selected_tower_type is not None:
+            return ("place", wx, wy)
+        else:
+            for i, tower in enumerate(game.towers):
+                if tower.type != 0 and abs(tower.x - wx) <= 20 and abs(tower.y - wy) <= 20:
+                    return ("cycle_priority", i)
+        return None
+    if clicked in ("accept", "cancel"):
+        return (clicked,)
+    return ("grab", wx, wy)
+
+def restart():
+    global paused
+    if recorder:
+        recorder.action(steps, ("restart",))
+    game.restore(initial_snapshot)
+    particles.clear()
+    paused = False
+
+def apply_action(action):
+    # Screen-level actions are handled here, everything else goes to the game
+    global running, paused, settings, invert, saved_at, show_dps
+    kind = action[0]
+
+    if kind == "quit":
+        running = False
+    elif kind == "toggle_dps":
+        show_dps = not show_dps
+
+    elif kind == "pause":
+        paused = True
+    elif kind == "resume":
+        paused = False
+    elif kind == "save" and LEVEL_FILE:
+        print("Editor levels can't be saved mid-game")
+    elif kind == "save":
+        try:
+            game.save(SAVE_FILE)
+            saved_at = game.ticks
+        except OSError as e:
+            print(f"Could not save game: {e}")
+    elif kind == "settings":
+        scenes.call("settings.py")
+        controls.activate()
+        settings = load_settings()
+        invert = settings.get("invert_colors", False)
+        build_sprites()
+        build_ui()
+        show_puzzle(shown_puzzle)
+    elif kind == "restart":
+        restart()
+    elif kind == "mainmenu":
+        scenes.goto("Start-Menu.py")
+        running = False
+
+    # Finishing a drag must still work while paused
+    elif kind in ("drag", "release") or not paused:
+        if recorder:
+            recorder.action(steps, action)
+        game.apply_action(action)
+
+def present():
+    # Usually the frame was drawn straight into the display (see virtual_surface)
+    if virtual_surface is not screen:
+        screen.blit(pygame.transform.scale(virtual_surface, screen.get_size()), (0, 0))
+    pygame.display.flip()
+
+def simulate():
+    # One frame's worth of ticks; returns the effect events they produced
+    global steps
+    effects = []
+    for _ in range(SPEED):
+        if bot:
+            for action in bot.actions():
+                apply_action(action)
+        if player:
+            for action in player.actions(steps):
+                apply_action(action)
+        game.tick()
+        steps += 1
+        if recorder:
+            recorder.tick(steps, game)
+        if publisher:
+            publisher.tick(game)
+        effects += game.events
+        if game.game_won or game.game_lost:
+            break
+    return effects
+
+controls = Controls((SCREEN_WIDTH, SCREEN_HEIGHT), (VIRTUAL_WIDTH, VIRTUAL_HEIGHT))
+sim = pipeline.SimThread(simulate) if THREADED else None
+
+# Throughput report at exit under --bot, to compare --threaded with the plain loop
+run_start, run_steps, frames_drawn = time.perf_counter(), steps, 0
+
+running = True
+while running:
+    frame_start = time.perf_counter()
+    # With --threaded the batch started last frame finishes here and the game is ours again
+    effects = sim.wait() if sim else []
+    events, mouse_pos = controls.poll()
+    for event in events:
+        if not player and camera_input(event):
+            continue
+        action = event_to_action(event)
+        if action and (not player or action[0] == "quit"):
+            apply_action(action)
+    if not player:
+        pan_camera(mouse_pos)
+    if game.placing_tower and game.dragging and not player:
+        apply_action(("drag",) + world_pos(mouse_pos))
+
+    if not paused and not sim:
+        effects = simulate()
+
+    if bot and (game.game_won or game.game_lost):
+        games_played += 1
+        print(f"bot game {games_played}: {'won' if game.game_won else 'lost'}, score {game.score}, {game.ticks} ticks")
+        restart()
+        continue
+
+    if player:
+        if steps >= player.last:
+            break
+        if steps < player.first:
+            continue  # Still resimulating up to the first frame
+
+    view = pipeline.View(game, camera.area())
+    if sim and not paused and not (view.won or view.lost):
+        sim.start()  # Simulate the next frame while this one is drawn
+
+    spawn_effects(effects)
+    if not paused:
+        particles.update()
+
+    settings_now = governor.settings
+    scale = settings_now["render_scale"]
+    world = world_surface(scale)
+    board_scale = scale * camera.zoom
+    board_offset = camera.offset(board_scale)
+    board = sprite_set(board_scale)["board"]
+    if board.get_width() < world.get_width() or board.get_height() < world.get_height():
+        world.fill(board_color())  # Zoomed out past the level's edges
+    # Only the part of the board in view is copied
+    world.blit(board, (0, 0), (board_offset, world.get_size()))
+    draw_entities(world, view, settings_now)
+    particles.draw(world, board_scale, board_offset)
+    if world is not virtual_surface:
+        pygame.transform.scale(world, (VIRTUAL_WIDTH, VIRTUAL_HEIGHT), virtual_surface)
+
+    if game.path and (show_dps or view.selected_tower_type is not None):
+        draw_dps(virtual_surface, preview_dps(view) if view.preview and view.preview[3] else view.dps)
 
     # Draw placement preview if needed
-    if placing_tower and placement_preview:
-        px, py, ttype = placement_preview
-        valid = is_valid_tower_position(px, py, ttype)
+    if view.preview:
+        px, py, ttype, valid = view.preview
+        zoom = camera.zoom
+        px, py = (int(v) for v in camera.to_screen(px, py))
         if valid:
             preview_color = TOWER_TYPES[ttype]["color"] if not invert else invert_color(TOWER_TYPES[ttype]["color"])
             radius_color = (100, 100, 255) if not invert else invert_color((100, 100, 255))
@@ -850,154 +722,97 @@ while running:
             preview_color = (200, 50, 50) if not invert else invert_color((200, 50, 50))
             radius_color = (200, 50, 50) if not invert else invert_color((200, 50, 50))
         # Draw preview square matching the tower image size
-        if ttype == 0:
-            pygame.draw.rect(virtual_surface, preview_color, (px - 45, py - 45, 90, 90), 2)  # Blue tower: 90x90
-        else:
-            pygame.draw.rect(virtual_surface, preview_color, (px - 20, py - 20, 40, 40), 2)
+        half = (45 if ttype == 0 else 20) * zoom  # Blue tower: 90x90
+        pygame.draw.rect(virtual_surface, preview_color, (px - half, py - half, 2 * half, 2 * half), 2)
         pygame.draw.circle(
             virtual_surface,
             radius_color,
             (px, py),
-            TOWER_TYPES[ttype]["range"],
+            TOWER_TYPES[ttype]["range"] * zoom,
             1,
         )
-        accept_rect = pygame.Rect(px + 50, py - 30, 80, 40)
-        cancel_rect = pygame.Rect(px - 130, py - 30, 80, 40)
-        pygame.draw.rect(virtual_surface, (0, 200, 0), accept_rect)
-        pygame.draw.rect(virtual_surface, (200, 0, 0), cancel_rect)
-        accept_label = small_font.render("Accept", True, (255, 255, 255))
-        cancel_label = small_font.render("Cancel", True, (255, 255, 255))
-        virtual_surface.blit(accept_label, (px + 60, py - 22))
-        virtual_surface.blit(cancel_label, (px - 120, py - 22))
-
-    # --- Puzzle UI ---
-    if puzzle_active and current_puzzle:
-        # Calculate question height
-        lines = current_puzzle["question"].split('\n')
-        line_height = small_font.get_height() + 4
-        question_height = len(lines) * line_height
-
-        option_height = 40
-        option_spacing = 8
-        total_options_height = len(current_puzzle["options"]) * (option_height + option_spacing)
-
-        padding = 24
-        box_width = 640
-        box_height = padding*2 + question_height + total_options_height
-
-        puzzle_rect = pygame.Rect(
-            VIRTUAL_WIDTH//2 - box_width//2,
-            VIRTUAL_HEIGHT//2 - box_height//2,
-            box_width,
-            box_height
-        )
-        pygame.draw.rect(virtual_surface, (30,30,30), puzzle_rect)
-        pygame.draw.rect(virtual_surface, (200,200,200), puzzle_rect, 3)
-
-        # Draw question
-        for i, line in enumerate(lines):
-            q_text = small_font.render(line, True, (255,255,255))
-            virtual_surface.blit(q_text, (puzzle_rect.x + 20, puzzle_rect.y + padding + i*line_height))
-
-        # Draw options
-        option_rects = []
-        options_start_y = puzzle_rect.y + padding + question_height + 10
-        for i, opt in enumerate(current_puzzle["options"]):
-            opt_rect = pygame.Rect(
-                puzzle_rect.x + 40,
-                options_start_y + i*(option_height + option_spacing),
-                box_width - 80,
-                option_height
-            )
-            pygame.draw.rect(virtual_surface, (80,80,80), opt_rect)
-            pygame.draw.rect(virtual_surface, (200,200,200), opt_rect, 2)
-            # Wrap answer text if too long
-            opt_text = small_font.render(opt, True, (255,255,0))
-            virtual_surface.blit(opt_text, (opt_rect.x + 10, opt_rect.y + 8))
-            option_rects.append(opt_rect)
-        puzzle_option_rects = option_rects
-    elif puzzle_result == "invalid":
-        res_text = font.render("Invalid position!", True, (255,0,0))
-        virtual_surface.blit(res_text, res_text.get_rect(center=(VIRTUAL_WIDTH//2, VIRTUAL_HEIGHT//2)))
-    elif puzzle_result is not None:
-        result_text = "Correct!" if puzzle_result else "Incorrect!"
-        color = (0,255,0) if puzzle_result else (255,0,0)
-        res_text = font.render(result_text, True, color)
-        virtual_surface.blit(res_text, res_text.get_rect(center=(VIRTUAL_WIDTH//2, VIRTUAL_HEIGHT//2)))
-
-    if paused:
-        draw_pause_menu(virtual_surface)
+        accept_button.move_to(topleft=(px + 50, py - 30))
+        cancel_button.move_to(topleft=(px - 130, py - 30))
+
+    # --- UI: update retained widgets, then blit them ---
+    if view.puzzle is not shown_puzzle:
+        show_puzzle(view.puzzle)
+    lives_label.set_text(f"Lives: {view.lives}  Score: {view.score}")
+    wave_label.set_text(f"Wave: {view.wave}")
+    quality_label.set_visible(governor.level > 0)
+    quality_label.set_text(f"Quality: {settings_now['name']}")
+    for i, button in enumerate(tower_buttons):
+        button.set_selected(view.selected_tower_type == i)
+        cooldown = view.cooldowns[i]
+        cooldown_overlays[i].set_visible(cooldown > 0)
+        cooldown_labels[i].set_visible(cooldown > 0)
+        if cooldown > 0:
+            cooldown_labels[i].set_text(f"{cooldown//60+1}s")
+    placement_layer.visible = bool(view.preview)
+    puzzle_dialog.visible = view.puzzle_open
+    invalid_label.set_visible(not puzzle_dialog.visible and view.puzzle_result == "invalid")
+    correct_label.set_visible(not puzzle_dialog.visible and view.puzzle_result is True)
+    incorrect_label.set_visible(not puzzle_dialog.visible and view.puzzle_result is False)
+    saved_label.set_visible(saved_at == view.ticks)
+    pause_menu.visible = paused
+    win_screen.visible = view.won
+    lose_screen.visible = view.lost
+    ui.draw(virtual_surface)
+
+    if player:
+        player.write(steps, virtual_surface)
+        continue
 
     # WIN/LOSE SCENES
-    if game_won:
-        win_text = big_font.render("You Win!", True, (0, 255, 0))
-        text_rect = win_text.get_rect(midtop=(VIRTUAL_WIDTH//2, 60))
-        bg_rect = pygame.Rect(text_rect.left - 20, text_rect.top - 10, text_rect.width + 40, text_rect.height + 20)
-        pygame.draw.rect(virtual_surface, (0, 0, 0), bg_rect)
-        virtual_surface.blit(win_text, text_rect)
-        unlock_level(2)
-        scaled = pygame.transform.scale(virtual_surface, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        screen.blit(scaled, (0, 0))
-        pygame.display.flip()
+    if view.won:
+        if not LEVEL_FILE:
+            unlock_level(3 if MAZE else 2)
+        present()
         pygame.time.wait(2000)
-        subprocess.Popen([sys.executable, "level_select.py"])
+        scenes.goto("level_select.py")
         break
 
-    if game_lost:
-        lose_text = big_font.render("You Lose!", True, (255, 0, 0))
-        text_rect = lose_text.get_rect(midtop=(VIRTUAL_WIDTH//2, 60))
-        bg_rect = pygame.Rect(text_rect.left - 20, text_rect.top - 10, text_rect.width + 40, text_rect.height + 20)
-        pygame.draw.rect(virtual_surface, (0, 0, 0), bg_rect)
-        virtual_surface.blit(lose_text, text_rect)
-        restart_rect = pygame.Rect(VIRTUAL_WIDTH//2 - 120, VIRTUAL_HEIGHT//2 + 10, 240, 60)
-        levelselect_rect = pygame.Rect(VIRTUAL_WIDTH//2 - 120, VIRTUAL_HEIGHT//2 + 90, 240, 60)
-        mainmenu_rect = pygame.Rect(VIRTUAL_WIDTH//2 - 120, VIRTUAL_HEIGHT//2 + 170, 240, 60)
-        pygame.draw.rect(virtual_surface, (100, 200, 100), restart_rect)
-        pygame.draw.rect(virtual_surface, (100, 100, 255), levelselect_rect)
-        pygame.draw.rect(virtual_surface, (200, 0, 0), mainmenu_rect)
-        restart_label = font.render("Restart", True, (255,255,255))
-        levelselect_label = font.render("Level Select", True, (255,255,255))
-        mainmenu_label = font.render("Main Menu", True, (255,255,255))
-        virtual_surface.blit(restart_label, restart_label.get_rect(center=restart_rect.center))
-        virtual_surface.blit(levelselect_label, levelselect_label.get_rect(center=levelselect_rect.center))
-        virtual_surface.blit(mainmenu_label, mainmenu_label.get_rect(center=mainmenu_rect.center))
-        scaled = pygame.transform.scale(virtual_surface, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        screen.blit(scaled, (0, 0))
-        pygame.display.flip()
-        waiting = True
-        while waiting:
-            for event in pygame.event.get():
+    if view.lost:
+        present()
+        choice = None
+        while choice is None:
+            for event in controls.wait():
                 if event.type == pygame.QUIT:
-                    waiting = False
-                    running = False
+                    choice = "quit"
                 elif event.type == pygame.MOUSEBUTTONDOWN:
-                    mx, my = pygame.mouse.get_pos()
-                    vx = int(mx * VIRTUAL_WIDTH / SCREEN_WIDTH)
-                    vy = int(my * VIRTUAL_HEIGHT / SCREEN_HEIGHT)
-                    if restart_rect.collidepoint(vx, vy):
-                        subprocess.Popen([sys.executable, "level1.py"])
-                        waiting = False
-                        running = False
-                    elif levelselect_rect.collidepoint(vx, vy):
-                        subprocess.Popen([sys.executable, "level_select.py"])
-                        waiting = False
-                        running = False
-                    elif mainmenu_rect.collidepoint(vx, vy):
-                        subprocess.Popen([sys.executable, "Start-Menu.py"])
-                        waiting = False
-                        running = False
+                    clicked = lose_screen.hit(controls.to_logical(event.pos))
+                    if clicked in ("restart", "levelselect", "mainmenu"):
+                        choice = clicked
+                        break
+        if choice == "restart":
+            restart()
+            continue
+        if choice == "levelselect":
+            scenes.goto("level_select.py")
+        elif choice == "mainmenu":
+            scenes.goto("Start-Menu.py")
         break
 
-    scaled = pygame.transform.scale(virtual_surface, (SCREEN_WIDTH, SCREEN_HEIGHT))
-    screen.blit(scaled, (0, 0))
-    pygame.display.flip()
-
-    # Puzzle cooldown decrement (now per-tower-type)
-    for i in range(len(tower_place_cooldowns)):
-        if tower_place_cooldowns[i] > 0:
-            tower_place_cooldowns[i] -= 1
-    if puzzle_result is not None and tower_place_cooldowns[0] == 0:
-        puzzle_result = None
-
-pygame.quit()
-sys.exit()
+    governor.frame((time.perf_counter() - frame_start) * 1000)
+    present()
+    frames_drawn += 1
+    startup.first_frame(__file__)
+    towers, enemies, bullets = view.counts
+    memtrack.frame(view.wave, towers=towers, enemies=enemies,
+                   queued=view.queued, bullets=bullets, particles=particles.count,
+                   quality=governor.level)
+
+if bot:
+    elapsed = time.perf_counter() - run_start
+    print(f"{'threaded' if sim else 'single-threaded'}: {frames_drawn / elapsed:.1f} frames/s, "
+          f"{(steps - run_steps) / elapsed:.0f} ticks/s over {elapsed:.1f}s")
+if sim:
+    sim.close()
+if publisher:
+    publisher.close()
+if recorder:
+    recorder.close()
+if player:
+    player.close()
+memtrack.report()
+scenes.exit()
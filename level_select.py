@@ -1,10 +1,18 @@
+import startup
 import pygame
-import sys
 import os
-import subprocess
 import json
+from widgets import Button, Label, Layer, UI
+from controls import Controls, MENU_EVENTS, REDRAW_EVENTS
+import scenes
+import loader
+import fonts
+from game import snapshot_kind
+
+scenes.main(__file__)
 
 SETTINGS_FILE = "settings.json"
+SAVE_FILE = "savegame.bin"
 
 def load_settings():
     if os.path.exists(SETTINGS_FILE):
@@ -21,17 +29,19 @@ info = pygame.display.Info()
 screen_width, screen_height = info.current_w, info.current_h
 screen = pygame.display.set_mode((screen_width, screen_height), pygame.FULLSCREEN)
 pygame.display.set_caption("Level Select")
+loader.preload("level1")
+startup.mark("display")
 
 settings = load_settings()
 invert = settings.get("invert_colors", False)
 unlocked_levels = settings.get("unlocked_levels", 1)
 
-font = pygame.font.SysFont(None, 60)
-small_font = pygame.font.SysFont(None, 40)
+font = fonts.get(None, 60)
+small_font = fonts.get(None, 40)
+startup.mark("fonts")
 
 # Level button settings
 levels = 10
-level_buttons = []
 button_width, button_height = 200, 100
 gap = 40
 start_x = (screen_width - (button_width * 5 + gap * 4)) // 2
@@ -40,68 +50,100 @@ start_y = screen_height // 2 - button_height - gap // 2
 # Only level 1 is unlocked
 # unlocked_levels = 1
 
-# Create level button rects and labels
-for i in range(levels):
-    row = i // 5
-    col = i % 5
-    x = start_x + col * (button_width + gap)
-    y = start_y + row * (button_height + gap)
-    rect = pygame.Rect(x, y, button_width, button_height)
-    label = font.render(f"Level {i+1}", True, invert_color((255, 255, 255)) if invert else (255, 255, 255))
-    level_buttons.append((rect, label))
-
 # Arrow (back) button
 arrow_points = [
     (80, 80), (40, 120), (80, 160), (80, 130), (160, 130), (160, 110), (80, 110)
 ]
 arrow_rect = pygame.Rect(40, 80, 120, 80)
 
+layer = Layer()
+
+# Create level buttons and labels
+label_color = invert_color((255, 255, 255)) if invert else (255, 255, 255)
+lock_color = invert_color((255, 0, 0)) if invert else (255, 0, 0)
+for i in range(levels):
+    row = i // 5
+    col = i % 5
+    x = start_x + col * (button_width + gap)
+    y = start_y + row * (button_height + gap)
+    rect = pygame.Rect(x, y, button_width, button_height)
+    if i < unlocked_levels:
+        color = (0, 200, 0) if not invert else invert_color((0, 200, 0))
+    else:
+        color = (100, 100, 100) if not invert else invert_color((100, 100, 100))
+    layer.add(Button(("level", i), rect, color, f"Level {i+1}", font, label_color, border_radius=20))
+    if i >= unlocked_levels:
+        layer.add(Label(small_font, "Locked", lock_color, center=(rect.centerx, rect.centery + 30)))
+
+# Draw back arrow once
+arrow_color = (255, 255, 0) if not invert else invert_color((255, 255, 0))
+arrow = pygame.Surface(arrow_rect.size, pygame.SRCALPHA)
+pygame.draw.polygon(arrow, arrow_color, [(x - arrow_rect.x, y - arrow_rect.y) for x, y in arrow_points])
+outline_color = invert_color((0, 0, 0)) if invert else (0, 0, 0)
+layer.add(Button("back", arrow_rect, image=arrow, outline=(outline_color, 2)))
+layer.add(Label(small_font, "Back", arrow_color, topleft=(arrow_rect.right + 10, arrow_rect.centery - 20)))
+
+# Continue a game saved from the level 1 pause menu
+if os.path.exists(SAVE_FILE):
+    resume_rect = pygame.Rect(screen_width // 2 - 150, start_y + 2 * (button_height + gap) + 20, 300, button_height)
+    resume_color = (0, 160, 160) if not invert else invert_color((0, 160, 160))
+    layer.add(Button("resume", resume_rect, resume_color, "Resume", font, label_color, border_radius=20))
+
+# Make your own level (editor.py)
+editor_rect = pygame.Rect(screen_width - 340, screen_height - button_height - 40, 300, button_height)
+editor_color = (120, 80, 160) if not invert else invert_color((120, 80, 160))
+layer.add(Button("editor", editor_rect, editor_color, "Editor", font, label_color, border_radius=20))
+
+ui = UI(layer)
+bg_color = (30, 30, 30) if not invert else (225, 225, 225)
+
+controls = Controls((screen_width, screen_height), (screen_width, screen_height), MENU_EVENTS)
+
+redraw = True
 running = True
 while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT or (
+    if redraw:
+        screen.fill(bg_color)
+        ui.draw(screen)
+        pygame.display.flip()
+        startup.first_frame(__file__)
+        redraw = False
+
+    for event in controls.wait():
+        if event.type in REDRAW_EVENTS:
+            redraw = True
+        elif event.type == pygame.QUIT or (
             event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
         ):
             running = False
         elif event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_pos = event.pos
+            clicked = ui.hit(event.pos)
             # Check level buttons
-            for i, (rect, label) in enumerate(level_buttons):
-                if rect.collidepoint(mouse_pos):
-                    if i < unlocked_levels:
-                        if i == 0:
-                            subprocess.Popen([sys.executable, "level1.py"])
-                            running = False
-                        else:
-                            print(f"Level {i+1} selected!")  # Placeholder for other levels
+            if isinstance(clicked, tuple) and clicked[0] == "level":
+                i = clicked[1]
+                if i < unlocked_levels:
+                    if i == 0:
+                        scenes.goto("level1.py")
+                        running = False
+                    elif i == 1:
+                        scenes.goto("level1.py", "--maze")
+                        running = False
+                    else:
+                        print(f"Level {i+1} selected!")  # Placeholder for other levels
+            elif clicked == "resume":
+                try:
+                    with open(SAVE_FILE, "rb") as f:
+                        maze = snapshot_kind(f.read()) == "maze"
+                except (OSError, ValueError):
+                    maze = False
+                scenes.goto("level1.py", *(["--maze"] if maze else []), "--resume")
+                running = False
+            elif clicked == "editor":
+                scenes.goto("editor.py")
+                running = False
             # Check arrow (back) button
-            if arrow_rect.collidepoint(mouse_pos):
-                subprocess.Popen([sys.executable, "Start-Menu.py"])
+            elif clicked == "back":
+                scenes.goto("Start-Menu.py")
                 running = False
 
-    bg_color = (30, 30, 30) if not invert else (225, 225, 225)
-    screen.fill(bg_color)
-
-    # Draw level buttons
-    for i, (rect, label) in enumerate(level_buttons):
-        if i < unlocked_levels:
-            color = (0, 200, 0) if not invert else invert_color((0, 200, 0))
-        else:
-            color = (100, 100, 100) if not invert else invert_color((100, 100, 100))
-        pygame.draw.rect(screen, color, rect, border_radius=20)
-        screen.blit(label, label.get_rect(center=rect.center))
-        if i >= unlocked_levels:
-            lock = small_font.render("Locked", True, invert_color((255, 0, 0)) if invert else (255, 0, 0))
-            screen.blit(lock, lock.get_rect(center=(rect.centerx, rect.centery + 30)))
-
-    # Draw back arrow
-    arrow_color = (255, 255, 0) if not invert else invert_color((255, 255, 0))
-    pygame.draw.polygon(screen, arrow_color, arrow_points)
-    pygame.draw.rect(screen, invert_color((0, 0, 0)) if invert else (0, 0, 0), arrow_rect, 2)
-    back_label = small_font.render("Back", True, arrow_color)
-    screen.blit(back_label, (arrow_rect.right + 10, arrow_rect.centery - 20))
-
-    pygame.display.flip()
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+scenes.exit()
\ No newline at end of file
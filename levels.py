@@ -0,0 +1,42 @@
+import json
+import os
+
+from buildmask import BuildMask
+
+# --- Level geometry ---
+LEVEL1_PATH = [(0, 400), (400, 400), (400, 700), (1000, 700), (1000, 100),
+               (1600, 100), (1600, 250), (1350, 250), (1350, 650),
+               (1600, 650), (1600, 900), (800, 900), (800, 1100)]
+
+# Open-field level: towers block grid cells and enemies route around them
+MAZE1 = {
+    "cols": 45,
+    "rows": 27,
+    "cell": 40,
+    "spawn": (0, 13),
+    "exit": (44, 13),
+}
+
+# Levels made with editor.py
+CUSTOM_LEVEL = "custom_level.json"
+
+
+def load_level(filename):
+    # {"path": [[x, y], ...], "waves": [{enemy class: count}, ...],
+    #  "grid": [cols, rows, tile], "no_build": [painted tile, ...]}
+    with open(filename, "r") as f:
+        return json.load(f)
+
+
+def save_level(filename, level):
+    tmp = filename + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(level, f)
+    os.replace(tmp, filename)
+
+
+def level_build_mask(level):
+    mask = BuildMask(*level["grid"])
+    for i in level["no_build"]:
+        mask.painted[i] = 1
+    return mask
@@ -0,0 +1,113 @@
+import threading
+
+import pygame
+
+import spritecache
+from pathing import CompiledPath
+
+# Background preloading of a screen's assets. A worker thread loads images (from
+# the baked sprite cache, see spritecache.py) and builds level data while an
+# earlier screen sits idle in event.wait(). convert_alpha() needs the display,
+# so it runs on the main thread in collect().
+
+LEVEL1_IMAGES = [
+    # Make enemy images bigger
+    ("enemy", "WannaCry.png", (60, 60)),  # Now square, same as BonziBUDDY
+    ("fast_enemy", "trojan.png", (60, 60)),
+    ("durable_enemy", "BonziBUDDY.webp", (60, 60)),
+    # Make blue tower image even bigger
+    ("blue_tower", "pindows_defender.png", (90, 90)),  # Increased from 60x60
+]
+
+
+def cached_images(screen_size):
+    # Every (path, size, inverted) variant the screens load through the sprite cache
+    images = [("background.png", screen_size, False), ("background.png", screen_size, True)]
+    return images + [(path, size, False) for _, path, size in LEVEL1_IMAGES]
+
+
+def _image(path, size):
+    return lambda: spritecache.load(path, size)
+
+
+def _puzzles():
+    from puzzles import PUZZLES
+    return PUZZLES
+
+
+def _level1_path():
+    from levels import LEVEL1_PATH
+    return CompiledPath(LEVEL1_PATH)
+
+
+def _scene_steps(name, screen_size):
+    if name == "start_menu":
+        return [("background", _image("background.png", screen_size))]
+    if name == "level1":
+        return [(key, _image(path, size)) for key, path, size in LEVEL1_IMAGES] + [
+            ("puzzles", _puzzles),
+            ("path", _level1_path),
+        ]
+    raise ValueError(f"Unknown scene: {name}")
+
+
+class Preload:
+    def __init__(self, steps):
+        self.steps = steps
+        self.results = {}
+        self.done = 0
+        self.error = None
+        self.finished = threading.Event()
+        self.converted = False
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        try:
+            for key, step in self.steps:
+                self.results[key] = step()
+                self.done += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished.set()
+
+    def progress(self):
+        return self.done / len(self.steps)
+
+
+_preloads = {}
+
+
+def preload(name):
+    # Start loading a screen's assets in the background (no-op if already started)
+    if name not in _preloads:
+        info = pygame.display.Info()
+        _preloads[name] = Preload(_scene_steps(name, (info.current_w, info.current_h)))
+    return _preloads[name]
+
+
+def collect(name, screen):
+    # Return a screen's assets. Only shows a progress bar if the worker is not done yet.
+    job = preload(name)
+    while not job.finished.wait(1 / 60):
+        pygame.event.pump()
+        _draw_progress(screen, job.progress())
+    if job.error is not None:
+        del _preloads[name]
+        raise job.error
+    if not job.converted:
+        for key, value in job.results.items():
+            if isinstance(value, pygame.Surface):
+                job.results[key] = value.convert_alpha()
+        job.converted = True
+    return job.results
+
+
+def _draw_progress(screen, fraction):
+    width, height = screen.get_size()
+    bar = pygame.Rect(0, 0, width // 3, 24)
+    bar.center = (width // 2, height // 2)
+    screen.fill((30, 30, 30))
+    pygame.draw.rect(screen, (0, 200, 0), (bar.x, bar.y, int(bar.width * fraction), bar.height))
+    pygame.draw.rect(screen, (200, 200, 200), bar, 2)
+    pygame.display.flip()
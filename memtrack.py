@@ -0,0 +1,121 @@
+import gc
+import os
+import time
+import tracemalloc
+
+import pygame
+
+# Memory/allocation tracker for long unattended sessions, enabled with
+# DEFEND_MEMTRACK=1. Samples on every new wave and every
+# DEFEND_MEMTRACK_INTERVAL seconds (default 60): Python heap (tracemalloc),
+# entity counts, and the allocation sites that grew most since the previous
+# sample. Memory that keeps growing across samples is flagged.
+#
+# With DEFEND_MEMTRACK_SURFACES=1 samples also count live pygame Surfaces and
+# their pixel memory (allocated by SDL, invisible to tracemalloc). Surfaces come
+# from too many places (image loads, transforms, font renders) to count at
+# creation, so that means walking every object the gc tracks: a hitch that grows
+# with the heap, hence only on request.
+ENABLED = os.environ.get("DEFEND_MEMTRACK") == "1"
+INTERVAL = float(os.environ.get("DEFEND_MEMTRACK_INTERVAL", "60"))
+SURFACES = os.environ.get("DEFEND_MEMTRACK_SURFACES") == "1"
+
+TOP_SITES = 8
+LEAK_SAMPLES = 6                # Consecutive growing samples before flagging a leak
+LEAK_MIN_GROWTH = 256 * 1024    # ...and at least this much growth over them (bytes)
+
+_start = None
+_last_time = 0.0
+_last_wave = None
+_last_snapshot = None
+_peak = 0  # Session peak of the Python heap, not counting the surface walks
+_history = []  # (python bytes, surface count, surface bytes) per sample; surfaces are None unless SURFACES
+_IGNORE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def start():
+    # Safe to call from every screen; tracking spans in-process screen switches
+    global _start, _last_time
+    if not ENABLED or _start is not None:
+        return
+    tracemalloc.start(8)
+    _start = _last_time = time.perf_counter()
+
+
+def surfaces():
+    # Surfaces aren't tracked by the gc themselves, so find them through the containers that hold them
+    found = {}
+    for obj in gc.get_referents(*gc.get_objects()):
+        if isinstance(obj, pygame.Surface):
+            found[id(obj)] = obj
+    return len(found), sum(s.get_pitch() * s.get_height() for s in found.values())
+
+
+def frame(wave, **counts):
+    # Call once per frame with the current wave and entity counts
+    global _last_wave
+    if _start is None:
+        return
+    now = time.perf_counter()
+    if wave != _last_wave:
+        _last_wave = wave
+        sample(f"wave {wave}", counts)
+    elif now - _last_time >= INTERVAL:
+        sample("interval", counts)
+
+
+def sample(reason, counts):
+    global _last_time, _last_snapshot, _peak
+    _last_time = time.perf_counter()
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORE)
+    current, peak = tracemalloc.get_traced_memory()
+    _peak = max(_peak, peak)
+    n_surfaces = surface_bytes = None
+    surface_text = ""
+    if SURFACES:
+        n_surfaces, surface_bytes = surfaces()
+        surface_text = f"surfaces {n_surfaces} ({surface_bytes / 2**20:.1f} MiB), "
+        tracemalloc.reset_peak()  # The walk's own object list isn't part of the game's peak
+    entities = ", ".join(f"{name} {n}" for name, n in counts.items())
+    print(f"[memtrack] {_last_time - _start:.0f}s {reason}: python {current / 1024:.0f} KiB "
+          f"(peak {_peak / 1024:.0f} KiB), {surface_text}{entities}")
+    if _last_snapshot is not None:
+        for stat in snapshot.compare_to(_last_snapshot, "lineno")[:TOP_SITES]:
+            if stat.size_diff:
+                print(f"[memtrack]   {stat}")
+    _last_snapshot = snapshot
+    _history.append((current, n_surfaces, surface_bytes))
+    _check_growth()
+
+
+def _check_growth():
+    if len(_history) <= LEAK_SAMPLES:
+        return
+    recent = _history[-LEAK_SAMPLES - 1:]
+    for i, name in ((0, "python heap"), (2, "surface memory"))[:2 if SURFACES else 1]:
+        values = [s[i] for s in recent]
+        growth = values[-1] - values[0]
+        if all(b > a for a, b in zip(values, values[1:])) and growth >= LEAK_MIN_GROWTH:
+            print(f"[memtrack] LEAK? {name} grew {growth / 1024:.0f} KiB over the last {LEAK_SAMPLES} samples")
+    if not SURFACES:
+        return
+    counts = [s[1] for s in recent]
+    if all(b > a for a, b in zip(counts, counts[1:])):
+        print(f"[memtrack] LEAK? live surfaces went {counts[0]} -> {counts[-1]} over the last {LEAK_SAMPLES} samples")
+
+
+def report():
+    # Whole-session summary; call when the game screen exits
+    if _start is None or not _history:
+        return
+    first, last = _history[0], _history[-1]
+    surface_text = f", surfaces {first[1]} -> {last[1]}" if SURFACES else ""
+    print(f"[memtrack] session {time.perf_counter() - _start:.0f}s, {len(_history)} samples: "
+          f"python {first[0] / 1024:.0f} -> {last[0] / 1024:.0f} KiB{surface_text}")
@@ -0,0 +1,125 @@
+import math
+import random
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # Without numpy a slower pure-Python pool is used (see the list branches below)
+    np = None
+
+# Preallocated particle pool for hit sparks, death bursts and leak flashes.
+# Live particles are packed at the front of fixed-size arrays, so emitting,
+# stepping and drawing never allocate per particle. Once the budget is full new
+# particles are dropped, which keeps the cost per frame bounded. Without numpy
+# the pool is a list of [x, y, vx, vy, life, max life, color] entries with the
+# same budget, blended per particle with surface fills.
+
+PARTICLE_BUDGET = 2048
+DRAG = 0.92           # Velocity kept per frame
+DOT = ((0, 0), (1, 0), (0, 1), (1, 1))  # Particles are drawn as 2x2 pixels
+
+
+class Particles:
+    def __init__(self, budget=PARTICLE_BUDGET):
+        self.budget = budget
+        self.count = 0
+        if np is None:
+            self.items = []
+            self.rng = random.Random()
+            return
+        self.pos = np.zeros((budget, 2), np.float32)
+        self.vel = np.zeros((budget, 2), np.float32)
+        self.life = np.zeros(budget, np.float32)      # Frames left
+        self.max_life = np.ones(budget, np.float32)
+        self.color = np.zeros((budget, 3), np.float32)
+        # Own generator so effects never disturb the game's seeded RNG
+        self.rng = np.random.default_rng()
+
+    def emit(self, x, y, n, speed, life, color):
+        # Burst of n particles from (x, y); silently truncated at the budget
+        n = min(n, self.budget - self.count)
+        if n <= 0:
+            return
+        if np is None:
+            uniform = self.rng.uniform
+            for _ in range(n):
+                angle = uniform(0, 2 * math.pi)
+                magnitude = uniform(0.3, 1.0) * speed
+                lives = uniform(0.6, 1.0) * life
+                self.items.append([x, y, math.cos(angle) * magnitude, math.sin(angle) * magnitude,
+                                   lives, lives, color])
+            self.count += n
+            return
+        s = slice(self.count, self.count + n)
+        angle = self.rng.uniform(0, 2 * math.pi, n)
+        magnitude = self.rng.uniform(0.3, 1.0, n) * speed
+        self.pos[s] = (x, y)
+        self.vel[s, 0] = np.cos(angle) * magnitude
+        self.vel[s, 1] = np.sin(angle) * magnitude
+        lives = self.rng.uniform(0.6, 1.0, n) * life
+        self.life[s] = lives
+        self.max_life[s] = lives
+        self.color[s] = color
+        self.count += n
+
+    def clear(self):
+        self.count = 0
+        if np is None:
+            self.items = []
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        if np is None:
+            for p in self.items:
+                p[0] += p[2]
+                p[1] += p[3]
+                p[2] *= DRAG
+                p[3] *= DRAG
+                p[4] -= 1
+            self.items = [p for p in self.items if p[4] > 0]
+            self.count = len(self.items)
+            return
+        self.pos[:n] += self.vel[:n]
+        self.vel[:n] *= DRAG
+        self.life[:n] -= 1
+        alive = np.flatnonzero(self.life[:n] > 0)
+        k = len(alive)
+        if k < n:
+            # Compact survivors to the front
+            for arr in (self.pos, self.vel, self.life, self.max_life, self.color):
+                arr[:k] = arr[alive]
+            self.count = k
+
+    def draw(self, surf, scale=1.0, offset=(0, 0)):
+        # One vectorized blend into the surface's pixels, fading out with remaining life.
+        # scale and offset map game coordinates onto the surface (render scale, camera).
+        n = self.count
+        if not n:
+            return
+        w, h = surf.get_size()
+        if np is None:
+            # Same blend as below in two fills: darken by 1 - alpha, then add the faded color
+            for x, y, _, _, life, max_life, color in self.items:
+                x, y = int(x * scale - offset[0]), int(y * scale - offset[1])
+                if 0 <= x < w - 1 and 0 <= y < h - 1:
+                    alpha = life / max_life
+                    keep = int(255 * (1 - alpha))
+                    rect = (x, y, 2, 2)
+                    surf.fill((keep, keep, keep), rect, special_flags=pygame.BLEND_RGB_MULT)
+                    surf.fill([int(c * alpha) for c in color], rect, special_flags=pygame.BLEND_RGB_ADD)
+            return
+        xs = (self.pos[:n, 0] * scale - offset[0]).astype(np.intp)
+        ys = (self.pos[:n, 1] * scale - offset[1]).astype(np.intp)
+        inside = (xs >= 0) & (xs < w - 1) & (ys >= 0) & (ys < h - 1)
+        xs, ys = xs[inside], ys[inside]
+        alpha = (self.life[:n] / self.max_life[:n])[inside][:, None]
+        color = self.color[:n][inside] * alpha
+        keep = 1 - alpha
+        pixels = pygame.surfarray.pixels3d(surf)
+        for dx, dy in DOT:
+            px, py = xs + dx, ys + dy
+            pixels[px, py] = (pixels[px, py] * keep + color).astype(np.uint8)
+        del pixels  # Unlock the surface
@@ -0,0 +1,154 @@
+import bisect
+import math
+from operator import attrgetter
+
+# Helpers for things confined to the enemy path. Positions along the path are
+# expressed as arc length ("progress"): 0 at the spawn point, path.length at the exit.
+
+
+class CompiledPath:
+    def __init__(self, points):
+        self.points = [tuple(p) for p in points]
+        self.segments = [self._segment(i) for i in range(len(self.points) - 1)]  # (x1, y1, dx, dy, length)
+        self.starts = [0.0] * len(self.segments)  # Arc length at the start of each segment
+        self._accumulate(0)
+
+    def _segment(self, i):
+        (x1, y1), (x2, y2) = self.points[i], self.points[i + 1]
+        return x1, y1, x2 - x1, y2 - y1, math.hypot(x2 - x1, y2 - y1)
+
+    def _accumulate(self, first):
+        # Arc lengths from segment `first` on; earlier segments are unchanged
+        total = self.starts[first - 1] + self.segments[first - 1][4] if first > 0 else 0.0
+        for i in range(first, len(self.segments)):
+            self.starts[i] = total
+            total += self.segments[i][4]
+        self.length = total
+
+    # --- Editing (editor.py). Only the segments touching the edited point are
+    # rebuilt; the points list is changed in place so enemies walking it follow. ---
+    def move_point(self, i, x, y):
+        # Returns the indices of the segments that changed
+        self.points[i] = (x, y)
+        changed = [j for j in (i - 1, i) if 0 <= j < len(self.segments)]
+        for j in changed:
+            self.segments[j] = self._segment(j)
+        self._accumulate(changed[0] if changed else 0)
+        return changed
+
+    def insert_point(self, i, x, y):
+        # New point i, splitting segment i - 1
+        self.points.insert(i, (x, y))
+        slot = min(i, len(self.segments))
+        self.segments.insert(slot, None)
+        self.starts.insert(slot, 0.0)
+        for j in (i - 1, i):
+            if 0 <= j < len(self.segments):
+                self.segments[j] = self._segment(j)
+        self._accumulate(max(0, i - 1))
+
+    def remove_point(self, i):
+        del self.points[i]
+        j = min(i, len(self.segments) - 1)
+        del self.segments[j]
+        del self.starts[j]
+        if 0 < i < len(self.points):
+            self.segments[i - 1] = self._segment(i - 1)
+        self._accumulate(max(0, i - 1))
+
+    def point_at(self, progress):
+        i = max(0, min(len(self.segments) - 1, bisect.bisect_right(self.starts, progress) - 1))
+        x1, y1, dx, dy, length = self.segments[i]
+        t = 0.0 if length == 0 else max(0.0, min(1.0, (progress - self.starts[i]) / length))
+        return x1 + t * dx, y1 + t * dy
+
+    def stretch(self, lo, hi):
+        # Points of the path from arc length lo to hi, for drawing part of it
+        first = bisect.bisect_right(self.starts, lo)
+        last = bisect.bisect_left(self.starts, hi)
+        return [self.point_at(lo)] + self.points[first:last] + [self.point_at(hi)]
+
+    def circle_intervals(self, cx, cy, radius):
+        # Sorted, merged (start, end) arc-length intervals of the path that lie inside the circle
+        intervals = []
+        for start, (x1, y1, dx, dy, length) in zip(self.starts, self.segments):
+            fx, fy = x1 - cx, y1 - cy
+            if length == 0:
+                if fx * fx + fy * fy <= radius * radius:
+                    intervals.append((start, start))
+                continue
+            # |f + t*d|^2 <= r^2  ->  a*t^2 + b*t + c <= 0
+            a = dx * dx + dy * dy
+            b = 2 * (fx * dx + fy * dy)
+            c = fx * fx + fy * fy - radius * radius
+            disc = b * b - 4 * a * c
+            if disc < 0:
+                continue
+            root = math.sqrt(disc)
+            t0 = max(0.0, (-b - root) / (2 * a))
+            t1 = min(1.0, (-b + root) / (2 * a))
+            if t0 > t1:
+                continue
+            intervals.append((start + t0 * length, start + t1 * length))
+        return _merge(intervals)
+
+    def rect_intervals(self, x0, y0, x1, y1):
+        # Sorted, merged (start, end) arc-length intervals of the path inside the rectangle
+        intervals = []
+        for start, (sx, sy, dx, dy, length) in zip(self.starts, self.segments):
+            # Clip the segment's t range against each pair of edges (Liang-Barsky)
+            t0, t1 = 0.0, 1.0
+            for d, lo, hi in ((dx, x0 - sx, x1 - sx), (dy, y0 - sy, y1 - sy)):
+                if d == 0:
+                    if lo > 0 or hi < 0:
+                        t0, t1 = 1.0, 0.0
+                        break
+                    continue
+                a, b = lo / d, hi / d
+                if a > b:
+                    a, b = b, a
+                t0, t1 = max(t0, a), min(t1, b)
+            if t0 <= t1:
+                intervals.append((start + t0 * length, start + t1 * length))
+        return _merge(intervals)
+
+
+def _merge(intervals):
+    merged = []
+    for lo, hi in intervals:
+        if merged and lo <= merged[-1][1] + 1e-6:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def covers(intervals, progress):
+    for lo, hi in intervals:
+        if lo <= progress <= hi:
+            return True
+    return False
+
+
+class ProgressOrder:
+    # Enemies sorted by progress, rebuilt once per tick. Enemies barely change order
+    # between ticks, so the sort is close to linear.
+    def __init__(self):
+        self.enemies = []
+        self.keys = []
+
+    def rebuild(self, enemies):
+        self.enemies = sorted(enemies, key=attrgetter("progress"))
+        self.keys = [enemy.progress for enemy in self.enemies]
+
+    def span(self, lo, hi):
+        # Index range [start, end) of enemies whose progress lies in [lo, hi]
+        return bisect.bisect_left(self.keys, lo), bisect.bisect_right(self.keys, hi)
+
+    def within(self, intervals):
+        # Enemies whose progress lies in any of the sorted, disjoint intervals
+        found = []
+        for lo, hi in intervals:
+            start, end = self.span(lo, hi)
+            found += self.enemies[start:end]
+        return found
@@ -0,0 +1,96 @@
+import sys
+import threading
+
+import camera
+
+# Simulation/render pipelining for level1.py --threaded. A worker thread runs
+# each frame's simulation ticks while the main thread draws the frame before;
+# pygame's blits, scaling and flip release the GIL, so on a multi-core machine
+# the two overlap.
+#
+# The game belongs to one side at a time. Between batches (after wait(), before
+# start()) the main thread has it: input, restarts, and taking the View that
+# the next frame is drawn from. During a batch only the worker touches it, and
+# the main thread draws from the View, which is copied out of the game and
+# never changed afterwards.
+
+SWITCH_INTERVAL = 0.0005  # Seconds; the default 5 ms leaves the renderer waiting on the GIL after every blit
+
+
+class View:
+    # What drawing a frame needs from the game. Given a world area (see camera.py),
+    # only the entities that can show up in it are copied.
+    def __init__(self, game, area=None):
+        towers, enemies, bullets = camera.visible(game, area) if area else (game.towers, game.enemies, game.bullets)
+        self.towers = tuple((t.type, t.x, t.y, t.range, t.priority) for t in towers)
+        self.enemies = tuple((type(e), e.pos[0], e.pos[1], e.hp) for e in enemies)
+        self.bullets = tuple((b.x, b.y) for b in bullets)
+        self.counts = len(game.towers), len(game.enemies), len(game.bullets)  # Whole level, for memtrack
+        self.queued = len(game.enemies_to_spawn)
+        self.dps = game.dps  # Never changed in place, so no copy is needed
+        self.ticks = game.ticks
+        self.lives = game.lives
+        self.score = game.score
+        self.wave = min(game.current_wave, game.max_wave)
+        self.cooldowns = tuple(game.tower_place_cooldowns)
+        self.selected_tower_type = game.selected_tower_type
+        self.preview = None  # (x, y, tower type, valid) while a tower is being placed
+        if game.placing_tower and game.placement_preview:
+            px, py, ttype = game.placement_preview
+            px, py = game.snap(px, py)
+            self.preview = px, py, ttype, game.is_valid_tower_position(px, py, ttype)
+        self.puzzle = game.current_puzzle
+        self.puzzle_open = bool(game.puzzle_active and game.current_puzzle)
+        self.puzzle_result = game.puzzle_result
+        self.won = game.game_won
+        self.lost = game.game_lost
+
+
+class SimThread:
+    def __init__(self, simulate):
+        # simulate() runs one frame's ticks and returns the effect events they produced
+        self.simulate = simulate
+        self.go = threading.Semaphore(0)
+        self.done = threading.Event()
+        self.pending = False
+        self.closed = False
+        self.effects = []
+        self.error = None
+        sys.setswitchinterval(SWITCH_INTERVAL)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            self.go.acquire()
+            if self.closed:
+                return
+            try:
+                self.effects = self.simulate()
+            except Exception as e:
+                self.effects = []
+                self.error = e
+            self.done.set()
+
+    def start(self):
+        # Hand the game to the worker for the next batch
+        self.pending = True
+        self.done.clear()
+        self.go.release()
+
+    def wait(self):
+        # Take the game back; returns the batch's effect events ([] if none was running)
+        if not self.pending:
+            return []
+        self.done.wait()
+        self.pending = False
+        if self.error:
+            error, self.error = self.error, None
+            raise error
+        return self.effects
+
+    def close(self):
+        self.wait()
+        self.closed = True
+        self.go.release()
+        self.thread.join()
@@ -0,0 +1,246 @@
+# --- PUZZLES ---
+PUZZLES = [
+    # LOGIC TASKS (8 puzzles)
+    {
+        "question": "Which number is missing?\n2, 4, 8, 16, ?",
+        "options": [
+            "18",
+            "24",
+            "32",
+            "30"
+        ],
+        "answer": 2  # 32
+    },
+    {
+        "question": "What is the output?\n\nif True or False and False:\n    print(\"Yes\")\nelse:\n    print(\"No\")",
+        "options": [
+            "Yes",
+            "No",
+            "Error",
+            "None"
+        ],
+        "answer": 0  # Yes
+    },
+    {
+        "question": "Which one does NOT belong?",
+        "options": [
+            "Firewall",
+            "Antivirus",
+            "Trojan",
+            "Scanner"
+        ],
+        "answer": 2  # Trojan
+    },
+    {
+        "question": "How many times will this run?\n\nfor i in range(0, 5):\n    print(i)",
+        "options": [
+            "4",
+            "5",
+            "6",
+            "Infinite"
+        ],
+        "answer": 1  # 5
+    },
+    {
+        "question": "Which one is NOT a valid boolean value?",
+        "options": [
+            "True",
+            "False",
+            "None",
+            "Both"
+        ],
+        "answer": 2  # None
+    },
+    {
+        "question": "You have a key, a firewall, and a lock. What opens access?",
+        "options": [
+            "Key",
+            "Firewall",
+            "Lock",
+            "Virus"
+        ],
+        "answer": 0  # Key
+    },
+    {
+        "question": "Which result is TRUE?\n\nnot (False and True)",
+        "options": [
+            "True",
+            "False",
+            "Error",
+            "None"
+        ],
+        "answer": 0  # True
+    },
+    {
+        "question": "If a scanner removes 3 viruses and 2 reappear, how many were removed in total?",
+        "options": [
+            "1",
+            "5",
+            "2",
+            "3"
+        ],
+        "answer": 1  # 5
+    },
+    # CODE FIXES (Python only, 8 puzzles)
+    {
+        "question": "What’s wrong with this code?\n\nvalues = [1, 2, 3, 4]\nfor i in range(len(values)):\n    print(values[i + 1])",
+        "options": [
+            "values is not iterable",
+            "i + 1 causes IndexError",
+            "Syntax error",
+            "It prints wrong values"
+        ],
+        "answer": 1  # i + 1 causes IndexError
+    },
+    {
+        "question": "Why does this crash with AttributeError?\n\nnumber = 10\nprint(number.append(5))",
+        "options": [
+            "append used on int",
+            "print() is broken",
+            "append() needs two values",
+            "number not declared"
+        ],
+        "answer": 0  # append used on int
+    },
+    {
+        "question": "What’s the issue with this function?\n\ndef is_even(n):\n    if n % 2 = 0:\n        return True\n    else:\n        return False",
+        "options": [
+            "= used instead of ==",
+            "% doesn’t work on n",
+            "Should return a string",
+            "Missing parameter"
+        ],
+        "answer": 0  # = used instead of ==
+    },
+    {
+        "question": "What’s the fix for this crash?\n\nuser_input = input(\"Age: \")\nage = user_input + 5\nprint(age)",
+        "options": [
+            "Can’t add to string",
+            "input() is invalid",
+            "Must use f-strings",
+            "age is undefined"
+        ],
+        "answer": 0  # Can’t add to string
+    },
+    {
+        "question": "Why will this always return the same result?\n\ndef scan():\n    threats = []\n    threats.append(\"trojan\")\n    return threats\n\nthreats = scan()\nprint(threats)\nthreats = scan()\nprint(threats)",
+        "options": [
+            "List gets overwritten",
+            "Same list object is reused",
+            "append() doesn’t work",
+            "Needs global variable"
+        ],
+        "answer": 1  # Same list object is reused
+    },
+    {
+        "question": "Why is this if check unreliable?\n\nis_ready = \"False\"\nif not is_ready:\n    print(\"Not ready\")\nelse:\n    print(\"Ready\")",
+        "options": [
+            "String \"False\" is truthy",
+            "not cannot be used",
+            "Needs is_ready == False",
+            "Crash at runtime"
+        ],
+        "answer": 0  # String "False" is truthy
+    },
+    {
+        "question": "What causes this logic bug?\n\nfiles = [\"log.txt\", \"data.csv\", \"virus.exe\"]\nfor f in files:\n    if \"virus\" in f:\n        continue\n        print(\"Skipping virus\")",
+        "options": [
+            "continue should be break",
+            "print after continue never runs",
+            "\"virus\" isn’t in list",
+            "Syntax error"
+        ],
+        "answer": 1  # print after continue never runs
+    },
+    {
+        "question": "Why does this condition never trigger?\n\nconnections = None\nif len(connections) == 0:\n    print(\"No connections\")",
+        "options": [
+            "len() can’t be used on None",
+            "connections is a string",
+            "0 is not a valid length",
+            "Should use connections.empty()"
+        ],
+        "answer": 0  # len() can’t be used on None
+    },
+    # SYSTEM ERRORS (8 puzzles)
+    {
+        "question": "What is a likely reason a firewall blocks traffic?",
+        "options": [
+            "CPU load",
+            "Port not allowed",
+            "Wi-Fi disabled",
+            "Antivirus crash"
+        ],
+        "answer": 1  # Port not allowed
+    },
+    {
+        "question": "Your scanner won’t start. What’s first to check?",
+        "options": [
+            "Internet",
+            "Power",
+            "Permissions",
+            "BIOS"
+        ],
+        "answer": 2  # Permissions
+    },
+    {
+        "question": "Program crashes only on one OS. What’s likely?",
+        "options": [
+            "Syntax error",
+            "OS-specific paths",
+            "RAM issue",
+            "Resolution mismatch"
+        ],
+        "answer": 1  # OS-specific paths
+    },
+    {
+        "question": "You see “FileNotFoundError”. What does that mean?",
+        "options": [
+            "Missing import",
+            "Syntax error",
+            "File doesn't exist",
+            "Permission denied"
+        ],
+        "answer": 2  # File doesn't exist
+    },
+    {
+        "question": "Your antivirus says “update failed.” Most likely cause?",
+        "options": [
+            "CPU overheat",
+            "Disk full",
+            "No internet",
+            "Wrong version"
+        ],
+        "answer": 2  # No internet
+    },
+    {
+        "question": "You launch a scanner, but nothing happens. What’s missing?",
+        "options": [
+            "Admin rights",
+            "DNS",
+            "Display driver",
+            "API"
+        ],
+        "answer": 0  # Admin rights
+    },
+    {
+        "question": "You get \"Access denied\" when writing a file. Why?",
+        "options": [
+            "Wrong filename",
+            "Permission issue",
+            "File too large",
+            "OS crash"
+        ],
+        "answer": 1  # Permission issue
+    },
+    {
+        "question": "App fails to open and throws a “missing DLL” error. This means:",
+        "options": [
+            "Disk failure",
+            "Library file not found",
+            "Invalid port",
+            "Path too long"
+        ],
+        "answer": 1  # Library file not found
+    }
+]
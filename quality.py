@@ -0,0 +1,67 @@
+from collections import deque
+
+# Render quality governor. Watches how long frames take (simulation + drawing,
+# without waiting for the display) and steps down through LEVELS while the
+# slow end of recent frames is over budget, then back up once there has been
+# headroom for a while. Each level keeps the savings of the ones before it.
+LEVELS = [
+    {"name": "full", "range_rings": True, "labels": True, "render_scale": 1.0, "effects": 1.0},
+    {"name": "no range rings", "range_rings": False, "labels": True, "render_scale": 1.0, "effects": 1.0},
+    {"name": "no labels", "range_rings": False, "labels": False, "render_scale": 1.0, "effects": 1.0},
+    {"name": "75% render", "range_rings": False, "labels": False, "render_scale": 0.75, "effects": 1.0},
+    {"name": "fewer effects", "range_rings": False, "labels": False, "render_scale": 0.75, "effects": 0.5},
+    {"name": "50% render", "range_rings": False, "labels": False, "render_scale": 0.5, "effects": 0.25},
+]
+
+BUDGET_MS = 1000 / 60
+WINDOW = 60          # Frames looked at for each decision
+PERCENTILE = 0.9     # Judge by the slow end of the window, since stutter is what shows
+HEADROOM = 0.6       # Step back up only when frames fit in this share of the budget...
+RECOVER = 120        # ...for this many frames in a row
+MAX_RECOVER = 3600
+RELAPSE = 300        # Stepping down this soon after stepping up doubles RECOVER
+
+
+class Governor:
+    def __init__(self, level=None, budget_ms=BUDGET_MS):
+        # A fixed level switches the governor off
+        self.fixed = level is not None
+        self.level = min(max(level or 0, 0), len(LEVELS) - 1)
+        self.budget = budget_ms
+        self.times = deque(maxlen=WINDOW)
+        self.recover = RECOVER
+        self.good = 0              # Frames in a row with headroom
+        self.since_up = None       # Frames since the last step up
+
+    @property
+    def settings(self):
+        return LEVELS[self.level]
+
+    def frame(self, ms):
+        # Feed one frame's time; returns True when the level changed
+        if self.fixed:
+            return False
+        self.times.append(ms)
+        if self.since_up is not None:
+            self.since_up += 1
+        if len(self.times) < WINDOW:
+            return False
+        slow = sorted(self.times)[int(WINDOW * PERCENTILE)]
+        if slow > self.budget and self.level < len(LEVELS) - 1:
+            if self.since_up is not None and self.since_up < RELAPSE:
+                self.recover = min(self.recover * 2, MAX_RECOVER)
+            return self._step(1)
+        if slow < self.budget * HEADROOM and self.level > 0:
+            self.good += 1
+            if self.good >= self.recover:
+                self.since_up = 0
+                return self._step(-1)
+        else:
+            self.good = 0
+        return False
+
+    def _step(self, direction):
+        self.level += direction
+        self.times.clear()  # Judge the new level on its own frames
+        self.good = 0
+        return True
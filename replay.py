@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import struct
+import subprocess
+import sys
+import time
+
+import pygame
+
+# Session recording and offline rendering. `python level1.py --record=FILE`
+# writes the level's starting snapshot, every action that reached the game
+# (tagged with the simulation step it was applied at) and a keyframe snapshot
+# every KEYFRAME_EVERY steps. Replaying is then deterministic: restore a
+# keyframe, feed the actions, tick.
+#
+# `python replay.py FILE --out frames/ --size 1920x1080 --workers 8` splits the
+# frames into one contiguous range per worker. Each worker is level1.py itself
+# running under the dummy video driver with --replay, so frames look exactly
+# like the game; it resimulates from the last keyframe before its range and
+# saves one image per simulation step (frame N = the screen after N ticks).
+#
+# --format raw writes one headerless RGB24 file per worker instead of PNGs:
+#   cat frames/*.rgb | ffmpeg -f rawvideo -pix_fmt rgb24 -s 1920x1080 -r 60 -i - out.mp4
+
+MAGIC = b"DFR1"
+RECORD = struct.Struct("<BII")  # type, step, payload length
+HEADER, RESTART, KEYFRAME, ACTION, END = range(5)
+
+KEYFRAME_EVERY = 600  # Steps (10 s of play)
+WARMUP = 60           # Steps resimulated before the first frame so particle effects are already in flight
+
+
+class Recorder:
+    def __init__(self, filename, game, restart_snapshot, size, level=None):
+        # level is the editor level file being played, if any
+        self.file = open(filename, "wb")
+        self.file.write(MAGIC)
+        self._write(HEADER, 0, json.dumps({"kind": game.KIND, "size": list(size), "level": level}).encode())
+        self._write(RESTART, 0, restart_snapshot)
+        self._write(KEYFRAME, 0, game.snapshot())
+        self.last_keyframe = 0
+        self.step = 0
+
+    def _write(self, kind, step, payload):
+        self.file.write(RECORD.pack(kind, step, len(payload)))
+        self.file.write(payload)
+
+    def action(self, step, action):
+        self._write(ACTION, step, json.dumps(action).encode())
+
+    def tick(self, step, game):
+        # Placement and puzzle state isn't in a snapshot, so keyframes wait until none is in progress
+        self.step = step
+        if step - self.last_keyframe >= KEYFRAME_EVERY and game.placement_idle():
+            self._write(KEYFRAME, step, game.snapshot())
+            self.last_keyframe = step
+
+    def close(self):
+        self._write(END, self.step, b"")
+        self.file.close()
+
+
+class Recording:
+    def __init__(self, filename):
+        with open(filename, "rb") as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{filename} is not a DEFEND.EXE recording")
+        self.keyframes = []  # (step, snapshot) in step order
+        self.actions = {}    # step -> [action, ...]
+        self.steps = 0
+        self.restart_snapshot = None
+        offset = len(MAGIC)
+        while offset + RECORD.size <= len(data):
+            kind, step, length = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            payload = data[offset:offset + length]
+            offset += length
+            if len(payload) < length:
+                break  # Cut short by a crash; keep what is complete
+            if kind == HEADER:
+                header = json.loads(payload)
+                self.kind = header["kind"]
+                self.size = tuple(header["size"])
+                self.level = header.get("level")
+            elif kind == RESTART:
+                self.restart_snapshot = payload
+            elif kind == KEYFRAME:
+                self.keyframes.append((step, payload))
+            elif kind == ACTION:
+                self.actions.setdefault(step, []).append(tuple(json.loads(payload)))
+            self.steps = max(self.steps, step)
+
+    def keyframe_before(self, step):
+        best = self.keyframes[0]
+        for keyframe in self.keyframes:
+            if keyframe[0] > step:
+                break
+            best = keyframe
+        return best
+
+
+class Player:
+    # Drives level1.py through a recording and saves the frames in [first, last)
+    def __init__(self, recording, first, last, out, size, fmt="png"):
+        self.recording = recording
+        self.first = max(1, first)
+        self.last = min(last, recording.steps + 1)
+        self.out = out
+        self.size = size
+        self.fmt = fmt
+        self.scaled = pygame.Surface(size) if size != recording.size else None
+        self.raw = open(os.path.join(out, f"frames_{self.first:06d}.rgb"), "wb") if fmt == "raw" else None
+
+    def seek(self, game):
+        # Restore the keyframe to resimulate from; returns its step
+        step, snapshot = self.recording.keyframe_before(self.first - WARMUP)
+        game.restore(snapshot)
+        return step
+
+    def actions(self, step):
+        return self.recording.actions.get(step, ())
+
+    def write(self, step, surf):
+        if self.scaled:
+            pygame.transform.smoothscale(surf, self.size, self.scaled)
+            surf = self.scaled
+        if self.raw:
+            self.raw.write(pygame.image.tobytes(surf, "RGB"))
+        else:
+            pygame.image.save(surf, os.path.join(self.out, f"frame_{step:06d}.png"))
+
+    def close(self):
+        if self.raw:
+            self.raw.close()
+
+
+def parse_size(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a recorded DEFEND.EXE session to image files")
+    parser.add_argument("recording")
+    parser.add_argument("--out", default="frames")
+    parser.add_argument("--size", default=None, help="WxH, default: the recorded screen size")
+    parser.add_argument("--frames", default=None, help="first:last (last excluded), default: all")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--format", choices=["png", "raw"], default="png")
+    args = parser.parse_args()
+
+    recording = Recording(args.recording)
+    size = parse_size(args.size) if args.size else recording.size
+    first, last = 1, recording.steps + 1
+    if args.frames:
+        a, b = args.frames.split(":")
+        first, last = max(first, int(a or first)), min(last, int(b or last))
+    if last <= first:
+        sys.exit("nothing to render")
+    os.makedirs(args.out, exist_ok=True)
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    workers = max(1, min(args.workers, last - first))
+    bounds = [first + (last - first) * i // workers for i in range(workers + 1)]
+    start = time.perf_counter()
+    procs = [
+        subprocess.Popen([sys.executable, "level1.py", f"--replay={os.path.abspath(args.recording)}",
+                          f"--frames={a}:{b}", f"--out={os.path.abspath(args.out)}",
+                          f"--size={size[0]}x{size[1]}", f"--format={args.format}"], cwd=here, env=env)
+        for a, b in zip(bounds, bounds[1:])
+    ]
+    failed = sum(proc.wait() != 0 for proc in procs)
+    elapsed = time.perf_counter() - start
+    frames = last - first
+    print(f"{frames} frames at {size[0]}x{size[1]} in {elapsed:.1f}s with {workers} workers "
+          f"({frames / elapsed:.0f} frames/s, {frames / 60 / elapsed:.1f}x real time)")
+    if failed:
+        sys.exit(f"{failed} worker(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import runpy
+import subprocess
+import sys
+
+import pygame
+
+import startup
+
+# Screen switching. The first screen launched becomes the driver and runs every
+# later screen in the same process, so the display, fonts and preloaded assets
+# survive a screen change. Without a driver (e.g. a screen started by an older
+# launcher), goto/call fall back to separate processes as before.
+
+_running = False
+_next = None
+
+
+def main(script):
+    # Call at the top of every screen script, before pygame.init()
+    global _running, _next
+    if _running:
+        return
+    _running = True
+    args = sys.argv[1:]
+    while script:
+        _next = None
+        _run(script, args)
+        script, args = _next or (None, [])
+    pygame.quit()
+    sys.exit()
+
+
+def _run(script, args=()):
+    # The screen sees its own args; the caller's come back afterwards (call() returns to it)
+    startup.begin()
+    saved = sys.argv
+    sys.argv = [script, *args]
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit:
+        pass
+    finally:
+        sys.argv = saved
+
+
+def goto(script, *args):
+    # Switch to another screen once the current one exits; args show up in its sys.argv
+    global _next
+    if _running:
+        _next = (script, list(args))
+    else:
+        subprocess.Popen([sys.executable, script, *args])
+
+
+def call(script):
+    # Run another screen to completion and come back (used for the settings screen)
+    if _running:
+        _run(script)
+    else:
+        subprocess.call([sys.executable, script])
+
+
+def exit():
+    # End the current screen. The driver keeps pygame (and the window) alive for the next one.
+    if not _running:
+        pygame.quit()
+    sys.exit()
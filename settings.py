@@ -1,7 +1,13 @@
+import startup
 import pygame
-import sys
 import json
 import os
+from widgets import Label, Layer, UI
+from controls import Controls, MENU_EVENTS, REDRAW_EVENTS
+import scenes
+import fonts
+
+scenes.main(__file__)
 
 SETTINGS_FILE = "settings.json"
 
@@ -23,46 +29,53 @@ info = pygame.display.Info()
 screen_width, screen_height = info.current_w, info.current_h
 screen = pygame.display.set_mode((screen_width, screen_height), pygame.FULLSCREEN)
 pygame.display.set_caption("Settings")
+startup.mark("display")
 
-font = pygame.font.SysFont(None, 80)
-small_font = pygame.font.SysFont(None, 50)
+font = fonts.get(None, 80)
+small_font = fonts.get(None, 50)
+startup.mark("fonts")
 
 settings = load_settings()
 invert = settings.get("invert_colors", False)
 
-def update_texts():
+def build_ui():
     fg = (255, 255, 255) if not invert else (0, 0, 0)
-    return (
-        small_font.render("Invert Colors", True, fg),
-        small_font.render("Back", True, fg)
-    )
+    return UI(Layer(
+        Label(small_font, "Invert Colors", fg, name="invert", center=(screen_width // 2, screen_height // 2)),
+        Label(small_font, "Back", fg, name="back", center=(screen_width // 2, screen_height // 2 + 120)),
+    ))
 
-invert_text, back_text = update_texts()
-invert_rect = invert_text.get_rect(center=(screen_width // 2, screen_height // 2))
-back_rect = back_text.get_rect(center=(screen_width // 2, screen_height // 2 + 120))
+ui = build_ui()
+controls = Controls((screen_width, screen_height), (screen_width, screen_height), MENU_EVENTS)
 
+redraw = True
 running = True
 while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT or (
+    if redraw:
+        bg_color = (30, 30, 30) if not invert else (225, 225, 225)
+        screen.fill(bg_color)
+        ui.draw(screen)
+        pygame.display.flip()
+        startup.first_frame(__file__)
+        redraw = False
+
+    for event in controls.wait():
+        if event.type in REDRAW_EVENTS:
+            redraw = True
+        elif event.type == pygame.QUIT or (
             event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE
         ):
             running = False
         elif event.type == pygame.MOUSEBUTTONDOWN:
-            if invert_rect.collidepoint(event.pos):
+            clicked = ui.hit(event.pos)
+            if clicked == "invert":
                 invert = not invert
                 settings["invert_colors"] = invert
                 save_settings(settings)
-                invert_text, back_text = update_texts()
-            elif back_rect.collidepoint(event.pos):
+                ui = build_ui()
+                redraw = True
+            elif clicked == "back":
                 # Just close this window, don't open main menu
                 running = False
 
-    bg_color = (30, 30, 30) if not invert else (225, 225, 225)
-    screen.fill(bg_color)
-    screen.blit(invert_text, invert_rect)
-    screen.blit(back_text, back_rect)
-    pygame.display.flip()
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+scenes.exit()
\ No newline at end of file
@@ -0,0 +1,102 @@
+import argparse
+import time
+
+import pygame
+
+import fonts
+import stream
+from game import TOWER_TYPES
+
+# Watches a level published with `python level1.py --publish[=address]`.
+# Draws a simplified view of the stream in a window, or with --stats prints a
+# one-line summary per second for dashboards.
+#
+#   python spectator.py [--connect tcp:127.0.0.1:7777] [--size 960x540] [--stats]
+
+ENEMY_COLORS = [(220, 40, 40), (240, 140, 20), (150, 60, 200)]  # Enemy, FastEnemy, DurableEnemy
+
+
+def receive(sock, buffer, decoder):
+    # Applies everything that has arrived; returns False once the game has gone away
+    while True:
+        try:
+            data = sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            break
+        if not data:
+            return False
+        buffer += data
+    for kind, body in stream.read_messages(buffer):
+        decoder.apply(kind, body)
+    return True
+
+
+def draw(surf, decoder, font):
+    # The whole world (sent in keyframes) scaled to fit the window
+    sx = sy = min(surf.get_width() / decoder.world[0], surf.get_height() / decoder.world[1])
+    q = stream.SCALE
+    surf.fill((30, 30, 30))
+    if decoder.state is None:
+        surf.blit(font.render("Waiting for the game...", True, (200, 200, 200)), (10, 10))
+        return
+    if decoder.kind() == "path":
+        pygame.draw.lines(surf, (0, 255, 0), False, [(x * sx, y * sy) for x, y in decoder.path], 3)
+    else:
+        cell = decoder.cell
+        for col, row in (decoder.spawn, decoder.exit):
+            pygame.draw.rect(surf, (0, 255, 0), (col * cell * sx, row * cell * sy, cell * sx, cell * sy))
+    for x, y, ttype, priority in decoder.towers:
+        half = 20 * sx
+        pygame.draw.rect(surf, TOWER_TYPES[ttype]["color"], (x * sx - half, y * sy - half, 2 * half, 2 * half))
+    for kind, x, y, hp in decoder.enemies.values():
+        pygame.draw.circle(surf, ENEMY_COLORS[kind], (x / q * sx, y / q * sy), max(3, 20 * sx))
+    for x, y in decoder.bullets.values():
+        pygame.draw.circle(surf, (255, 255, 0), (x / q * sx, y / q * sy), max(2, 6 * sx))
+    tick, lives, score, wave, max_wave, _ = decoder.state
+    hud = f"Lives: {lives}  Score: {score}  Wave: {min(wave, max_wave)}  Tick: {tick}"
+    surf.blit(font.render(hud, True, (255, 255, 255)), (10, 10))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a running DEFEND.EXE level")
+    parser.add_argument("--connect", default=stream.DEFAULT_ADDRESS)
+    parser.add_argument("--size", default="960x540")
+    parser.add_argument("--stats", action="store_true", help="print a summary per second instead of drawing")
+    args = parser.parse_args()
+
+    sock = stream.connect(args.connect)
+    sock.setblocking(False)
+    buffer = bytearray()
+    decoder = stream.Decoder()
+
+    if args.stats:
+        while receive(sock, buffer, decoder):
+            time.sleep(1)
+            if decoder.state:
+                tick, lives, score, wave, max_wave, _ = decoder.state
+                print(f"tick {tick}: lives {lives}, score {score}, wave {wave}/{max_wave}, "
+                      f"towers {len(decoder.towers)}, enemies {len(decoder.enemies)}, bullets {len(decoder.bullets)}")
+        return
+
+    pygame.init()
+    size = tuple(int(v) for v in args.size.split("x"))
+    screen = pygame.display.set_mode(size)
+    pygame.display.set_caption("DEFEND.EXE spectator")
+    font = fonts.get("Arial", 20)
+    clock = pygame.time.Clock()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        if not receive(sock, buffer, decoder):
+            running = False
+        draw(screen, decoder, font)
+        pygame.display.flip()
+        clock.tick(60)
+    sock.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
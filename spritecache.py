@@ -0,0 +1,161 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+
+import pygame
+
+# Baked sprite cache. Every (image, size, inverted) variant the screens use is
+# stored once as raw pixels in one file, so a cold start maps the file and wraps
+# the pixels in surfaces instead of decoding PNG/WebP/JPG and rescaling them.
+# Entries are keyed by variant and remember a hash of the source file; a changed
+# source is decoded again and the file rewritten, so the cache never goes stale.
+#
+#   python spritecache.py [--size 1920x1080]   # bake everything ahead of time
+#
+# File layout: MAGIC, a little-endian uint32 index length, the JSON index
+# ({key: {"hash", "w", "h", "format", "offset", "length"}}), then the pixel data
+# from the next ALIGN boundary on. Offsets count from the start of the pixel data.
+
+CACHE_FILE = "sprites.cache"
+MAGIC = b"DEFSPR1\n"
+ALIGN = 16  # Pixel data offsets are multiples of this
+
+_lock = threading.Lock()  # The loader thread and the main thread may both load
+_cache = None  # (mapped file or None, index, start of the pixel data) as last read
+_hashes = {}  # path -> (mtime, size, hash) so a file is only hashed once per change
+
+
+def _aligned(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+def _key(path, size, inverted):
+    return f"{path} {size[0]}x{size[1]}" + (" inverted" if inverted else "")
+
+
+def _source_hash(path):
+    stat = os.stat(path)
+    known = _hashes.get(path)
+    if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+        return known[2]
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    _hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+def _open():
+    global _cache
+    if _cache is None:
+        data, index, base = None, {}, 0
+        try:
+            with open(CACHE_FILE, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError("not a sprite cache")
+            (length,) = struct.unpack_from("<I", data, len(MAGIC))
+            start = len(MAGIC) + 4
+            index = json.loads(data[start:start + length])
+            base = _aligned(start + length)
+        except (OSError, ValueError):
+            # Missing, empty or damaged: start over
+            data, index, base = None, {}, 0
+        _cache = (data, index, base)
+    return _cache
+
+
+def _surface(data, base, entry):
+    # Wraps the mapped pixels without copying; convert()/convert_alpha() makes the blit-ready copy
+    start = base + entry["offset"]
+    pixels = memoryview(data)[start:start + entry["length"]]
+    return pygame.image.frombuffer(pixels, (entry["w"], entry["h"]), entry["format"])
+
+
+def _bake(path, size, inverted):
+    surface = pygame.transform.scale(pygame.image.load(path), size)
+    if inverted:
+        # Same result as the start menu's old invert_surface(): colors flipped, alpha dropped
+        surface = pygame.surfarray.make_surface(255 - pygame.surfarray.array3d(surface))
+    fmt = "RGBA" if surface.get_flags() & pygame.SRCALPHA else "RGB"
+    return surface, fmt, pygame.image.tobytes(surface, fmt)
+
+
+def _write(data, index, base, baked):
+    # Rewrite the whole file: kept entries copied over, then the new ones.
+    # Written aside and renamed, so other processes see the old file or the new one.
+    global _cache
+    blobs = {key: data[base + e["offset"]:base + e["offset"] + e["length"]]
+             for key, e in index.items() if key not in baked}
+    entries = {key: dict(index[key]) for key in blobs}
+    for key, (digest, surface, fmt, pixels) in baked.items():
+        w, h = surface.get_size()
+        entries[key] = {"hash": digest, "w": w, "h": h, "format": fmt}
+        blobs[key] = pixels
+    offset = 0
+    for key, entry in entries.items():
+        entry["offset"], entry["length"] = offset, len(blobs[key])
+        offset = _aligned(offset + len(blobs[key]))
+    header = json.dumps(entries).encode()
+    start = len(MAGIC) + 4 + len(header)
+    temp = f"{CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(temp, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(header)) + header)
+            for key, entry in entries.items():
+                f.write(b"\0" * (_aligned(start) + entry["offset"] - f.tell()))
+                f.write(blobs[key])
+        os.replace(temp, CACHE_FILE)
+    except OSError:
+        # Read-only install: keep working from decoded images
+        if os.path.exists(temp):
+            os.remove(temp)
+    _cache = None
+
+
+def load_many(variants):
+    # variants: [(path, (w, h), inverted)]; returns a surface for each, baking stale ones
+    with _lock:
+        data, index, base = _open()
+        surfaces, baked = [], {}
+        for path, size, inverted in variants:
+            key = _key(path, size, inverted)
+            digest = _source_hash(path)
+            entry = index.get(key)
+            if entry and entry["hash"] == digest:
+                surfaces.append(_surface(data, base, entry))
+            else:
+                surface, fmt, pixels = _bake(path, size, inverted)
+                baked[key] = (digest, surface, fmt, pixels)
+                surfaces.append(surface)
+        if baked:
+            _write(data, index, base, baked)
+        return surfaces
+
+
+def load(path, size, inverted=False):
+    return load_many([(path, size, inverted)])[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bake every sprite variant into the sprite cache")
+    parser.add_argument("--size", default=None, help="screen size as WxH (default: the current display)")
+    args = parser.parse_args()
+
+    import loader
+    if args.size:
+        screen_size = tuple(int(n) for n in args.size.lower().split("x"))
+    else:
+        pygame.display.init()
+        info = pygame.display.Info()
+        screen_size = (info.current_w, info.current_h)
+    variants = loader.cached_images(screen_size)
+    load_many(variants)
+    print(f"{len(variants)} variants in {CACHE_FILE} ({os.path.getsize(CACHE_FILE) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import os
+import time
+
+# Time-to-first-frame trace for the screen scripts, enabled with DEFEND_STARTUP_TRACE=1.
+# Imported before pygame so the first screen's numbers include importing pygame.
+ENABLED = os.environ.get("DEFEND_STARTUP_TRACE") == "1"
+
+_start = time.perf_counter()
+_marks = []
+_shown = False
+
+
+def begin():
+    # Restart the clock for a screen switched to in-process
+    global _start, _marks, _shown
+    if _shown:
+        _start = time.perf_counter()
+        _marks = []
+        _shown = False
+
+
+def mark(label):
+    if ENABLED and not _shown:
+        _marks.append((label, time.perf_counter() - _start))
+
+
+def first_frame(script):
+    # Call after every flip; reports once per screen
+    global _shown
+    if _shown:
+        return
+    _shown = True
+    if ENABLED:
+        total = time.perf_counter() - _start
+        phases = ", ".join(f"{label} {t * 1000:.1f}ms" for label, t in _marks)
+        print(f"[startup] {os.path.basename(script)}: {phases + ', ' if phases else ''}first frame {total * 1000:.1f}ms")
@@ -0,0 +1,297 @@
+import os
+import socket
+import struct
+import time
+
+import camera
+
+# Live game-state stream for spectators and dashboards. The publisher sends a
+# keyframe when a client connects (or the level restarts) and after that only
+# what changed: entities that appeared or disappeared, position deltas, HP
+# changes, towers when they change. Coordinates are quantized to 1/4 pixel;
+# deltas are taken between quantized values so clients never drift. Keyframes
+# also carry the level's geometry (world size, path, maze cells) so clients can
+# draw any level, including ones made with editor.py.
+#
+# Every message is MSG (body length, type) followed by the body.
+
+MSG = struct.Struct("<IB")
+KEYFRAME, DELTA = 0, 1
+STATE = struct.Struct("<IhiBBB")   # tick, lives, score, wave, max wave, level kind
+COUNT = struct.Struct("<H")
+WORLD = struct.Struct("<HH")       # world width, height
+POINT = struct.Struct("<hh")       # path point x, y
+MAZE = struct.Struct("<5H")        # cell size, spawn column, row, exit column, row (zeros on path levels)
+TOWER = struct.Struct("<hhBB")     # x, y, type, priority
+ENEMY = struct.Struct("<IBhhB")    # id, kind, x, y, hp
+BULLET = struct.Struct("<Ihh")     # id, x, y
+MOVE = struct.Struct("<Ibb")       # id, dx, dy
+HP = struct.Struct("<IB")          # id, hp
+REMOVED = struct.Struct("<I")
+
+SCALE = 4  # Quantization steps per pixel
+KINDS = ["path", "maze"]
+ENEMY_CLASSES = ["Enemy", "FastEnemy", "DurableEnemy"]
+PRIORITIES = ["first", "last", "strongest", "closest"]
+
+DEFAULT_ADDRESS = "tcp:127.0.0.1:7777"
+MAX_BACKLOG = 1 << 20  # Bytes queued for a slow client before it's dropped
+MIN_WORLD = (1920, 1080)  # Smallest world sent; levels were laid out for this screen
+
+
+def quantize(v):
+    return max(-32768, min(32767, int(round(v * SCALE))))
+
+
+def parse_address(address):
+    # "tcp:host:port" or "unix:/path/to/socket"
+    kind, _, rest = address.partition(":")
+    if kind == "unix":
+        return socket.AF_UNIX, rest
+    if kind == "tcp":
+        host, _, port = rest.rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    raise ValueError(f"bad stream address {address!r} (expected tcp:host:port or unix:path)")
+
+
+def _pack_list(record, items):
+    return COUNT.pack(len(items)) + b"".join(record.pack(*item) for item in items)
+
+
+class Encoder:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.ids = {}      # id(entity) -> (entity, stream id); holding the entity keeps id() unique
+        self.next_id = 1
+        self.enemies = {}  # stream id -> [kind, qx, qy, hp] as last sent
+        self.bullets = {}  # stream id -> [qx, qy]
+        self.towers = []
+        self.state = None
+        self.geometry = None  # Packed world size and path, as sent in keyframes
+        self.tick = -1
+
+    def _sid(self, entity):
+        entry = self.ids.get(id(entity))
+        if entry is None:
+            entry = self.ids[id(entity)] = (entity, self.next_id)
+            self.next_id += 1
+        return entry[1]
+
+    def keyframe(self):
+        # The full state as clients know it after the last delta
+        body = STATE.pack(*self.state) + self.geometry
+        body += _pack_list(TOWER, self.towers)
+        body += _pack_list(ENEMY, [(sid, *e) for sid, e in self.enemies.items()])
+        body += _pack_list(BULLET, [(sid, *b) for sid, b in self.bullets.items()])
+        return MSG.pack(len(body), KEYFRAME) + body
+
+    def delta(self, game):
+        # Changes since the previous call; returns (message, restarted)
+        restarted = game.ticks < self.tick
+        if restarted:
+            self.reset()
+        self.tick = game.ticks
+        if self.geometry is None:
+            points = [(int(x), int(y)) for x, y in game.path.points] if game.path else []
+            maze = getattr(game, "maze", None)
+            cells = (maze["cell"], *maze["spawn"], *maze["exit"]) if maze else (0,) * 5
+            self.geometry = (WORLD.pack(*camera.world_size(game, MIN_WORLD)) + _pack_list(POINT, points)
+                             + MAZE.pack(*cells))
+        self.state = (game.ticks, game.lives, game.score, min(game.current_wave, 255), game.max_wave,
+                      KINDS.index(game.KIND))
+        body = STATE.pack(*self.state)
+
+        towers = [(int(t.x), int(t.y), t.type, PRIORITIES.index(t.priority)) for t in game.towers]
+        if towers != self.towers:
+            self.towers = towers
+            body += b"\1" + _pack_list(TOWER, towers)
+        else:
+            body += b"\0"
+
+        live = {}
+        for enemy in game.enemies:
+            live[self._sid(enemy)] = (ENEMY_CLASSES.index(type(enemy).__name__),
+                                      quantize(enemy.pos[0]), quantize(enemy.pos[1]),
+                                      max(0, min(255, int(-(-enemy.hp // 1)))))
+        body += self._diff(self.enemies, live, ENEMY, hp=True)
+        live = {self._sid(b): (quantize(b.x), quantize(b.y)) for b in game.bullets}
+        body += self._diff(self.bullets, live, BULLET, hp=False)
+
+        # Forget entities that left the game so they can be freed
+        if len(self.ids) > len(self.enemies) + len(self.bullets):
+            keep = self.enemies.keys() | self.bullets.keys()
+            self.ids = {k: v for k, v in self.ids.items() if v[1] in keep}
+        return MSG.pack(len(body), DELTA) + body, restarted
+
+    def _diff(self, sent, live, record, hp):
+        removed = [(sid,) for sid in sent if sid not in live]
+        for (sid,) in removed:
+            del sent[sid]
+        added, moved, hp_changed = [], [], []
+        for sid, values in live.items():
+            old = sent.get(sid)
+            x, y = values[-3:-1] if hp else values
+            if old is None:
+                added.append((sid, *values))
+                sent[sid] = list(values)
+                continue
+            ox, oy = old[-3:-1] if hp else old
+            dx, dy = x - ox, y - oy
+            if dx or dy:
+                if -128 <= dx <= 127 and -128 <= dy <= 127:
+                    moved.append((sid, dx, dy))
+                else:
+                    # Too far for a delta: resend it in full
+                    removed.append((sid,))
+                    added.append((sid, *values))
+            if hp and values[-1] != old[-1]:
+                hp_changed.append((sid, values[-1]))
+            sent[sid] = list(values)
+        out = _pack_list(REMOVED, removed) + _pack_list(record, added) + _pack_list(MOVE, moved)
+        if hp:
+            out += _pack_list(HP, hp_changed)
+        return out
+
+
+class Decoder:
+    # Client-side mirror of the encoder's state; coordinates come out in pixels
+    def __init__(self):
+        self.state = None
+        self.world = MIN_WORLD
+        self.path = []     # Path points in pixels; empty on the maze level
+        self.cell = 0      # Maze cell size in pixels; 0 on path levels
+        self.spawn = self.exit = None  # Maze (column, row) cells
+        self.towers = []
+        self.enemies = {}  # id -> [kind, qx, qy, hp]
+        self.bullets = {}  # id -> [qx, qy]
+
+    def apply(self, kind, body):
+        view = memoryview(body)
+        offset = 0
+
+        def take(record):
+            nonlocal offset
+            (n,) = COUNT.unpack_from(view, offset)
+            offset += COUNT.size
+            items = [record.unpack_from(view, offset + i * record.size) for i in range(n)]
+            offset += n * record.size
+            return items
+
+        self.state = STATE.unpack_from(view, 0)
+        offset = STATE.size
+        if kind == KEYFRAME:
+            self.world = WORLD.unpack_from(view, offset)
+            offset += WORLD.size
+            self.path = take(POINT)
+            cell, *ends = MAZE.unpack_from(view, offset)
+            offset += MAZE.size
+            self.cell, self.spawn, self.exit = cell, tuple(ends[:2]), tuple(ends[2:])
+            self.towers = take(TOWER)
+            self.enemies = {e[0]: list(e[1:]) for e in take(ENEMY)}
+            self.bullets = {b[0]: list(b[1:]) for b in take(BULLET)}
+            return
+        towers_changed = view[offset]
+        offset += 1
+        if towers_changed:
+            self.towers = take(TOWER)
+        for store, record, hp in ((self.enemies, ENEMY, True), (self.bullets, BULLET, False)):
+            for (sid,) in take(REMOVED):
+                store.pop(sid, None)
+            for item in take(record):
+                store[item[0]] = list(item[1:])
+            for sid, dx, dy in take(MOVE):
+                entry = store[sid]
+                entry[-3 if hp else 0] += dx
+                entry[-2 if hp else 1] += dy
+            if hp:
+                for sid, value in take(HP):
+                    store[sid][-1] = value
+
+    def kind(self):
+        return KINDS[self.state[5]]
+
+
+class Publisher:
+    # Serves the stream to any number of clients without ever blocking the game
+    def __init__(self, address=DEFAULT_ADDRESS, rate=30):
+        family, addr = parse_address(address)
+        if family == socket.AF_UNIX and os.path.exists(addr):
+            os.remove(addr)
+        self.server = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(addr)
+        self.server.listen()
+        self.server.setblocking(False)
+        self.interval = 1 / rate  # Seconds between messages, however fast the simulation runs (--speed)
+        self.next_time = 0.0
+        self.encoder = Encoder()
+        self.clients = {}  # socket -> bytearray of unsent data
+
+    def tick(self, game):
+        now = time.monotonic()
+        if now < self.next_time and game.ticks >= self.encoder.tick:
+            return
+        self.next_time = now + self.interval
+        new = []
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except (BlockingIOError, InterruptedError):
+                break
+            client.setblocking(False)
+            new.append(client)
+        if not self.clients and not new:
+            self.encoder.tick = game.ticks
+            return
+
+        message, restarted = self.encoder.delta(game)
+        keyframe = self.encoder.keyframe() if restarted or new else None
+        for client in list(self.clients):
+            self._send(client, keyframe if restarted else message)
+        for client in new:
+            self.clients[client] = bytearray()
+            self._send(client, keyframe)
+
+    def _send(self, client, data):
+        pending = self.clients[client]
+        pending += data
+        try:
+            sent = client.send(pending)
+            del pending[:sent]
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            self._drop(client)
+            return
+        if len(pending) > MAX_BACKLOG:
+            self._drop(client)
+
+    def _drop(self, client):
+        self.clients.pop(client, None)
+        client.close()
+
+    def close(self):
+        for client in list(self.clients):
+            self._drop(client)
+        self.server.close()
+
+
+def connect(address=DEFAULT_ADDRESS):
+    family, addr = parse_address(address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.connect(addr)
+    return sock
+
+
+def read_messages(buffer):
+    # Split complete messages off the front of buffer (a bytearray); yields (type, body)
+    while len(buffer) >= MSG.size:
+        length, kind = MSG.unpack_from(buffer, 0)
+        if len(buffer) < MSG.size + length:
+            return
+        body = bytes(buffer[MSG.size:MSG.size + length])
+        del buffer[:MSG.size + length]
+        yield kind, body
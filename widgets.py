@@ -0,0 +1,165 @@
+import pygame
+
+# Small retained-mode UI toolkit shared by all screens.
+# Widgets render their surface once and only re-render when their content changes,
+# so drawing a screen is a single blits() call per layer.
+
+
+class Widget:
+    def __init__(self, image, rect, name=None):
+        self.image = image
+        self.rect = rect
+        self.name = name  # Only named widgets take part in hit-testing
+        self.visible = True
+        self.layer = None
+
+    def blit_item(self):
+        return self.image, self.rect
+
+    def set_visible(self, visible):
+        if visible != self.visible:
+            self.visible = visible
+            self._changed()
+
+    def move_to(self, **anchor):
+        rect = self.image.get_rect(**anchor)
+        if rect != self.rect:
+            self.rect = rect
+            self._changed()
+
+    def _changed(self):
+        if self.layer is not None:
+            self.layer.index = None
+
+
+class Label(Widget):
+    def __init__(self, font, text, color, name=None, **anchor):
+        self.font = font
+        self.text = text
+        self.color = color
+        self.anchor = anchor or {"topleft": (0, 0)}
+        image = font.render(text, True, color)
+        super().__init__(image, image.get_rect(**self.anchor), name)
+
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self._render()
+
+    def set_color(self, color):
+        if color != self.color:
+            self.color = color
+            self._render()
+
+    def _render(self):
+        self.image = self.font.render(self.text, True, self.color)
+        rect = self.image.get_rect(**self.anchor)
+        if rect != self.rect:
+            self.rect = rect
+            self._changed()
+
+
+class Button(Widget):
+    # text_pos is the label's top-left offset inside the button; None centers it
+    def __init__(self, name, rect, color=None, text=None, font=None, text_color=(255, 255, 255),
+                 text_pos=None, border_radius=0, outline=None, selected_outline=None, image=None):
+        rect = pygame.Rect(rect)
+        surf = pygame.Surface(rect.size, pygame.SRCALPHA)
+        local = surf.get_rect()
+        if color is not None:
+            pygame.draw.rect(surf, color, local, border_radius=border_radius)
+        if image is not None:
+            surf.blit(image, image.get_rect(center=local.center))
+        if outline is not None:
+            pygame.draw.rect(surf, outline[0], local, outline[1], border_radius=border_radius)
+        if text is not None:
+            label = font.render(text, True, text_color)
+            if text_pos is None:
+                surf.blit(label, label.get_rect(center=local.center))
+            else:
+                surf.blit(label, text_pos)
+        self.normal_image = surf
+        self.selected_image = surf
+        if selected_outline is not None:
+            self.selected_image = surf.copy()
+            pygame.draw.rect(self.selected_image, selected_outline[0], local, selected_outline[1],
+                             border_radius=border_radius)
+        self.selected = False
+        super().__init__(surf, rect, name)
+
+    def set_selected(self, selected):
+        if selected != self.selected:
+            self.selected = selected
+            self.image = self.selected_image if selected else self.normal_image
+
+
+class Overlay(Widget):
+    def __init__(self, rect, color, outline=None):
+        rect = pygame.Rect(rect)
+        surf = pygame.Surface(rect.size, pygame.SRCALPHA)
+        surf.fill(color)
+        if outline is not None:
+            pygame.draw.rect(surf, outline[0], surf.get_rect(), outline[1])
+        super().__init__(surf, rect)
+
+
+class Layer:
+    def __init__(self, *widgets, modal=False, visible=True):
+        self.widgets = []
+        self.modal = modal  # A visible modal layer swallows clicks meant for layers below it
+        self.visible = visible
+        self.index = None
+        self.add(*widgets)
+
+    def add(self, *widgets):
+        for widget in widgets:
+            widget.layer = self
+            self.widgets.append(widget)
+        self.index = None
+        return widgets[0] if len(widgets) == 1 else widgets
+
+    def clear(self):
+        for widget in self.widgets:
+            widget.layer = None
+        self.widgets = []
+        self.index = None
+
+    def hit(self, pos):
+        # Hit-test index: rects of visible named widgets, topmost first
+        if self.index is None:
+            clickable = [w for w in reversed(self.widgets) if w.visible and w.name is not None]
+            self.index = ([w.rect for w in clickable], [w.name for w in clickable])
+        rects, names = self.index
+        i = pygame.Rect(pos, (1, 1)).collidelist(rects)
+        return names[i] if i != -1 else None
+
+    def draw(self, surf):
+        surf.blits([w.blit_item() for w in self.widgets if w.visible], False)
+
+
+class Dialog(Layer):
+    def __init__(self, *widgets, backdrop=None, visible=False):
+        # backdrop is (rect, rgba) for a dimming overlay drawn under the dialog
+        super().__init__(modal=True, visible=visible)
+        if backdrop is not None:
+            self.add(Overlay(*backdrop))
+        self.add(*widgets)
+
+
+class UI:
+    def __init__(self, *layers):
+        self.layers = list(layers)
+
+    def hit(self, pos):
+        for layer in reversed(self.layers):
+            if not layer.visible:
+                continue
+            name = layer.hit(pos)
+            if name is not None or layer.modal:
+                return name
+        return None
+
+    def draw(self, surf):
+        for layer in self.layers:
+            if layer.visible:
+                layer.draw(surf)